@@ -0,0 +1,158 @@
+"""End-to-end latency of the voice pipeline on replayed audio, without audio hardware
+
+Replays a session (a WAV file, or a directory as described in
+listening.sources.load_session) through the real capture, VAD, wake
+phrase, STT and response stages of VoiceAssistant, with the fake STT
+backend returning each clip's transcript and the fake AI provider
+answering at a fixed speed. Without a session, a synthetic one with
+speech-like noise bursts is generated. Reports, per spoken command, the
+time from the end of its audio to the wake chime, the first streamed
+token and the full response.
+
+Runs headless: pygame uses SDL's dummy audio driver.
+
+Usage:
+    python benchmarks/pipeline_benchmark.py [session] [--speed 1] [--stt-rtf 0.05] [--first-token-ms 300]
+"""
+import os
+import sys
+import json
+import time
+import wave
+import argparse
+import tempfile
+import threading
+import numpy as np
+
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from voice_assistant import VoiceAssistant
+from listening.sources import load_session
+
+SAMPLE_RATE = 16000
+
+SYNTHETIC_COMMANDS = [
+    "hey ova what time is it",
+    "hey ova tell me a joke",
+    "hey ova how do owls sleep",
+    "hey ova what's the weather like"
+]
+
+def synthetic_speech(seconds, seed):
+    """Noise shaped into syllables, loud enough for the VAD to treat as speech"""
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(seconds * SAMPLE_RATE)) / SAMPLE_RATE
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)
+    return (rng.standard_normal(len(t)) * 3000 * envelope).clip(-32768, 32767).astype(np.int16)
+
+def write_synthetic_session(folder, gap_seconds):
+    """WAV per command plus a session.json with the transcripts"""
+    steps = []
+    for index, text in enumerate(SYNTHETIC_COMMANDS):
+        name = f"command{index}.wav"
+        with wave.open(os.path.join(folder, name), 'wb') as wav:
+            wav.setnchannels(1)
+            wav.setsampwidth(2)
+            wav.setframerate(SAMPLE_RATE)
+            wav.writeframes(synthetic_speech(0.3 * len(text.split()), index).tobytes())
+        steps.append({'wav': name, 'text': text})
+        steps.append({'silence': gap_seconds})
+    with open(os.path.join(folder, 'session.json'), 'w') as f:
+        json.dump({'steps': steps}, f)
+
+class EventLog:
+    """Timestamps of what the voice assistant reported"""
+    
+    def __init__(self):
+        self.events = []  # (perf_counter, kind)
+        self.lock = threading.Lock()
+    
+    def add(self, kind):
+        with self.lock:
+            self.events.append((time.perf_counter(), kind))
+    
+    def callback(self, response):
+        self.add(response if isinstance(response, str) else 'RESPONSE')
+    
+    def stream_callback(self, token, user_text):
+        self.add('TOKEN')
+    
+    def first_after(self, kind, moment):
+        """Seconds from moment to the first event of a kind after it"""
+        with self.lock:
+            for timestamp, event in self.events:
+                if event == kind and timestamp >= moment:
+                    return timestamp - moment
+        return None
+
+def mean_ms(values):
+    values = [value for value in values if value is not None]
+    return f"{sum(values) / len(values) * 1000:.0f}" if values else "-"
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('session', nargs='?', help="WAV file or session directory; synthetic if left out")
+    parser.add_argument('--speed', type=float, default=1.0, help="Replay speed, 1 is real time")
+    parser.add_argument('--gap', type=float, default=4.0, help="Seconds between synthetic commands")
+    parser.add_argument('--stt-rtf', type=float, default=0.05, help="Fake STT processing per audio second")
+    parser.add_argument('--first-token-ms', type=float, default=300, help="Fake model time to first token")
+    parser.add_argument('--tokens-per-second', type=float, default=30, help="Fake model generation speed")
+    args = parser.parse_args()
+    
+    temp_dir = None
+    session = args.session
+    if not session:
+        temp_dir = tempfile.TemporaryDirectory()
+        session = temp_dir.name
+        write_synthetic_session(session, args.gap)
+    
+    config = {
+        'input_source': session,
+        'input_speed': args.speed,
+        'input_gap_seconds': args.gap,
+        'ai_provider': 'fake',
+        'stt_backend': 'fake',
+        'stt_workers': 1,  # Scripted transcripts are handed out in order
+        'fake_stt_transcripts': [step.text for step in load_session(session, gap_seconds=args.gap) if step.text],
+        'wake_word_engine': 'transcript',
+        'save_conversation_history': False,
+        'personality_preset': 'ova'
+    }
+    log = EventLog()
+    assistant = VoiceAssistant(config=config, callback=log.callback, stream_callback=log.stream_callback)
+    provider = assistant.ai_manager.current_provider
+    provider.first_token_delay = args.first_token_ms / 1000
+    provider.tokens_per_second = args.tokens_per_second
+    assistant.stt.backend.rtf = args.stt_rtf
+    
+    assistant.start_listening()
+    source = assistant.mic
+    print(f"Replaying {source.duration:.1f}s of audio at {args.speed:g}x, "
+          f"{len(config['fake_stt_transcripts'])} scripted utterances")
+    
+    source.finished.wait()
+    time.sleep(args.first_token_ms / 1000 + 3)  # Let the last response finish
+    stats = assistant.get_pipeline_stats()
+    assistant.stop_listening()
+    
+    print(f"{'clip':<16} {'wake ms':>8} {'token ms':>9} {'reply ms':>9}")
+    wakes, tokens, replies = [], [], []
+    for step in source.steps:
+        if not step.text or step.heard_at is None:
+            continue
+        wake = log.first_after('START_LISTENING', step.heard_at)
+        token = log.first_after('TOKEN', step.heard_at)
+        reply = log.first_after('RESPONSE', step.heard_at)
+        wakes.append(wake)
+        tokens.append(token)
+        replies.append(reply)
+        print(f"{step.name:<16} {mean_ms([wake]):>8} {mean_ms([token]):>9} {mean_ms([reply]):>9}")
+    print(f"{'mean':<16} {mean_ms(wakes):>8} {mean_ms(tokens):>9} {mean_ms(replies):>9}")
+    print(f"Pipeline stats: {stats}")
+    
+    if temp_dir:
+        temp_dir.cleanup()
+
+if __name__ == '__main__':
+    main()
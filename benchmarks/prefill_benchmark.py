@@ -0,0 +1,82 @@
+"""Time to first token from Ollama with and without a speculative prefill
+
+Plays a short conversation twice through AIManager with the configured
+personality preset: once sending each command cold, and once starting a
+prefill of the system prompt and history `--speech-seconds` before the
+command arrives, the way the voice assistant does when it hears the wake
+word. With --cold the model is unloaded before every turn, as after Ova
+has been idle for a while.
+
+Usage:
+    python benchmarks/prefill_benchmark.py [--model llama3.2:latest] [--speech-seconds 2] [--cold]
+"""
+import os
+import sys
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from AI.AI_manager import AIManager
+
+PRESETS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'assets', 'presets')
+
+COMMANDS = [
+    "What's a good name for a pet owl?",
+    "Why do owls hoot at night?",
+    "Tell me a short joke about mice.",
+    "What should I cook for dinner tonight?",
+    "How far away is the moon?"
+]
+
+def unload(provider):
+    """Drop the model from memory so the next request has to load it"""
+    provider.client.chat(model=provider.model, messages=[], keep_alive=0)
+
+def run(manager, system_prompt, prefill, speech_seconds, cold):
+    """One pass over the commands; TTFT samples end up in the manager's stats"""
+    provider = manager.current_provider
+    history = []
+    unload(provider)
+    for command in COMMANDS:
+        if cold:
+            unload(provider)
+        if prefill:
+            manager.prefill(system_prompt, history)
+        time.sleep(speech_seconds)  # The user saying the command
+        if manager.prefill_thread:
+            manager.prefill_thread.join()
+        manager.get_response(command, system_prompt, history, on_token=lambda token: None)
+        history = manager.get_conversation_history()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--model', help="Ollama model, the first installed one if left out")
+    parser.add_argument('--preset', default='ova', help="Personality preset used as the system prompt")
+    parser.add_argument('--speech-seconds', type=float, default=2.0, help="Time between wake word and command")
+    parser.add_argument('--cold', action='store_true', help="Unload the model before every turn")
+    args = parser.parse_args()
+    
+    manager = AIManager(provider_name='ollama', model=args.model)
+    if not manager.current_provider:
+        print(f"Ollama is not available ({manager.ollama_status})")
+        return
+    with open(os.path.join(PRESETS_DIR, f'{args.preset}.txt'), 'r') as f:
+        system_prompt = f.read()
+    
+    print(f"Model {manager.current_provider.model}, {len(COMMANDS)} turns, "
+          f"{args.speech_seconds:g}s of speech{', cold' if args.cold else ''}")
+    run(manager, system_prompt, False, args.speech_seconds, args.cold)
+    run(manager, system_prompt, True, args.speech_seconds, args.cold)
+    
+    stats = manager.get_ttft_stats()
+    print(f"{'':<10} {'turns':>6} {'mean ms':>8} {'median ms':>10}")
+    for kind, label in (('cold', 'without'), ('prefilled', 'with')):
+        row = stats.get(kind)
+        if row:
+            print(f"{label:<10} {row['count']:>6} {row['mean_ms']:>8} {row['median_ms']:>10}")
+    for kind, row in manager.get_prompt_stats().items():
+        print(f"{kind}: {row['mean_prompt_eval_count']} prompt tokens evaluated on average, {row['mean_prompt_eval_ms']} ms")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,113 @@
+"""Paraphrase matching and lookup speed of the semantic response cache
+
+First embeds pairs of questions that mean the same (and pairs that don't)
+and reports their cosine similarity, and which would be answered from the
+cache at --threshold. Then fills a memory-mapped index with --entries
+vectors and times lookups, scanning every row and through the clustered
+(IVF) index, along with how often the clustered search still finds a
+near duplicate. Random vectors have no cluster structure, so this is the
+worst case for the clustered index; real embeddings cluster by topic.
+The offline hashing embedder is the default only so the index timings
+run without Ollama; its similarities show why the app needs a real
+embedding model.
+
+Usage:
+    python benchmarks/semantic_cache_benchmark.py [--embedder hashing|ollama] [--entries 100000] [--threshold 0.9]
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from AI.semantic_cache import VectorIndex, HashingEmbedder, OllamaEmbedder
+
+PARAPHRASES = [
+    ("what's the weather like", "how's the weather"),
+    ("tell me a joke", "tell me a funny joke"),
+    ("what time is it", "what's the time"),
+    ("good morning ova", "morning ova"),
+    ("how are you doing", "how are you today"),
+    ("what can you do", "what are you able to do"),
+    ("who made you", "who created you"),
+    ("what's your name", "what is your name")
+]
+
+UNRELATED = [
+    ("what's the weather like", "tell me a joke"),
+    ("what time is it", "what day is it"),
+    ("how are you doing", "what are you doing"),
+    ("tell me a joke", "tell me a story"),
+    ("who made you", "who are you")
+]
+
+def percentile_ms(samples, fraction):
+    samples = sorted(samples)
+    return samples[min(int(len(samples) * fraction), len(samples) - 1)] * 1000
+
+def compare_pairs(embedder, threshold):
+    """Similarity of paraphrases and of unrelated questions"""
+    print(f"Embedder {embedder.name}, threshold {threshold}")
+    for label, pairs, should_hit in (('paraphrase', PARAPHRASES, True), ('unrelated', UNRELATED, False)):
+        right = 0
+        for first, second in pairs:
+            score = float(embedder.embed(first) @ embedder.embed(second))
+            hit = score >= threshold
+            right += hit == should_hit
+            print(f"  {label:<11} {score:5.2f} {'hit ' if hit else 'miss'}  {first} / {second}")
+        print(f"  {right}/{len(pairs)} {label} pairs handled correctly")
+
+def time_index(entries, dim, queries, nprobe):
+    """Fill a memory-mapped index with random unit vectors and time lookups"""
+    rng = np.random.default_rng(0)
+    vectors = rng.standard_normal((entries, dim)).astype(np.float32)
+    vectors /= np.linalg.norm(vectors, axis=1, keepdims=True)
+    
+    with tempfile.TemporaryDirectory() as folder:
+        index = VectorIndex(dim, os.path.join(folder, 'vectors.f32'), nprobe=nprobe)
+        start = time.perf_counter()
+        for vector in vectors:
+            index.add(vector)
+        print(f"Added {entries} {dim}-d vectors in {time.perf_counter() - start:.1f}s")
+        index.train()
+        
+        # Near duplicates of stored vectors, about 0.94 similar
+        sources = rng.choice(entries, queries)
+        noise = rng.standard_normal((queries, dim)).astype(np.float32)
+        noise /= np.linalg.norm(noise, axis=1, keepdims=True)
+        targets = vectors[sources] + 0.35 * noise
+        targets /= np.linalg.norm(targets, axis=1, keepdims=True)
+        
+        index.search(targets[0])  # Sorts rows into the cluster lists
+        print(f"{'search':<10} {'median ms':>10} {'p99 ms':>8} {'found':>7}")
+        for label, exact in (('exact', True), ('clustered', False)):
+            times, found = [], 0
+            for source, target in zip(sources, targets):
+                start = time.perf_counter()
+                best = index.search(target, k=1, exact=exact)
+                times.append(time.perf_counter() - start)
+                found += best[0][0] == source
+            print(f"{label:<10} {percentile_ms(times, 0.5):>10.3f} {percentile_ms(times, 0.99):>8.3f} "
+                  f"{found / queries:>7.1%}")
+        del index
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--embedder', default='hashing', choices=['hashing', 'ollama'])
+    parser.add_argument('--model', default='nomic-embed-text', help="Ollama embedding model")
+    parser.add_argument('--threshold', type=float, default=0.9, help="Similarity needed to answer from the cache")
+    parser.add_argument('--entries', type=int, default=100000, help="Vectors in the timed index")
+    parser.add_argument('--queries', type=int, default=500)
+    parser.add_argument('--nprobe', type=int, default=8, help="Clusters scanned per clustered lookup")
+    args = parser.parse_args()
+    
+    embedder = OllamaEmbedder(args.model) if args.embedder == 'ollama' else HashingEmbedder()
+    compare_pairs(embedder, args.threshold)
+    dim = len(embedder.embed("hello"))
+    time_index(args.entries, dim, args.queries, args.nprobe)
+
+if __name__ == '__main__':
+    main()
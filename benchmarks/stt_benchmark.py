@@ -0,0 +1,119 @@
+"""Compare speech-to-text backends side by side on recorded WAV fixtures
+
+Each fixture is a WAV file with the expected transcript next to it in a
+.txt file of the same name. Audio is streamed into each backend in 100ms
+chunks to measure when the first partial result appears.
+
+Usage:
+    python benchmarks/stt_benchmark.py path/to/fixtures --backends google vosk [--vosk-model models/vosk]
+"""
+import os
+import re
+import sys
+import glob
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from STT.STT_manager import STTManager
+from listening.wake_word import load_wav
+
+SAMPLE_RATE = 16000
+CHUNK_BYTES = SAMPLE_RATE // 10 * 2
+
+def words(text):
+    """Lowercase words without punctuation"""
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+def word_errors(reference, hypothesis):
+    """Word-level edit distance"""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (ref_word != hyp_word)))
+        previous = current
+    return previous[-1]
+
+def load_fixtures(folder):
+    """(name, pcm bytes, expected words) for every WAV with a transcript"""
+    fixtures = []
+    for path in sorted(glob.glob(os.path.join(folder, '*.wav'))):
+        transcript_path = os.path.splitext(path)[0] + '.txt'
+        if not os.path.exists(transcript_path):
+            print(f"Skipping {path}: no transcript")
+            continue
+        with open(transcript_path, 'r', encoding='utf-8') as f:
+            expected = words(f.read())
+        pcm = np.clip(load_wav(path, SAMPLE_RATE), -32768, 32767).astype(np.int16).tobytes()
+        fixtures.append((os.path.basename(path), pcm, expected))
+    return fixtures
+
+def run_backend(manager, fixtures, verbose):
+    """Stream every fixture through a backend; returns errors, reference words and first-partial delays"""
+    errors = reference_words = 0
+    partial_delays = []
+    for name, pcm, expected in fixtures:
+        session = manager.create_session(SAMPLE_RATE)
+        first_partial = None
+        for start in range(0, len(pcm), CHUNK_BYTES):
+            if session.accept(pcm[start:start + CHUNK_BYTES]) and first_partial is None:
+                # Measured in audio time: how much speech was needed before text showed up
+                first_partial = (start + CHUNK_BYTES) / (SAMPLE_RATE * 2)
+        text = session.finish()
+        
+        fixture_errors = word_errors(expected, words(text))
+        errors += fixture_errors
+        reference_words += len(expected)
+        if first_partial is not None:
+            partial_delays.append(first_partial)
+        if verbose:
+            print(f"  {name}: {fixture_errors} errors, heard '{text}'")
+    return errors, reference_words, partial_delays
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('fixtures', help="Folder of WAV files with matching .txt transcripts")
+    parser.add_argument('--backends', nargs='+', default=['google'], help="Backends to compare")
+    parser.add_argument('--vosk-model', default=None, help="Path to an unpacked Vosk model")
+    parser.add_argument('--verbose', action='store_true', help="Print every transcript")
+    args = parser.parse_args()
+    
+    fixtures = load_fixtures(args.fixtures)
+    if not fixtures:
+        sys.exit(f"No fixtures with transcripts in {args.fixtures}")
+    audio_seconds = sum(len(pcm) for _, pcm, _ in fixtures) / (SAMPLE_RATE * 2)
+    print(f"{len(fixtures)} fixtures, {audio_seconds:.1f}s of audio")
+    
+    results = []
+    for backend in args.backends:
+        manager = STTManager(backend_name=backend, vosk_model_path=args.vosk_model)
+        manager.warm_up()
+        if manager.backend_name != backend:
+            print(f"{backend} is not available, skipping")
+            continue
+        
+        if args.verbose:
+            print(backend)
+        start = time.perf_counter()
+        errors, reference_words, partial_delays = run_backend(manager, fixtures, args.verbose)
+        wall = time.perf_counter() - start
+        stats = manager.get_stats()
+        results.append((
+            backend,
+            errors / reference_words if reference_words else 0.0,
+            stats['rtf'],
+            stats['mean_latency_ms'],
+            sum(partial_delays) / len(partial_delays) * 1000 if partial_delays else None,
+            wall
+        ))
+    
+    print(f"{'backend':<10} {'WER':>7} {'RTF':>7} {'final ms':>9} {'partial ms':>11} {'wall s':>7}")
+    for backend, wer, rtf, latency, partial, wall in results:
+        partial_text = f"{partial:.0f}" if partial is not None else "-"
+        print(f"{backend:<10} {wer:>7.1%} {rtf:>7.3f} {latency:>9.1f} {partial_text:>11} {wall:>7.1f}")
+
+if __name__ == '__main__':
+    main()
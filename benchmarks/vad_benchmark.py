@@ -0,0 +1,116 @@
+"""Compare CPU cost of the NumPy VAD stage with speech_recognition's listen loop
+
+Streams every WAV in a folder through both segmenters in microphone sized
+chunks and reports CPU seconds per hour of audio and the segments found.
+
+Usage:
+    python benchmarks/vad_benchmark.py path/to/wavs [--repeat 3]
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import numpy as np
+import speech_recognition as sr
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from listening.capture import FrameRingBuffer, RingReader
+from listening.vad import VoiceActivityDetector, Segmenter
+from listening.wake_word import load_wav
+
+SAMPLE_RATE = 16000
+CHUNK = 1024
+
+class PCMStream:
+    """File-like stream over PCM bytes, read in frames like PyAudio"""
+    
+    def __init__(self, data):
+        self.data = data
+        self.position = 0
+        
+    def read(self, frames):
+        chunk = self.data[self.position:self.position + frames * 2]
+        self.position += len(chunk)
+        return chunk
+
+class PCMSource(sr.AudioSource):
+    """In-memory audio source for Recognizer.listen"""
+    
+    def __init__(self, data):
+        self.SAMPLE_RATE = SAMPLE_RATE
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = CHUNK
+        self.stream = PCMStream(data)
+        
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        pass
+
+def run_recognizer(data):
+    """The previous path: Recognizer.listen with the old hand-tuned settings"""
+    recognizer = sr.Recognizer()
+    recognizer.dynamic_energy_threshold = False
+    recognizer.energy_threshold = 300
+    recognizer.pause_threshold = 1.5
+    recognizer.phrase_threshold = 0.01
+    recognizer.non_speaking_duration = .7
+    
+    segments = 0
+    with PCMSource(data) as source:
+        while source.stream.position < len(data):
+            recognizer.listen(source, timeout=None, phrase_time_limit=10)
+            if source.stream.position >= len(data):
+                break  # Ran off the end of the clip rather than hearing a pause
+            segments += 1
+    return segments
+
+def run_vad(data):
+    """The new path: ring buffer, block VAD and segmenter"""
+    buffer = FrameRingBuffer(len(data) + CHUNK * 2)
+    reader = RingReader(buffer, 0, 2)
+    segmenter = Segmenter(reader, VoiceActivityDetector(SAMPLE_RATE))
+    for start in range(0, len(data), CHUNK * 2):
+        buffer.write(data[start:start + CHUNK * 2])
+    buffer.close()
+    
+    segments = 0
+    while segmenter.next_segment(max_seconds=10) is not None:
+        segments += 1
+    return segments
+
+def measure(function, clips, repeat):
+    """Best CPU time over several runs, plus the segment count"""
+    best, segments = None, 0
+    for _ in range(repeat):
+        start = time.process_time()
+        segments = sum(function(clip) for clip in clips)
+        elapsed = time.process_time() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best, segments
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('folder', help="Folder of 16-bit WAV recordings")
+    parser.add_argument('--repeat', type=int, default=3, help="Runs per path, the fastest is reported")
+    args = parser.parse_args()
+    
+    clips = [
+        np.clip(load_wav(path, SAMPLE_RATE), -32768, 32767).astype(np.int16).tobytes()
+        for path in sorted(glob.glob(os.path.join(args.folder, '*.wav')))
+    ]
+    if not clips:
+        sys.exit(f"No WAV files in {args.folder}")
+    audio_hours = sum(len(clip) for clip in clips) / 2 / SAMPLE_RATE / 3600
+    print(f"{len(clips)} clips, {audio_hours * 60:.1f} minutes of audio")
+    
+    print(f"{'path':<22} {'CPU s/hour':>11} {'segments':>9}")
+    for name, function in (("Recognizer.listen", run_recognizer), ("NumPy VAD", run_vad)):
+        cpu, segments = measure(function, clips, args.repeat)
+        print(f"{name:<22} {cpu / audio_hours:>11.2f} {segments:>9}")
+
+if __name__ == '__main__':
+    main()
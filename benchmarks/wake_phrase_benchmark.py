@@ -0,0 +1,95 @@
+"""Compare the wake phrase matcher with the old substring scan on labeled transcripts
+
+The corpus is a JSON list of {"text", "wake", "command"} entries: whether
+the transcript should wake Ova, and the command left once the wake phrase
+is cut out. Reports detection errors, exact command extraction and the
+time per transcript.
+
+Usage:
+    python benchmarks/wake_phrase_benchmark.py [benchmarks/fixtures/wake_phrase_corpus.json] [--repeat 200]
+"""
+import os
+import sys
+import json
+import time
+import argparse
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from listening.wake_phrase import WakePhraseMatcher, DEFAULT_WAKE_PHRASES
+
+DEFAULT_CORPUS = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'wake_phrase_corpus.json')
+
+def substring_scan(text):
+    """What the voice assistant used to do: first listed variant contained in the text"""
+    for wake_word in DEFAULT_WAKE_PHRASES:
+        if wake_word in text:
+            return text.replace(wake_word, "").strip()
+    return None
+
+def matcher_scan(matcher):
+    """Command for a transcript, or None when there's no wake phrase"""
+    def scan(text):
+        match = matcher.find(text)
+        return match.command if match else None
+    return scan
+
+def evaluate(scan, corpus, verbose):
+    """Missed wakes, false wakes and wrongly cut commands"""
+    missed = false_wakes = bad_commands = 0
+    for entry in corpus:
+        command = scan(entry['text'])
+        if entry['wake'] and command is None:
+            missed += 1
+        elif not entry['wake'] and command is not None:
+            false_wakes += 1
+        elif entry['wake'] and command != entry['command']:
+            bad_commands += 1
+        else:
+            continue
+        if verbose:
+            print(f"  '{entry['text']}' -> {command!r}")
+    return missed, false_wakes, bad_commands
+
+def time_scan(scan, corpus, repeat):
+    """Microseconds per transcript"""
+    texts = [entry['text'] for entry in corpus]
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for text in texts:
+            scan(text)
+    return (time.perf_counter() - start) / (repeat * len(texts)) * 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('corpus', nargs='?', default=DEFAULT_CORPUS, help="Labeled transcript corpus")
+    parser.add_argument('--repeat', type=int, default=200, help="Passes over the corpus for timing")
+    parser.add_argument('--verbose', action='store_true', help="Print every mistake")
+    args = parser.parse_args()
+    
+    with open(args.corpus, 'r', encoding='utf-8') as f:
+        corpus = json.load(f)
+    wakes = sum(1 for entry in corpus if entry['wake'])
+    print(f"{len(corpus)} transcripts, {wakes} with a wake phrase")
+    
+    build_start = time.perf_counter()
+    matcher = WakePhraseMatcher(DEFAULT_WAKE_PHRASES)
+    build_ms = (time.perf_counter() - build_start) * 1000
+    print(f"Matcher built in {build_ms:.2f} ms")
+    
+    scans = [
+        ('substring', substring_scan),
+        ('regex', matcher_scan(WakePhraseMatcher(DEFAULT_WAKE_PHRASES, phonetic=False))),
+        ('regex+phonetic', matcher_scan(matcher))
+    ]
+    
+    print(f"{'matcher':<16} {'missed':>7} {'false':>6} {'bad cmd':>8} {'us/text':>8}")
+    for name, scan in scans:
+        if args.verbose:
+            print(name)
+        missed, false_wakes, bad_commands = evaluate(scan, corpus, args.verbose)
+        micros = time_scan(scan, corpus, args.repeat)
+        print(f"{name:<16} {missed:>7} {false_wakes:>6} {bad_commands:>8} {micros:>8.1f}")
+
+if __name__ == '__main__':
+    main()
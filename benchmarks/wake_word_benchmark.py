@@ -0,0 +1,83 @@
+"""Measure wake word false accepts, false rejects and CPU cost on WAV fixtures
+
+Expects a fixtures folder laid out as:
+    positive/*.wav   clips that contain the wake word once
+    negative/*.wav   clips that don't (speech, music, room noise)
+
+Usage:
+    python benchmarks/wake_word_benchmark.py FIXTURES --templates wake_words [--threshold 2.5] [--sweep]
+"""
+import os
+import sys
+import glob
+import time
+import argparse
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'scripts'))
+
+from listening.wake_word import TemplateWakeWordEngine, load_wav
+
+SAMPLE_RATE = 16000
+CHUNK = 1024  # Same read size as speech_recognition's Microphone
+
+def load_clips(folder):
+    """All WAV clips in a folder as int16 arrays"""
+    clips = []
+    for path in sorted(glob.glob(os.path.join(folder, '*.wav'))):
+        samples = load_wav(path, SAMPLE_RATE)
+        clips.append((os.path.basename(path), np.clip(samples, -32768, 32767).astype(np.int16)))
+    return clips
+
+def count_detections(engine, samples):
+    """Stream a clip through the engine in microphone sized chunks"""
+    engine.reset()
+    detections = 0
+    for start in range(0, len(samples), CHUNK):
+        if engine.process(samples[start:start + CHUNK]):
+            detections += 1
+    return detections
+
+def evaluate(engine, positives, negatives):
+    """Return (false reject rate, false accepts, false accepts per hour, cpu seconds, audio seconds)"""
+    cpu_start = time.process_time()
+    missed = sum(1 for _, clip in positives if count_detections(engine, clip) == 0)
+    false_accepts = sum(count_detections(engine, clip) for _, clip in negatives)
+    cpu = time.process_time() - cpu_start
+    
+    audio_seconds = sum(len(clip) for _, clip in positives + negatives) / SAMPLE_RATE
+    negative_hours = sum(len(clip) for _, clip in negatives) / SAMPLE_RATE / 3600
+    frr = missed / len(positives) if positives else 0.0
+    per_hour = false_accepts / negative_hours if negative_hours else 0.0
+    return frr, false_accepts, per_hour, cpu, audio_seconds
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('fixtures', help="Folder with positive/ and negative/ WAV clips")
+    parser.add_argument('--templates', required=True, help="Folder of wake word template recordings")
+    parser.add_argument('--threshold', type=float, default=None, help="Match threshold (default: calibrated from templates)")
+    parser.add_argument('--sweep', action='store_true', help="Also report rates across a range of thresholds")
+    args = parser.parse_args()
+    
+    positives = load_clips(os.path.join(args.fixtures, 'positive'))
+    negatives = load_clips(os.path.join(args.fixtures, 'negative'))
+    engine = TemplateWakeWordEngine(args.templates, sample_rate=SAMPLE_RATE, threshold=args.threshold)
+    if not engine.templates:
+        sys.exit(f"No templates found in {args.templates}")
+    
+    print(f"{len(engine.templates)} templates, {len(positives)} positive clips, {len(negatives)} negative clips")
+    
+    thresholds = [round(engine.threshold, 2)]
+    if args.sweep:
+        sweep = np.round(np.linspace(engine.threshold * 0.6, engine.threshold * 1.4, 9), 2)
+        thresholds = sorted(set(thresholds) | set(float(t) for t in sweep))
+    
+    print(f"{'threshold':>10} {'FRR':>8} {'FA':>5} {'FA/hour':>9} {'CPU ms/s':>9}")
+    for threshold in thresholds:
+        engine.threshold = threshold
+        frr, false_accepts, per_hour, cpu, audio_seconds = evaluate(engine, positives, negatives)
+        cpu_per_second = cpu / audio_seconds * 1000 if audio_seconds else 0.0
+        print(f"{threshold:>10.2f} {frr:>8.1%} {false_accepts:>5} {per_hour:>9.1f} {cpu_per_second:>9.2f}")
+
+if __name__ == '__main__':
+    main()
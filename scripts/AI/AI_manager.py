@@ -1,15 +1,24 @@
 import os
+import time
+import queue
 import logging
+import threading
+from collections import deque
 from .ollama import OllamaProvider
 from .google import GoogleProvider
+from .fake import FakeProvider
 from dotenv import load_dotenv
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# A prefill older than this has likely been evicted, so the response counts as cold
+PREFILL_WINDOW = 60.0
+
 class AIManager:
-    def __init__(self, provider_name="ollama", google_api_key=None, model=None):
+    def __init__(self, provider_name="ollama", google_api_key=None, model=None, keep_alive=None, num_ctx=None,
+                 response_cache=None, semantic_cache=None):
         """Initialize AI manager with specified provider"""
         load_dotenv()  # Keep this for any other env vars that might be needed
         
@@ -25,7 +34,8 @@ class AIManager:
                 if result.returncode == 0:
                     models = [line.split()[0] for line in result.stdout.strip().split('\n')[1:]]
                     if models:
-                        self.providers["ollama"] = OllamaProvider(model=model if model else models[0])
+                        self.providers["ollama"] = OllamaProvider(
+                            model=model if model else models[0], keep_alive=keep_alive, num_ctx=num_ctx)
                     else:
                         self.ollama_status = "no_models"
                 else:
@@ -35,6 +45,9 @@ class AIManager:
             except Exception as e:
                 logger.error(f"Error initializing Ollama: {e}")
                 self.ollama_status = "error"
+        elif provider_name == "fake":
+            # Offline stand-in for benchmarks and replayed sessions
+            self.providers["fake"] = FakeProvider(model=model if model else "fake")
         else:
             # For other providers, still try to init Ollama as fallback
             try:
@@ -43,7 +56,7 @@ class AIManager:
                 if result.returncode == 0:
                     models = [line.split()[0] for line in result.stdout.strip().split('\n')[1:]]
                     if models:
-                        self.providers["ollama"] = OllamaProvider(model=models[0])
+                        self.providers["ollama"] = OllamaProvider(model=models[0], keep_alive=keep_alive, num_ctx=num_ctx)
             except Exception:
                 pass
         
@@ -59,6 +72,15 @@ class AIManager:
         self.current_provider = self.providers.get(provider_name)
         
         self.conversation_history = []
+        self.cancel_event = threading.Event()  # Set to abandon the response being generated
+        self.last_cancelled = False
+        self.generation_lock = threading.Lock()  # One request to the model at a time, responses or completions
+        self.response_waiting = threading.Event()  # Set while a response wants the model, completions give way to it
+        self.prefill_thread = None
+        self.prefill_at = None  # perf_counter time of the last speculative prefill
+        self.ttft = {'prefilled': deque(maxlen=50), 'cold': deque(maxlen=50)}  # Seconds to first token
+        self.response_cache = response_cache  # Optional ResponseCache for repeated questions
+        self.semantic_cache = semantic_cache  # Optional SemanticCache for questions that mean the same
     
     def set_provider(self, provider_name):
         """Change the AI provider"""
@@ -69,8 +91,18 @@ class AIManager:
             return True
         return False
     
-    def get_response(self, text, system_prompt="", conversation_history=None):
-        """Get response from current AI provider"""
+    def get_response(self, text, system_prompt="", conversation_history=None, on_token=None, preset=None,
+                     cache_prompt=None):
+        """Get response from current AI provider
+        
+        If on_token is given and the provider supports streaming, it is called with
+        each piece of the response as it is generated. The full response is returned.
+        With a response or semantic cache, a repeated question is answered
+        from it, and on_token gets the whole answer at once. The caches are
+        keyed on `cache_prompt` (the system prompt by default), so parts of
+        the system prompt that change often, like the history summary, can
+        be left out of it.
+        """
         # Check if provider is available
         if not self.current_provider:
             if self.provider_name == "google":
@@ -87,22 +119,68 @@ class AIManager:
             if conversation_history is not None:
                 self.conversation_history = conversation_history
             
-            response = self.current_provider.get_response(
-                text, 
-                system_prompt, 
-                self.conversation_history
-            )
+            self.last_cancelled = False
+            started = time.perf_counter()
+            if cache_prompt is None:
+                cache_prompt = system_prompt
             
-            # Update conversation history
-            self.conversation_history.append({
-                'role': 'user',
-                'content': text
-            })
-            self.conversation_history.append({
-                'role': 'assistant',
-                'content': response
-            })
+            cache_key = scope = cached = None
+            if self.response_cache:
+                cache_key = self.response_cache.make_key(
+                    self.provider_name, self.get_model_name(), preset, cache_prompt, text, self.conversation_history)
+                cached = self.response_cache.get(cache_key) if cache_key else None
+            if cached is None and self.semantic_cache:
+                scope = self.semantic_cache.make_scope(self.provider_name, self.get_model_name(), preset, cache_prompt)
+                match = self.semantic_cache.lookup(text, scope) if scope else None
+                cached = match[0] if match else None
+            if cached is not None:
+                logger.info("Answering from the response cache")
+                if on_token:
+                    on_token(cached)
+                self._add_turn(text, cached)
+                return cached
+            
+            prefilled = self.prefill_at is not None and started - self.prefill_at < PREFILL_WINDOW
+            self.prefill_at = None
+            # Background completions (summaries) must not run alongside a response, and stop for one
+            self.response_waiting.set()
+            with self.generation_lock:
+                self.response_waiting.clear()
+                if on_token and hasattr(self.current_provider, 'stream_response'):
+                    # Stream tokens to the caller while collecting the full response
+                    chunks = []
+                    stream = self.current_provider.stream_response(
+                        text,
+                        system_prompt,
+                        self.conversation_history
+                    )
+                    for token in self._until_cancelled(stream):
+                        if not chunks:
+                            self.ttft['prefilled' if prefilled else 'cold'].append(time.perf_counter() - started)
+                        chunks.append(token)
+                        on_token(token)
+                    response = ''.join(chunks).strip()
+                else:
+                    def whole_response():
+                        yield self.current_provider.get_response(
+                            text, 
+                            system_prompt, 
+                            self.conversation_history
+                        )
+                    response = ''.join(self._until_cancelled(whole_response()))
+                self.last_cancelled = self.cancel_event.is_set()
+            
+            if response and not self.last_cancelled:
+                latency = time.perf_counter() - started
+                if cache_key:
+                    self.response_cache.put(cache_key, response, latency)
+                if scope:
+                    # Embedding the question can take a while, so it happens after the answer is out
+                    threading.Thread(target=self.semantic_cache.add, args=(text, response, scope, latency),
+                                     name="semantic-cache-add", daemon=True).start()
             
+            # Update conversation history
+            self._add_turn(text, response)
             return response
             
         except Exception as e:
@@ -111,6 +189,135 @@ class AIManager:
                 return "API key not valid. Please check your Google API key in settings."
             return "I'm having trouble thinking right now. Could you please try again?"
     
+    def _until_cancelled(self, stream):
+        """Yield from a provider stream until it ends or cancel() is called
+        
+        The stream is read on a worker thread, so a cancel is noticed straight
+        away, even while the model is still reading the prompt and no token
+        has come yet. The worker closes the stream when it next yields,
+        which stops generation on the provider's side.
+        """
+        items = queue.Queue()
+        stop = threading.Event()
+        done = object()
+        
+        def read():
+            try:
+                for item in stream:
+                    if stop.is_set() or self.cancel_event.is_set():
+                        break
+                    items.put(item)
+            except Exception as e:
+                items.put(e)
+            finally:
+                stream.close()
+                items.put(done)
+        
+        threading.Thread(target=read, name="ai-stream", daemon=True).start()
+        try:
+            while not self.cancel_event.is_set():
+                try:
+                    item = items.get(timeout=0.05)
+                except queue.Empty:
+                    continue
+                if item is done:
+                    return
+                if isinstance(item, Exception):
+                    raise item
+                yield item
+        finally:
+            stop.set()
+    
+    def _add_turn(self, text, response):
+        """Append a question and its answer to the conversation history"""
+        self.conversation_history.append({
+            'role': 'user',
+            'content': text
+        })
+        self.conversation_history.append({
+            'role': 'assistant',
+            'content': response
+        })
+    
+    def get_model_name(self):
+        """Name of the current provider's model"""
+        provider = self.current_provider
+        return getattr(provider, 'model_name', None) or getattr(provider, 'model', None)
+    
+    def complete(self, prompt, system_prompt=""):
+        """One-off answer outside the conversation, for housekeeping like summaries
+        
+        Safe to call from a background thread: it waits for any response
+        in progress and doesn't touch the provider's chat state. Responses
+        come first, so it gives up and returns "" when one is waiting.
+        """
+        provider = self.current_provider
+        if not provider:
+            raise RuntimeError(f"No {self.provider_name} provider available")
+        with self.generation_lock:
+            if self.response_waiting.is_set():
+                return ""
+            return provider.complete(prompt, system_prompt, self.response_waiting)
+    
+    def get_cache_stats(self):
+        """Hit rate and time saved by the exact and semantic response caches, if there are any"""
+        stats = self.response_cache.get_stats() if self.response_cache else {}
+        if self.semantic_cache:
+            stats['semantic'] = self.semantic_cache.get_stats()
+        return stats
+    
+    def prefill(self, system_prompt="", conversation_history=None, keep_alive=None):
+        """Start evaluating the prompt prefix in the background, before the user's message is known
+        
+        Returns False if the provider can't prefill or a prefill is already running.
+        """
+        provider = self.current_provider
+        if not hasattr(provider, 'prefill'):
+            return False
+        if self.prefill_thread and self.prefill_thread.is_alive():
+            return False
+        history = list(self.conversation_history if conversation_history is None else conversation_history)
+        self.prefill_at = time.perf_counter()
+        
+        def run():
+            start = time.perf_counter()
+            try:
+                provider.prefill(system_prompt, history, keep_alive=keep_alive)
+                logger.info(f"Prefilled {provider.model} with {len(history)} messages in {(time.perf_counter() - start) * 1000:.0f} ms")
+            except Exception as e:
+                logger.error(f"Error prefilling {provider.__class__.__name__}: {e}")
+        
+        self.prefill_thread = threading.Thread(target=run, name="ai-prefill", daemon=True)
+        self.prefill_thread.start()
+        return True
+    
+    def get_ttft_stats(self):
+        """Time to first streamed token in ms, for responses with and without a prefill"""
+        stats = {}
+        for kind, samples in self.ttft.items():
+            samples = sorted(samples)
+            if samples:
+                stats[kind] = {
+                    'count': len(samples),
+                    'mean_ms': round(sum(samples) / len(samples) * 1000),
+                    'median_ms': round(samples[len(samples) // 2] * 1000)
+                }
+        return stats
+    
+    def get_prompt_stats(self):
+        """Prompt evaluation counts from the current provider, if it reports them"""
+        if hasattr(self.current_provider, 'get_prompt_stats'):
+            return self.current_provider.get_prompt_stats()
+        return {}
+    
+    def cancel(self):
+        """Abandon the streaming response in progress, from any thread"""
+        self.cancel_event.set()
+    
+    def reset_cancel(self):
+        """Forget cancels of earlier responses; call when a request is accepted, before it can be cancelled"""
+        self.cancel_event.clear()
+    
     def get_conversation_history(self):
         """Get the current conversation history"""
         return self.conversation_history
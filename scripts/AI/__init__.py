@@ -1,5 +1,10 @@
 from .AI_manager import AIManager
 from .ollama import OllamaProvider
 from .google import GoogleProvider
+from .fake import FakeProvider
+from .residency import ModelResidencyManager
+from .response_cache import ResponseCache
+from .semantic_cache import SemanticCache
+from .history_manager import HistoryManager
 
-__all__ = ['AIManager', 'OllamaProvider', 'GoogleProvider']
+__all__ = ['AIManager', 'OllamaProvider', 'GoogleProvider', 'FakeProvider', 'ModelResidencyManager', 'ResponseCache', 'SemanticCache', 'HistoryManager']
@@ -0,0 +1,49 @@
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FakeProvider:
+    """Offline stand-in for an LLM with a fixed, configurable speed
+    
+    Replies deterministically so pipeline benchmarks measure the pipeline
+    rather than the model.
+    """
+    
+    def __init__(self, model="fake", first_token_delay=0.3, tokens_per_second=30, reply="Hoo! You said: {text}."):
+        self.model = model
+        self.first_token_delay = first_token_delay
+        self.tokens_per_second = tokens_per_second
+        self.reply = reply
+    
+    def _tokens(self, text):
+        """The reply split into word tokens"""
+        words = self.reply.format(text=text).split(' ')
+        return [word if i == 0 else ' ' + word for i, word in enumerate(words)]
+    
+    def get_response(self, text, system_prompt="", conversation_history=None):
+        """Whole reply after the time it would take to generate"""
+        tokens = self._tokens(text)
+        time.sleep(self.first_token_delay + len(tokens) / self.tokens_per_second)
+        return ''.join(tokens)
+    
+    def stream_response(self, text, system_prompt="", conversation_history=None):
+        """Yield the reply word by word at the configured speed"""
+        logger.info(f"Streaming response from fake model: {self.model}")
+        time.sleep(self.first_token_delay)
+        for token in self._tokens(text):
+            yield token
+            time.sleep(1 / self.tokens_per_second)
+    
+    def complete(self, prompt, system_prompt="", cancel_event=None):
+        """One-off answer, for summaries: the first words of the prompt, after the time they would take"""
+        words = prompt.split()[:40]
+        time.sleep(self.first_token_delay)
+        for _ in range(len(words)):
+            if cancel_event is not None and cancel_event.is_set():
+                return ""
+            time.sleep(1 / self.tokens_per_second)
+        return ' '.join(words)
+    
+    def test_connection(self):
+        return True
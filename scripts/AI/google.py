@@ -40,32 +40,38 @@ class GoogleProvider:
             logger.error(f"Error initializing Google Gemini model: {e}")
             raise
 
-    def get_response(self, prompt, system_prompt="", conversation_history=None):
-        """Get response from the model"""
+    def _prepare_session(self, system_prompt="", conversation_history=None):
+        """Make sure the chat session is ready and reflects the conversation history"""
         if not self.chat_session:
             if not self.api_key:
                 raise ValueError("API key not provided. Please set up the API key in settings.")
             self.initialize_model(self.api_key)
         
+        # If there's a new conversation history, restart the chat with the entire history
+        if conversation_history is not None and conversation_history != self.conversation_history:
+            # A copy, so turns rewritten in place (e.g. after an interruption) are noticed
+            self.conversation_history = list(conversation_history)
+            
+            # Convert history to Gemini format
+            history = []
+            if system_prompt:
+                history.append({"role": "user", "parts": [system_prompt]})
+                history.append({"role": "model", "parts": ["Understood."]})
+            
+            # Add conversation history
+            for msg in conversation_history:
+                role = "user" if msg['role'] == 'user' else "model"
+                history.append({"role": role, "parts": [msg['content']]})
+            
+            # Start new chat with full history
+            self.chat_session = self.model.start_chat(history=history)
+
+    def get_response(self, prompt, system_prompt="", conversation_history=None):
+        """Get response from the model"""
+        self._prepare_session(system_prompt, conversation_history)
+        
         try:
             logger.info(f"Getting response from Google using model: {self.model_name}")
-            # If there's a new conversation history, restart the chat with the entire history
-            if conversation_history is not None and conversation_history != self.conversation_history:
-                self.conversation_history = conversation_history
-                
-                # Convert history to Gemini format
-                history = []
-                if system_prompt:
-                    history.append({"role": "user", "parts": [system_prompt]})
-                    history.append({"role": "model", "parts": ["Understood."]})
-                
-                # Add conversation history
-                for msg in conversation_history:
-                    role = "user" if msg['role'] == 'user' else "model"
-                    history.append({"role": role, "parts": [msg['content']]})
-                
-                # Start new chat with full history
-                self.chat_session = self.model.start_chat(history=history)
             
             # Send the user's prompt and get response
             response = self.chat_session.send_message(prompt)
@@ -75,6 +81,48 @@ class GoogleProvider:
             logger.error(f"Error getting response from Google Gemini: {e}")
             raise
 
+    def complete(self, prompt, system_prompt="", cancel_event=None):
+        """One-off answer from a model of its own, leaving the chat session alone; "" once `cancel_event` is set"""
+        if not self.api_key:
+            raise ValueError("API key not provided. Please set up the API key in settings.")
+        
+        logger.info(f"Getting completion from Google using model: {self.model_name}")
+        genai.configure(api_key=self.api_key)
+        model = genai.GenerativeModel(
+            model_name=self.model_name,
+            generation_config=self.generation_config,
+            system_instruction=system_prompt or None
+        )
+        chunks = []
+        for chunk in model.generate_content(prompt, stream=True):
+            if cancel_event is not None and cancel_event.is_set():
+                logger.info("Abandoned the completion for a response")
+                return ""
+            chunks.append(chunk.text)
+        return ''.join(chunks).strip()
+
+    def stream_response(self, prompt, system_prompt="", conversation_history=None):
+        """Yield response text from the model as it is generated"""
+        self._prepare_session(system_prompt, conversation_history)
+        
+        try:
+            logger.info(f"Streaming response from Google using model: {self.model_name}")
+            
+            completed = False
+            try:
+                for chunk in self.chat_session.send_message(prompt, stream=True):
+                    if chunk.text:
+                        yield chunk.text
+                completed = True
+            finally:
+                if not completed:
+                    # A cut-off stream leaves the chat session unusable, rebuild it next time
+                    self.conversation_history = None
+                    
+        except Exception as e:
+            logger.error(f"Error getting response from Google Gemini: {e}")
+            raise
+
     def get_conversation_history(self):
         """Return the current conversation history"""
         return self.conversation_history
@@ -0,0 +1,177 @@
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# Tokens the chat template adds around each message
+MESSAGE_OVERHEAD = 4
+
+# Dropped messages kept for the summary if summarizing keeps failing
+MAX_PENDING = 40
+
+SUMMARY_PROMPT = (
+    "You keep notes on a conversation between a user and Ova, a desktop owl assistant. "
+    "Rewrite the notes to include the new exchanges, keeping names, facts about the user, "
+    "preferences and anything Ova promised. Reply with the notes only, in under {words} words."
+)
+
+def estimate_tokens(text):
+    """Rough token count, about four characters per token for English text"""
+    return len(text) // 4 + 1
+
+class HistoryManager:
+    """Keeps the conversation within a token budget, folding old turns into a summary
+    
+    Token counts are cached per message text. When the history is over
+    the budget for the current model (or has more than max_pairs pairs),
+    the oldest pairs are dropped trim_pairs at a time, so the start of the
+    prompt stays stable between trims. Dropped turns wait in `pending`
+    until summarize() folds them into a rolling summary, which is meant to
+    run in the background while Ova is idle or asleep. The summary goes
+    into the system prompt.
+    """
+    
+    def __init__(self, budget=2000, model_budgets=None, max_pairs=None, trim_pairs=4, summary_words=120, path=None):
+        self.budget = budget
+        self.model_budgets = model_budgets or {}  # Model name -> token budget for its history
+        self.max_pairs = max_pairs
+        self.trim_pairs = max(1, trim_pairs)
+        self.summary_words = summary_words
+        self.path = path  # JSON file for the summary and turns still waiting to be summarized
+        self.lock = threading.Lock()
+        self.token_counts = {}  # Message text -> estimated tokens
+        self.summary = ""
+        self.pending = []  # Dropped messages not yet in the summary
+        self.summary_thread = None
+        self.load()
+    
+    def count(self, message):
+        """Estimated tokens of one message, cached by its text"""
+        content = message['content']
+        tokens = self.token_counts.get(content)
+        if tokens is None:
+            tokens = self.token_counts[content] = estimate_tokens(content) + MESSAGE_OVERHEAD
+        return tokens
+    
+    def budget_for(self, model):
+        """History token budget for a model"""
+        return self.model_budgets.get(model, self.budget)
+    
+    def total(self, history):
+        """Estimated tokens of a history"""
+        return sum(self.count(message) for message in history)
+    
+    def fit(self, history, model=None):
+        """The history trimmed to the budget; returns the same list if nothing had to go"""
+        budget = self.budget_for(model) - estimate_tokens(self.summary)
+        max_messages = self.max_pairs * 2 if self.max_pairs else len(history)
+        tokens = self.total(history)
+        if tokens <= budget and len(history) <= max_messages:
+            return history
+        
+        # Drop whole blocks of pairs, but always keep the latest exchange
+        block = self.trim_pairs * 2
+        drop = 0
+        while drop + block < len(history) and (tokens > budget or len(history) - drop > max_messages):
+            tokens -= self.total(history[drop:drop + block])
+            drop += block
+        if tokens > budget or len(history) - drop > max_messages:
+            drop = max(len(history) - 2, 0)
+        kept = [self._shorten(message, budget) for message in history[drop:]]
+        
+        with self.lock:
+            self.pending.extend(history[:drop])
+            del self.pending[:-MAX_PENDING]
+        logger.info(f"History over budget, moved {drop} messages to the summary queue, keeping {len(kept)}")
+        # Forget counts of messages that are gone
+        self.token_counts = {message['content']: self.count(message) for message in kept + self.pending}
+        return kept
+    
+    def _shorten(self, message, budget):
+        """A message cut down to half the budget, for single answers too long to send whole"""
+        if self.count(message) <= budget // 2:
+            return message
+        return {'role': message['role'], 'content': message['content'][:max(budget // 2, 1) * 4] + "..."}
+    
+    def system_prompt(self, base_prompt):
+        """Personality prompt with the summary of earlier conversation added"""
+        if not self.summary:
+            return base_prompt
+        return f"{base_prompt}\n\nNotes on the earlier conversation:\n{self.summary}"
+    
+    def summarize(self, complete):
+        """Fold pending turns into the summary in the background
+        
+        `complete(prompt, system_prompt)` returns the model's text, or ""
+        if it gave way to a response, leaving the turns for next time.
+        Returns False if there is nothing to do or a summary is already running.
+        """
+        with self.lock:
+            if not self.pending or (self.summary_thread and self.summary_thread.is_alive()):
+                return False
+            turns = list(self.pending)
+            previous = self.summary
+        
+        def run():
+            transcript = '\n'.join(f"{'User' if m['role'] == 'user' else 'Ova'}: {m['content']}" for m in turns)
+            prompt = f"Notes so far:\n{previous or '(none)'}\n\nNew exchanges:\n{transcript}"
+            try:
+                summary = complete(prompt, SUMMARY_PROMPT.format(words=self.summary_words)).strip()
+            except Exception as e:
+                logger.error(f"Error summarizing history: {e}")
+                return
+            if not summary:
+                return
+            summarized = {id(message) for message in turns}
+            with self.lock:
+                self.summary = summary
+                self.pending = [message for message in self.pending if id(message) not in summarized]
+            logger.info(f"Summarized {len(turns)} old messages into {estimate_tokens(summary)} tokens")
+            self.save()
+        
+        with self.lock:
+            self.summary_thread = threading.Thread(target=run, name="history-summary", daemon=True)
+            self.summary_thread.start()
+        return True
+    
+    def load(self):
+        """Read the saved summary and pending turns, starting fresh if there are none"""
+        with self.lock:
+            self.summary = ""
+            self.pending = []
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            with self.lock:
+                self.summary = saved.get('summary', "")
+                self.pending = saved.get('pending', [])
+        except Exception as e:
+            logger.error(f"Error loading history summary: {e}")
+    
+    def save(self):
+        """Write the summary and pending turns"""
+        if not self.path:
+            return
+        try:
+            with self.lock:
+                data = json.dumps({'summary': self.summary, 'pending': self.pending})
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving history summary: {e}")
+    
+    def get_stats(self, history, model=None):
+        """Tokens in the history against the budget, and the summary's size"""
+        return {
+            'tokens': self.total(history),
+            'budget': self.budget_for(model),
+            'summary_tokens': estimate_tokens(self.summary) if self.summary else 0,
+            'pending_messages': len(self.pending)
+        }
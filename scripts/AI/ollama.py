@@ -1,46 +1,163 @@
 from ollama import Client
 import logging
+from collections import deque
 
 logger = logging.getLogger(__name__)
 
+# Load times above this mean the model really had to be read into memory
+COLD_LOAD_MS = 250
+
 class OllamaProvider:
-    def __init__(self, host='http://localhost:11434', model='llama3.2:latest'):
-        """Initialize Ollama provider"""
+    def __init__(self, host='http://localhost:11434', model='llama3.2:latest', keep_alive=None, num_ctx=None):
+        """Initialize Ollama provider
+        
+        Ollama reuses its cached evaluation of the longest prompt prefix it
+        has already seen, so keeping the model loaded (keep_alive) and the
+        context large enough that nothing is cut off the front (num_ctx)
+        lets each turn only evaluate what is new.
+        """
         self.client = Client(host=host)
         self.model = model
+        self.keep_alive = keep_alive
+        self.options = {'num_ctx': num_ctx} if num_ctx else {}
+        self.prompt_stats = deque(maxlen=50)  # How much of each prompt Ollama had to evaluate
         
-    def get_response(self, text, system_prompt="", conversation_history=None):
-        """Get response from Ollama"""
-        try:
-            logger.info(f"Getting response from Ollama using model: {self.model}")
-            # Build messages array
-            messages = []
-            
-            # Add system prompt if provided
-            if system_prompt:
-                messages.append({
-                    'role': 'system',
-                    'content': system_prompt
-                })
-            
-            # Add conversation history if provided
-            if conversation_history:
-                messages.extend(conversation_history)
-            
-            # Add current message
+    def _build_messages(self, text, system_prompt="", conversation_history=None):
+        """Build the messages array sent to Ollama, without a user message if text is None"""
+        messages = []
+        
+        # Add system prompt if provided
+        if system_prompt:
+            messages.append({
+                'role': 'system',
+                'content': system_prompt
+            })
+        
+        # Add conversation history if provided
+        if conversation_history:
+            messages.extend(conversation_history)
+        
+        # Add current message
+        if text is not None:
             messages.append({
                 'role': 'user',
                 'content': text
             })
+        return messages
+        
+    def get_response(self, text, system_prompt="", conversation_history=None):
+        """Get response from Ollama"""
+        try:
+            logger.info(f"Getting response from Ollama using model: {self.model}")
+            messages = self._build_messages(text, system_prompt, conversation_history)
             
             # Get response from Ollama
-            response = self.client.chat(model=self.model, messages=messages)
+            response = self.client.chat(model=self.model, messages=messages, options=self.options, keep_alive=self.keep_alive)
+            self._record_prompt('chat', messages, response)
             return response['message']['content']
             
         except Exception as e:
             logger.error(f"Ollama error: {e}")
             raise
     
+    def stream_response(self, text, system_prompt="", conversation_history=None):
+        """Yield response tokens from Ollama as they are generated"""
+        try:
+            logger.info(f"Streaming response from Ollama using model: {self.model}")
+            messages = self._build_messages(text, system_prompt, conversation_history)
+            
+            stream = self.client.chat(model=self.model, messages=messages, stream=True, options=self.options, keep_alive=self.keep_alive)
+            try:
+                for chunk in stream:
+                    token = chunk['message']['content']
+                    if token:
+                        yield token
+                    if chunk.get('done'):
+                        self._record_prompt('chat', messages, chunk)
+            finally:
+                # Closing early drops the HTTP connection, which makes Ollama stop generating
+                stream.close()
+                    
+        except Exception as e:
+            logger.error(f"Ollama error: {e}")
+            raise
+    
+    def complete(self, prompt, system_prompt="", cancel_event=None):
+        """One-off answer with generate, outside any conversation and keeping no state here
+        
+        Streamed so it can be abandoned between tokens once `cancel_event`
+        is set, in which case "" is returned.
+        """
+        logger.info(f"Getting completion from Ollama using model: {self.model}")
+        stream = self.client.generate(model=self.model, prompt=prompt, system=system_prompt, stream=True,
+                                      options=self.options, keep_alive=self.keep_alive)
+        chunks = []
+        try:
+            for chunk in stream:
+                if cancel_event is not None and cancel_event.is_set():
+                    logger.info("Abandoned the completion for a response")
+                    return ""
+                chunks.append(chunk['response'])
+        finally:
+            # Closing the connection stops the generation
+            stream.close()
+        return ''.join(chunks)
+    
+    def prefill(self, system_prompt="", conversation_history=None, keep_alive=None):
+        """Load the model and evaluate the prompt prefix so the next chat starts sooner
+        
+        Sends the system prompt and history without the user's message yet.
+        Ollama keeps the evaluated prefix cached, so the real request only
+        has to process the new message. One token is generated because
+        num_predict=0 does not mean "none" on every Ollama version.
+        """
+        messages = self._build_messages(None, system_prompt, conversation_history)
+        options = dict(self.options, num_predict=1)
+        response = self.client.chat(model=self.model, messages=messages, options=options,
+                                    keep_alive=self.keep_alive if keep_alive is None else keep_alive)
+        self._record_prompt('prefill', messages, response)
+    
+    def load(self, keep_alive=None):
+        """Load the model into memory without generating; returns Ollama's load time in ms"""
+        response = self.client.chat(model=self.model, messages=[],
+                                    keep_alive=self.keep_alive if keep_alive is None else keep_alive)
+        return round((response.get('load_duration') or 0) / 1e6)
+    
+    def unload(self):
+        """Ask Ollama to free the model's memory now"""
+        self.client.chat(model=self.model, messages=[], keep_alive=0)
+    
+    def _record_prompt(self, kind, messages, response):
+        """Note the prompt evaluation counts Ollama reports with its final chunk"""
+        # Ollama leaves out counts that are zero, as when the whole prompt was cached
+        stats = {
+            'kind': kind,
+            'messages': len(messages),
+            'prompt_eval_count': response.get('prompt_eval_count') or 0,
+            'prompt_eval_ms': round((response.get('prompt_eval_duration') or 0) / 1e6),
+            'load_ms': round((response.get('load_duration') or 0) / 1e6)
+        }
+        self.prompt_stats.append(stats)
+        logger.info(f"Ollama evaluated {stats['prompt_eval_count']} prompt tokens of {len(messages)} messages "
+                    f"in {stats['prompt_eval_ms']} ms ({kind})")
+        if stats['load_ms'] >= COLD_LOAD_MS:
+            logger.info(f"Cold load of {self.model} delayed the {kind} by {stats['load_ms']} ms")
+    
+    def get_prompt_stats(self):
+        """Prompt tokens evaluated per request, for chats and prefills, with the latest chat"""
+        samples = list(self.prompt_stats)
+        stats = {}
+        for kind in ('chat', 'prefill'):
+            turns = [sample for sample in samples if sample['kind'] == kind]
+            if turns:
+                stats[kind] = {
+                    'count': len(turns),
+                    'mean_prompt_eval_count': round(sum(turn['prompt_eval_count'] for turn in turns) / len(turns)),
+                    'mean_prompt_eval_ms': round(sum(turn['prompt_eval_ms'] for turn in turns) / len(turns)),
+                    'last': turns[-1]
+                }
+        return stats
+    
     def test_connection(self):
         """Test if Ollama is running and model is available"""
         try:
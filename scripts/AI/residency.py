@@ -0,0 +1,106 @@
+import time
+import logging
+import threading
+from collections import deque
+from .ollama import COLD_LOAD_MS
+
+logger = logging.getLogger(__name__)
+
+# States in which Ova is about to need the model
+WAKING_STATES = ('waking_up', 'listening')
+
+class ModelResidencyManager:
+    """Keeps the model loaded while Ova is awake and frees it while she sleeps
+    
+    Driven by the pet's animation states. Policies (model_residency):
+    'awake' loads the model at startup and whenever Ova wakes up or
+    starts listening, and unloads it once she has slept for
+    `release_after` seconds; 'always' keeps it loaded for as long as the
+    app runs, and 'ollama' leaves it to Ollama's own keep_alive timer.
+    Pass preload=False when the model is already loaded, e.g. after a
+    settings reload that kept it.
+    """
+    
+    def __init__(self, ai_manager, policy='awake', keep_alive='30m', release_after=120, preload=True):
+        self.ai_manager = ai_manager
+        self.policy = policy
+        self.keep_alive = -1 if policy == 'always' else keep_alive
+        self.release_after = release_after
+        self.release_timer = None
+        self.load_thread = None
+        self.loads = deque(maxlen=50)  # (load ms, whether it was a cold load)
+        self.releases = 0
+        
+        provider = self.ai_manager.current_provider
+        if policy != 'ollama' and hasattr(provider, 'keep_alive'):
+            # Every request resets Ollama's timer, so chats have to ask for the same residency
+            provider.keep_alive = self.keep_alive
+        if policy != 'ollama' and preload:
+            # Ova starts out awake
+            self.preload()
+    
+    def on_state(self, state):
+        """Follow one of the pet's state changes"""
+        if self.policy == 'ollama':
+            return
+        if state == 'asleep':
+            if self.policy == 'awake' and self.release_timer is None:
+                from scheduler import get_scheduler  # Here so the AI package itself doesn't need Qt
+                self.release_timer = get_scheduler().call_later(self.release_after, self.release, name="model_release")
+            return
+        
+        self.cancel_release()
+        if state in WAKING_STATES:
+            self.preload()
+    
+    def cancel_release(self):
+        """Keep the model if a release was coming up"""
+        if self.release_timer:
+            self.release_timer.cancel()
+            self.release_timer = None
+    
+    def preload(self):
+        """Load the model in the background; returns False if a load is already running"""
+        provider = self.ai_manager.current_provider
+        if not hasattr(provider, 'load'):
+            return False
+        if self.load_thread and self.load_thread.is_alive():
+            return False
+        
+        def run():
+            start = time.perf_counter()
+            try:
+                load_ms = provider.load(self.keep_alive)
+            except Exception as e:
+                logger.error(f"Error preloading {provider.model}: {e}")
+                return
+            cold = load_ms >= COLD_LOAD_MS
+            self.loads.append((load_ms, cold))
+            logger.info(f"{'Cold' if cold else 'Warm'} load of {provider.model}: Ollama took {load_ms} ms, "
+                        f"request took {(time.perf_counter() - start) * 1000:.0f} ms")
+        
+        self.load_thread = threading.Thread(target=run, name="model-preload", daemon=True)
+        self.load_thread.start()
+        return True
+    
+    def release(self):
+        """Unload the model to free its memory while Ova sleeps"""
+        self.release_timer = None
+        provider = self.ai_manager.current_provider
+        if not hasattr(provider, 'unload'):
+            return
+        try:
+            provider.unload()
+            self.releases += 1
+            logger.info(f"Released {provider.model} while Ova sleeps")
+        except Exception as e:
+            logger.error(f"Error releasing {provider.model}: {e}")
+    
+    def get_stats(self):
+        """Cold and warm load counts and times in ms, and how often the model was released"""
+        stats = {'policy': self.policy, 'releases': self.releases}
+        for kind, cold in (('cold', True), ('warm', False)):
+            samples = [load_ms for load_ms, was_cold in self.loads if was_cold == cold]
+            if samples:
+                stats[kind] = {'count': len(samples), 'mean_ms': round(sum(samples) / len(samples))}
+        return stats
@@ -0,0 +1,123 @@
+import os
+import re
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+def normalize_prompt(text):
+    """Lowercase words without punctuation, so "Tell me a joke!" and "tell me a joke" match"""
+    return ' '.join(re.findall(r"[a-z0-9']+", text.lower()))
+
+def fingerprint(value):
+    """Short stable hash of anything JSON can hold"""
+    return hashlib.sha1(json.dumps(value, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+class ResponseCache:
+    """Answers to questions Ova was already asked, so repeats skip the model
+    
+    Entries are keyed on the provider, model, preset (and its prompt),
+    the normalized question and, if history_turns is set, the last few
+    messages of the conversation. They expire after `ttl` seconds, the
+    least recently used are dropped beyond `max_entries`, and the cache
+    is saved as JSON. Presets in `disabled_presets` are never cached, for
+    personalities that should answer differently every time.
+    """
+    
+    def __init__(self, path=None, max_entries=200, ttl=24 * 3600, history_turns=0, disabled_presets=None):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.history_turns = history_turns  # Messages of history that must match too, 0 to ignore history
+        self.disabled_presets = set(disabled_presets or [])
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> {'response', 'created', 'latency'}, oldest use first
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.load()
+    
+    def make_key(self, provider, model, preset, system_prompt, text, history=None):
+        """Cache key for a question, or None if this preset opted out"""
+        if preset in self.disabled_presets:
+            return None
+        parts = [provider, model, preset, fingerprint(system_prompt), normalize_prompt(text)]
+        if self.history_turns and history:
+            parts.append(fingerprint(history[-self.history_turns:]))
+        return fingerprint(parts)
+    
+    def get(self, key):
+        """Cached response for a key, or None if missing or expired"""
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and time.time() - entry['created'] > self.ttl:
+                del self.entries[key]
+                entry = None
+            if not entry:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            self.saved_seconds += entry['latency']
+            return entry['response']
+    
+    def put(self, key, response, latency):
+        """Remember a response and how long the model took to give it"""
+        with self.lock:
+            self.entries[key] = {'response': response, 'created': time.time(), 'latency': round(latency, 3)}
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+        self.save()
+    
+    def load(self):
+        """Read saved entries from disk, skipping expired ones"""
+        if not self.path or not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+            now = time.time()
+            with self.lock:
+                for key, entry in saved:
+                    if now - entry['created'] <= self.ttl:
+                        self.entries[key] = entry
+            logger.info(f"Loaded {len(self.entries)} cached responses")
+        except Exception as e:
+            logger.error(f"Error loading response cache: {e}")
+    
+    def save(self):
+        """Write entries to disk in least recently used order"""
+        if not self.path:
+            return
+        try:
+            with self.lock:
+                data = json.dumps(list(self.entries.items()))
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w', encoding='utf-8') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving response cache: {e}")
+    
+    def clear(self):
+        """Forget every cached response"""
+        with self.lock:
+            self.entries.clear()
+        self.save()
+    
+    def get_stats(self):
+        """Entries, hit rate and model time saved by hits"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'saved_ms': round(self.saved_seconds * 1000)
+            }
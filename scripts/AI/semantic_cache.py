@@ -0,0 +1,536 @@
+import os
+import json
+import time
+import zlib
+import logging
+import threading
+import numpy as np
+from collections import deque, OrderedDict
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeout
+from ollama import Client
+from .response_cache import normalize_prompt, fingerprint
+
+logger = logging.getLogger(__name__)
+
+# Logged entries before the entries file is rewritten, at least
+MIN_LOG_RECORDS = 64
+
+class HashingEmbedder:
+    """Offline stand-in for an embedding model, for tests and benchmarks only
+    
+    Words and character trigrams are hashed into a fixed size vector, so
+    questions sharing most of their words land close together. It can't
+    match paraphrases, and unrelated questions with words in common score
+    as high as real matches, so the app never uses it to answer the user.
+    """
+    
+    def __init__(self, dim=256):
+        self.dim = dim
+        self.name = f'hashing{dim}'
+    
+    def _add(self, vector, feature, weight):
+        """Signed feature hashing, stable across runs unlike hash()"""
+        code = zlib.crc32(feature.encode('utf-8'))
+        vector[code % self.dim] += weight if code & 0x80000000 else -weight
+    
+    def embed(self, text):
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for word in normalize_prompt(text).split():
+            self._add(vector, word, 1.0)
+            padded = f' {word} '
+            for i in range(len(padded) - 2):
+                self._add(vector, padded[i:i + 3], 0.5)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class OllamaEmbedder:
+    """Embeddings from a local Ollama model such as nomic-embed-text"""
+    
+    def __init__(self, model='nomic-embed-text', host='http://localhost:11434'):
+        self.client = Client(host=host)
+        self.model = model
+        self.name = f'ollama:{model}'
+    
+    def available(self):
+        """Whether the embedding model has been pulled"""
+        try:
+            self.client.show(self.model)
+            return True
+        except Exception as e:
+            logger.warning(f"Embedding model {self.model} is not available: {e}")
+            return False
+    
+    def embed(self, text):
+        response = self.client.embeddings(model=self.model, prompt=text)
+        vector = np.asarray(response['embedding'], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+class VectorIndex:
+    """Unit vectors in one float32 matrix, searched by cosine similarity
+    
+    The matrix can be memory-mapped from a raw file that grows by doubling,
+    so adds are incremental and nothing is parsed at startup. Up to
+    `ivf_threshold` vectors every row is scored; past that the rows are
+    clustered with k-means (an inverted file index) and only the `nprobe`
+    clusters nearest the query are scanned, retraining with train() each
+    time the index doubles.
+    """
+    
+    def __init__(self, dim, path=None, count=0, capacity=1024, ivf_threshold=2000, nprobe=8):
+        self.dim = dim
+        self.path = path  # Raw float32 file, or None to keep the matrix in memory
+        self.count = count
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.vectors = None
+        self._allocate(max(capacity, count))
+        
+        # Inverted file index, trained once there are enough vectors
+        self.centroids = None
+        self.assignments = np.zeros(len(self.vectors), dtype=np.int32)
+        self.trained_at = 0
+        self.training = False
+        self.changed = None  # Rows set while training, filed again once it's done
+        self.order = None  # Rows sorted by cluster, and where each cluster starts in it
+        self.bounds = None
+    
+    def _allocate(self, capacity):
+        """Make room for `capacity` rows, keeping existing ones"""
+        if not self.path:
+            vectors = np.zeros((capacity, self.dim), dtype=np.float32)
+            if self.vectors is not None:
+                vectors[:self.count] = self.vectors[:self.count]
+            self.vectors = vectors
+            return
+        
+        if self.vectors is not None:
+            # The old mapping has to be closed before the file can grow (on Windows)
+            self.vectors.flush()
+            self.vectors = None
+        size = capacity * self.dim * 4
+        with open(self.path, 'ab') as f:
+            if f.tell() < size:
+                f.truncate(size)
+        self.vectors = np.memmap(self.path, dtype=np.float32, mode='r+', shape=(capacity, self.dim))
+    
+    def add(self, vector):
+        """Append a vector, returning its row"""
+        if self.count == len(self.vectors):
+            self._allocate(self.count * 2)
+            assignments = np.zeros(len(self.vectors), dtype=np.int32)
+            assignments[:self.count] = self.assignments[:self.count]
+            self.assignments = assignments
+        row = self.count
+        self.count += 1
+        self.set(row, vector)
+        return row
+    
+    def set(self, row, vector):
+        """Replace the vector in a row"""
+        self.vectors[row] = vector
+        if self.changed is not None:
+            self.changed.append(row)
+        if self.centroids is not None:
+            self.assignments[row] = int(np.argmax(self.centroids @ vector))
+            self.order = None
+    
+    def needs_training(self):
+        """Whether the index has grown enough to be clustered (again)"""
+        return not self.training and self.count >= self.ivf_threshold and self.count >= self.trained_at * 2
+    
+    def train(self, lock=None, iterations=8, seed=0):
+        """Cluster the vectors with spherical k-means on a sample, then file every row under its cluster
+        
+        Adds and searches carry on meanwhile: `lock`, the one their caller
+        holds, is only taken to copy the sample and each block of rows and
+        to swap the new clustering in. Returns False if none was needed.
+        """
+        lock = lock or threading.Lock()
+        start = time.perf_counter()
+        with lock:
+            if not self.needs_training():
+                return False
+            self.training = True
+            self.changed = []
+            count = self.count
+            clusters = int(np.sqrt(count))
+            rng = np.random.default_rng(seed)
+            sample = self.vectors[np.sort(rng.choice(count, min(count, clusters * 64), replace=False))]
+        
+        try:
+            centroids = sample[rng.choice(len(sample), clusters, replace=False)].copy()
+            for _ in range(iterations):
+                labels = np.argmax(sample @ centroids.T, axis=1)
+                sums = np.zeros_like(centroids)
+                np.add.at(sums, labels, sample)
+                norms = np.linalg.norm(sums, axis=1, keepdims=True)
+                # Empty clusters keep their old centroid
+                centroids = np.where(norms > 0, sums / np.maximum(norms, 1e-12), centroids)
+            
+            assignments = np.empty(count, dtype=np.int32)
+            for begin in range(0, count, 8192):
+                end = min(begin + 8192, count)
+                with lock:
+                    block = np.array(self.vectors[begin:end])
+                assignments[begin:end] = np.argmax(block @ centroids.T, axis=1)
+            
+            with lock:
+                self.assignments[:count] = assignments
+                # Rows added or replaced since the snapshot
+                for row in set(self.changed) | set(range(count, self.count)):
+                    self.assignments[row] = int(np.argmax(centroids @ self.vectors[row]))
+                self.centroids = centroids
+                self.trained_at = count
+                self.order = None
+        finally:
+            with lock:
+                self.training = False
+                self.changed = None
+        logger.info(f"Clustered {count} cached prompts into {clusters} lists in {(time.perf_counter() - start) * 1000:.0f} ms")
+        return True
+    
+    def _candidates(self, query):
+        """Rows in the clusters nearest the query"""
+        if self.order is None:
+            self.order = np.argsort(self.assignments[:self.count], kind='stable')
+            self.bounds = np.searchsorted(self.assignments[self.order], np.arange(len(self.centroids) + 1))
+        scores = self.centroids @ query
+        probes = np.argpartition(-scores, min(self.nprobe, len(scores) - 1))[:self.nprobe]
+        return np.concatenate([self.order[self.bounds[c]:self.bounds[c + 1]] for c in probes])
+    
+    def search(self, query, k=5, exact=False, allowed=None):
+        """Up to k (row, cosine similarity) pairs, most similar first
+        
+        `allowed` is an optional boolean per row; other rows are left out
+        before ranking, so they can't crowd out the ones that count.
+        """
+        if not self.count:
+            return []
+        if self.centroids is None or exact:
+            rows = None if allowed is None else np.flatnonzero(allowed[:self.count])
+        else:
+            rows = self._candidates(query)
+            if allowed is not None:
+                rows = rows[allowed[rows]]
+        scores = self.vectors[:self.count] @ query if rows is None else self.vectors[rows] @ query
+        k = min(k, len(scores))
+        if not k:
+            return []
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.argsort(-scores[best])]
+        return [(int(rows[i] if rows is not None else i), float(scores[i])) for i in best]
+    
+    def save(self, ivf_path):
+        """Flush the matrix and store the clustering next to it"""
+        if isinstance(self.vectors, np.memmap):
+            self.vectors.flush()
+        if self.centroids is not None:
+            np.savez(ivf_path, centroids=self.centroids, assignments=self.assignments[:self.count],
+                     trained_at=self.trained_at)
+    
+    def load_ivf(self, ivf_path):
+        """Reuse a saved clustering instead of training again, filing rows added since it was saved"""
+        try:
+            with np.load(ivf_path) as saved:
+                saved_count = len(saved['assignments'])
+                if saved_count > self.count or saved['centroids'].shape[1] != self.dim:
+                    return False
+                self.centroids = saved['centroids']
+                self.assignments[:saved_count] = saved['assignments']
+                if saved_count < self.count:
+                    self.assignments[saved_count:self.count] = np.argmax(
+                        self.vectors[saved_count:self.count] @ self.centroids.T, axis=1)
+                self.trained_at = int(saved['trained_at'])
+                self.order = None
+            return True
+        except Exception as e:
+            logger.error(f"Error loading cache clustering: {e}")
+            return False
+
+class SemanticCache:
+    """Answers to questions that mean the same as one Ova was already asked
+    
+    Prompts are embedded and kept in a VectorIndex; a new question whose
+    nearest cached prompt, for the same provider, model and preset, is at
+    least `threshold` similar gets that prompt's answer. Lives in a
+    directory with the raw vectors, their entries as JSON and the
+    clustering. New entries are appended to a log, which is folded into
+    the entries file once it is as long as the cache, so adding stays
+    cheap however big the cache gets. Past `max_entries` the oldest
+    entries are overwritten.
+    
+    Lookups sit in front of every uncached answer, so one waits at most
+    `lookup_timeout` seconds for the question's embedding (a cold
+    embedding model takes far longer) and counts as a miss after that.
+    The embedding carries on in the background and is reused by add().
+    """
+    
+    def __init__(self, embedder, path=None, threshold=0.9, max_entries=5000, ttl=24 * 3600,
+                 disabled_presets=None, ivf_threshold=2000, nprobe=8, lookup_timeout=0.15):
+        self.embedder = embedder
+        self.path = path  # Directory, or None to keep everything in memory
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.disabled_presets = set(disabled_presets or [])
+        self.ivf_threshold = ivf_threshold
+        self.nprobe = nprobe
+        self.lookup_timeout = lookup_timeout
+        self.lock = threading.Lock()
+        self.save_lock = threading.Lock()
+        self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="semantic-cache-embed")
+        self.recent_vectors = OrderedDict()  # Question -> embedding, for the last few lookups
+        self.entries = []  # Row -> {'prompt', 'response', 'scope', 'created', 'latency'}
+        self.scope_ids = {}  # Scope -> small number, kept per row in row_scopes
+        self.row_scopes = np.zeros(0, dtype=np.int32)
+        self.next_replace = 0  # Oldest row, overwritten once the cache is full
+        self.log_records = 0  # Entries in the log, not yet in the entries file
+        self.index = None
+        self.hits = 0
+        self.misses = 0
+        self.saved_seconds = 0.0
+        self.embed_times = deque(maxlen=200)
+        self.search_times = deque(maxlen=200)
+        self.lookup_timeouts = 0
+        self.load()
+    
+    def _files(self):
+        return (os.path.join(self.path, 'entries.json'), os.path.join(self.path, 'vectors.f32'),
+                os.path.join(self.path, 'ivf.npz'))
+    
+    def _log_files(self):
+        """The entries log, and the previous one while it is being folded in"""
+        log_path = os.path.join(self.path, 'entries.log')
+        return log_path + '.old', log_path
+    
+    def _new_index(self, dim, count=0):
+        vectors_path = self._files()[1] if self.path else None
+        return VectorIndex(dim, vectors_path, count=count, ivf_threshold=self.ivf_threshold, nprobe=self.nprobe)
+    
+    def load(self):
+        """Open a saved cache made with the same embedder, or start empty"""
+        if not self.path:
+            return
+        entries_path, vectors_path, ivf_path = self._files()
+        try:
+            if os.path.exists(entries_path) and os.path.exists(vectors_path):
+                with open(entries_path, 'r', encoding='utf-8') as f:
+                    saved = json.load(f)
+                if saved.get('embedder') != self.embedder.name:
+                    logger.info(f"Semantic cache was made with {saved.get('embedder')}, starting a new one")
+                else:
+                    self.entries = saved['entries']
+                    self.next_replace = saved.get('next_replace', 0)
+                    replaced = self._replay_log()
+                    for row, entry in enumerate(self.entries):
+                        self._set_scope(row, entry['scope'])
+                    self.index = self._new_index(saved['dim'], len(self.entries))
+                    if os.path.exists(ivf_path) and self.index.load_ivf(ivf_path):
+                        for row in replaced:
+                            self.index.set(row, self.index.vectors[row])
+                    logger.info(f"Loaded {len(self.entries)} semantically cached responses")
+                    if self.index.needs_training():
+                        threading.Thread(target=self._train, name="semantic-cache-train", daemon=True).start()
+                    return
+        except Exception as e:
+            logger.error(f"Error loading semantic cache: {e}")
+        self.entries = []
+        for stale_path in (vectors_path, ivf_path) + self._log_files():
+            if os.path.exists(stale_path):
+                os.remove(stale_path)
+    
+    def _replay_log(self):
+        """Apply logged entries on top of the entries file; returns the rows that were replaced"""
+        replaced = []
+        self.log_records = 0
+        for log_path in self._log_files():
+            if not os.path.exists(log_path):
+                continue
+            with open(log_path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except ValueError:
+                        break  # Cut off by a crash mid-write
+                    row = record['row']
+                    if row < len(self.entries):
+                        self.entries[row] = record['entry']
+                        replaced.append(row)
+                    elif row == len(self.entries):
+                        self.entries.append(record['entry'])
+                    self.next_replace = record['next_replace']
+                    self.log_records += 1
+        return replaced
+    
+    def _log(self, row, entry):
+        """Append a new or replaced entry to the log; False when the entries file is due a rewrite instead"""
+        if not self.path:
+            return True
+        if self.log_records >= max(len(self.entries), MIN_LOG_RECORDS) or not os.path.exists(self._files()[0]):
+            return False
+        try:
+            # The vector itself is already in the memory-mapped file
+            with open(self._log_files()[1], 'a', encoding='utf-8') as f:
+                f.write(json.dumps({'row': row, 'next_replace': self.next_replace, 'entry': entry}) + '\n')
+            self.log_records += 1
+            return True
+        except Exception as e:
+            logger.error(f"Error logging semantic cache entry: {e}")
+            return False
+    
+    def save(self):
+        """Rewrite the entries file with everything logged so far, and flush the vectors"""
+        if not self.path or self.index is None:
+            return
+        entries_path, _, ivf_path = self._files()
+        old_log_path, log_path = self._log_files()
+        try:
+            with self.save_lock:
+                with self.lock:
+                    data = json.dumps({
+                        'embedder': self.embedder.name,
+                        'dim': self.index.dim,
+                        'next_replace': self.next_replace,
+                        'entries': self.entries
+                    })
+                    self.index.save(ivf_path)
+                    # New entries go to a fresh log; the old one is replayed too if this save doesn't finish
+                    if os.path.exists(log_path):
+                        os.replace(log_path, old_log_path)
+                    self.log_records = 0
+                temp_path = entries_path + '.tmp'
+                with open(temp_path, 'w', encoding='utf-8') as f:
+                    f.write(data)
+                os.replace(temp_path, entries_path)
+                if os.path.exists(old_log_path):
+                    os.remove(old_log_path)
+        except Exception as e:
+            logger.error(f"Error saving semantic cache: {e}")
+    
+    def _train(self):
+        """Cluster the index if it has grown enough, without holding up lookups, and keep the clustering"""
+        if self.index.train(self.lock):
+            self.save()
+    
+    def make_scope(self, provider, model, preset, system_prompt):
+        """Which cached answers a question may get, or None if this preset opted out"""
+        if preset in self.disabled_presets:
+            return None
+        return fingerprint([provider, model, preset, fingerprint(system_prompt)])
+    
+    def _set_scope(self, row, scope):
+        """Note which scope a row belongs to"""
+        if row >= len(self.row_scopes):
+            row_scopes = np.zeros(max(row + 1, len(self.row_scopes) * 2, 64), dtype=np.int32)
+            row_scopes[:len(self.row_scopes)] = self.row_scopes
+            self.row_scopes = row_scopes
+        self.row_scopes[row] = self.scope_ids.setdefault(scope, len(self.scope_ids))
+    
+    def _embed(self, text):
+        """Embedding of a question, or None if the embedder failed"""
+        with self.lock:
+            vector = self.recent_vectors.get(text)
+        if vector is not None:
+            return vector
+        start = time.perf_counter()
+        try:
+            vector = self.embedder.embed(text)
+        except Exception as e:
+            logger.error(f"Error embedding with {self.embedder.name}: {e}")
+            return None
+        self.embed_times.append(time.perf_counter() - start)
+        with self.lock:
+            self.recent_vectors[text] = vector
+            while len(self.recent_vectors) > 32:
+                self.recent_vectors.popitem(last=False)
+        return vector
+    
+    def lookup(self, text, scope):
+        """(response, similarity) of the closest cached question in scope, or None"""
+        with self.lock:
+            scope_id = self.scope_ids.get(scope)
+            if scope_id is None:
+                # Nothing cached in this scope, no need to embed the question now
+                self.misses += 1
+                return None
+        
+        try:
+            vector = self.executor.submit(self._embed, text).result(timeout=self.lookup_timeout)
+        except FutureTimeout:
+            logger.info(f"Semantic cache lookup gave up waiting for the embedding after {self.lookup_timeout}s")
+            with self.lock:
+                self.lookup_timeouts += 1
+                self.misses += 1
+            return None
+        now = time.time()
+        with self.lock:
+            if vector is None or self.index is None or self.index.dim != len(vector):
+                self.misses += 1
+                return None
+            start = time.perf_counter()
+            matches = self.index.search(vector, k=8, allowed=self.row_scopes == scope_id)
+            self.search_times.append(time.perf_counter() - start)
+            for row, score in matches:
+                if score < self.threshold:
+                    break
+                entry = self.entries[row]
+                if now - entry['created'] <= self.ttl:
+                    self.hits += 1
+                    self.saved_seconds += entry['latency']
+                    logger.info(f"Semantic cache hit ({score:.2f}): \"{text}\" ~ \"{entry['prompt']}\"")
+                    return entry['response'], score
+            self.misses += 1
+            return None
+    
+    def add(self, text, response, scope, latency):
+        """Remember an answer under its question's embedding"""
+        # Queued behind the lookup's embedding of the same question, which it then reuses
+        vector = self.executor.submit(self._embed, text).result()
+        if vector is None:
+            return
+        entry = {'prompt': text, 'response': response, 'scope': scope,
+                 'created': time.time(), 'latency': round(latency, 3)}
+        with self.lock:
+            if self.index is None:
+                self.index = self._new_index(len(vector))
+            if len(self.entries) < self.max_entries:
+                row = self.index.add(vector)
+                self.entries.append(entry)
+            else:
+                row = self.next_replace
+                self.index.set(row, vector)
+                self.entries[row] = entry
+                self.next_replace = (row + 1) % self.max_entries
+            self._set_scope(row, scope)
+            logged = self._log(row, entry)
+        if not logged:
+            self.save()
+        # Called from a background thread, so clustering can take its time here
+        self._train()
+    
+    def get_stats(self):
+        """Entries, hit rate, model time saved, and embedding and search times in ms"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            stats = {
+                'entries': len(self.entries),
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0,
+                'saved_ms': round(self.saved_seconds * 1000),
+                'lookup_timeouts': self.lookup_timeouts
+            }
+        for name, samples in (('embed_ms', self.embed_times), ('search_ms', self.search_times)):
+            samples = list(samples)
+            if samples:
+                stats[name] = round(sum(samples) / len(samples) * 1000, 3)
+        return stats
+
+def create_embedder(config):
+    """Embedder for the semantic cache (semantic_cache_model), or None if the model isn't pulled"""
+    embedder = OllamaEmbedder(config.get('semantic_cache_model', 'nomic-embed-text'))
+    if not embedder.available():
+        logger.warning(f"Semantic cache disabled, run: ollama pull {embedder.model}")
+        return None
+    return embedder
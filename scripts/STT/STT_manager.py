@@ -0,0 +1,88 @@
+import os
+import sys
+import time
+import logging
+from collections import deque
+from .google import GoogleSTT
+from .vosk import VoskSTT
+from .fake import FakeSTT
+from .session import TimedSession
+
+logger = logging.getLogger(__name__)
+
+def get_resource_path(relative_path):
+    """Get the correct resource path whether running as script or frozen exe"""
+    if getattr(sys, 'frozen', False):
+        # Downloaded speech models live next to the executable
+        if relative_path.startswith('models'):
+            return os.path.join(os.path.dirname(sys.executable), relative_path)
+        return os.path.join(sys._MEIPASS, relative_path)
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        return os.path.join(base_path, relative_path)
+
+class STTManager:
+    def __init__(self, backend_name="google", vosk_model_path=None, language="en-US", fake_transcripts=None):
+        """Initialize speech-to-text with the selected backend"""
+        self.backends = {
+            "google": lambda: GoogleSTT(language=language),
+            "vosk": lambda: VoskSTT(vosk_model_path or get_resource_path(os.path.join('models', 'vosk'))),
+            "fake": lambda: FakeSTT(fake_transcripts),
+        }
+        if backend_name not in self.backends:
+            logger.error(f"Unknown speech-to-text backend '{backend_name}', using google")
+            backend_name = "google"
+        
+        self.backend_name = backend_name
+        self.backend = self.backends[backend_name]()
+        self.timings = deque(maxlen=200)  # (audio seconds, processing seconds, finish latency)
+        self.warmed_up = False
+        
+    def warm_up(self):
+        """Load local models ahead of the first utterance, falling back to Google if that fails"""
+        if self.warmed_up:
+            return
+        self.warmed_up = True
+        if hasattr(self.backend, 'load'):
+            try:
+                self.backend.load()
+            except Exception as e:
+                logger.error(f"Could not load {self.backend_name} speech-to-text, using google: {e}")
+                self.backend_name = "google"
+                self.backend = self.backends["google"]()
+    
+    def transcribe(self, pcm, sample_rate, sample_width=2):
+        """Transcribe a whole utterance of 16-bit mono PCM; returns '' when nothing was understood"""
+        self.warm_up()
+        start = time.perf_counter()
+        text = self.backend.transcribe(pcm, sample_rate, sample_width)
+        elapsed = time.perf_counter() - start
+        self.record(len(pcm) / (sample_rate * sample_width), elapsed, elapsed)
+        return text
+    
+    def create_session(self, sample_rate, sample_width=2):
+        """Streaming session: accept(pcm) returns partial text or None, finish() the final text"""
+        self.warm_up()
+        session = self.backend.create_session(sample_rate, sample_width)
+        return TimedSession(self, session, sample_rate, sample_width)
+    
+    def record(self, audio_seconds, processing_seconds, latency):
+        """Keep timings for get_stats"""
+        self.timings.append((audio_seconds, processing_seconds, latency))
+        
+    def get_stats(self):
+        """Real-time factor and final-result latency over recent utterances"""
+        timings = list(self.timings)
+        if not timings:
+            return None
+        audio = sum(t[0] for t in timings)
+        processing = sum(t[1] for t in timings)
+        latencies = [t[2] for t in timings]
+        return {
+            'backend': self.backend_name,
+            'count': len(timings),
+            'audio_seconds': round(audio, 1),
+            'rtf': round(processing / audio, 3) if audio else None,
+            'mean_latency_ms': round(sum(latencies) / len(latencies) * 1000, 1),
+            'max_latency_ms': round(max(latencies) * 1000, 1)
+        }
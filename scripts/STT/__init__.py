@@ -0,0 +1,6 @@
+from .STT_manager import STTManager
+from .google import GoogleSTT
+from .vosk import VoskSTT
+from .fake import FakeSTT
+
+__all__ = ['STTManager', 'GoogleSTT', 'VoskSTT', 'FakeSTT']
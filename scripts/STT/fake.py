@@ -0,0 +1,31 @@
+import time
+import logging
+import threading
+from .session import BufferedSession
+
+logger = logging.getLogger(__name__)
+
+class FakeSTT:
+    """Returns scripted transcripts in order, for replayed sessions without a real recognizer
+    
+    Takes `rtf` seconds of processing per second of audio. Use one STT worker
+    so utterances are transcribed in the order they were heard.
+    """
+    
+    name = "fake"
+    
+    def __init__(self, transcripts=None, rtf=0.05):
+        self.transcripts = list(transcripts or [])
+        self.rtf = rtf
+        self.lock = threading.Lock()
+    
+    def transcribe(self, pcm, sample_rate, sample_width=2):
+        """Next scripted transcript; '' once the script has run out"""
+        with self.lock:
+            text = self.transcripts.pop(0) if self.transcripts else ""
+        time.sleep(len(pcm) / (sample_rate * sample_width) * self.rtf)
+        return text.lower()
+    
+    def create_session(self, sample_rate, sample_width=2):
+        """Buffer the whole utterance like Google"""
+        return BufferedSession(self, sample_rate, sample_width)
@@ -0,0 +1,26 @@
+import logging
+import speech_recognition as sr
+from .session import BufferedSession
+
+logger = logging.getLogger(__name__)
+
+class GoogleSTT:
+    """Google's web speech API through speech_recognition (needs a network connection)"""
+    
+    name = "google"
+    
+    def __init__(self, language="en-US"):
+        self.recognizer = sr.Recognizer()
+        self.language = language
+        
+    def transcribe(self, pcm, sample_rate, sample_width=2):
+        """Transcribe 16-bit mono PCM; returns '' when nothing was understood"""
+        audio = sr.AudioData(bytes(pcm), sample_rate, sample_width)
+        try:
+            return self.recognizer.recognize_google(audio, language=self.language).lower()
+        except sr.UnknownValueError:
+            return ""
+    
+    def create_session(self, sample_rate, sample_width=2):
+        """Google only takes whole utterances, so the session buffers"""
+        return BufferedSession(self, sample_rate, sample_width)
@@ -0,0 +1,53 @@
+import time
+
+class BufferedSession:
+    """Streaming session for backends that can only transcribe whole utterances
+    
+    Audio is collected as it arrives and sent in one go on finish(), so
+    there are no partial results.
+    """
+    
+    def __init__(self, backend, sample_rate, sample_width=2):
+        self.backend = backend
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.chunks = []
+        
+    def accept(self, pcm):
+        """Add audio; returns a partial transcript or None"""
+        self.chunks.append(bytes(pcm))
+        return None
+    
+    def finish(self):
+        """Final transcript for everything fed so far"""
+        return self.backend.transcribe(b''.join(self.chunks), self.sample_rate, self.sample_width)
+
+class TimedSession:
+    """Wraps a backend session to record how long finalizing took"""
+    
+    def __init__(self, manager, session, sample_rate, sample_width):
+        self.manager = manager
+        self.session = session
+        self.bytes_per_second = sample_rate * sample_width
+        self.audio_bytes = 0
+        self.processing = 0.0
+        self.first_partial = None
+        self.started = time.perf_counter()
+        
+    def accept(self, pcm):
+        """Add audio; returns a partial transcript or None"""
+        self.audio_bytes += len(pcm)
+        start = time.perf_counter()
+        partial = self.session.accept(pcm)
+        self.processing += time.perf_counter() - start
+        if partial and self.first_partial is None:
+            self.first_partial = time.perf_counter() - self.started
+        return partial
+    
+    def finish(self):
+        """Final transcript, recording latency and real-time factor"""
+        start = time.perf_counter()
+        text = self.session.finish()
+        latency = time.perf_counter() - start
+        self.manager.record(self.audio_bytes / self.bytes_per_second, self.processing + latency, latency)
+        return text
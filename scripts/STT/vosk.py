@@ -0,0 +1,71 @@
+import os
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+class VoskSession:
+    """Incremental Vosk recognizer with partial results"""
+    
+    def __init__(self, recognizer):
+        self.recognizer = recognizer
+        self.last_partial = ""
+        self.pieces = []  # Text Vosk finalized at pauses inside the audio
+        
+    def accept(self, pcm):
+        """Add audio; returns the partial transcript when it changed, else None"""
+        if self.recognizer.AcceptWaveform(bytes(pcm)):
+            # Vosk found an utterance boundary; FinalResult() won't repeat this text
+            text = json.loads(self.recognizer.Result()).get('text', '')
+            if text:
+                self.pieces.append(text)
+            return None
+        partial = json.loads(self.recognizer.PartialResult()).get('partial', '')
+        if partial and partial != self.last_partial:
+            self.last_partial = partial
+            return partial
+        return None
+    
+    def finish(self):
+        """Final transcript for everything fed so far"""
+        last = json.loads(self.recognizer.FinalResult()).get('text', '')
+        return ' '.join(self.pieces + ([last] if last else [])).lower()
+
+class VoskSTT:
+    """Offline CPU speech recognition with a Vosk model
+    
+    The vosk package and model are only loaded on first use so the app
+    starts normally when neither is installed.
+    """
+    
+    name = "vosk"
+    
+    def __init__(self, model_path):
+        self.model_path = model_path
+        self.model = None
+        self.lock = threading.Lock()
+        
+    def load(self):
+        """Load the model if it isn't loaded yet; raises if vosk or the model is missing"""
+        with self.lock:
+            if self.model is None:
+                if not os.path.isdir(self.model_path):
+                    raise FileNotFoundError(f"Vosk model not found at {self.model_path}")
+                import vosk
+                vosk.SetLogLevel(-1)
+                logger.info(f"Loading Vosk model from {self.model_path}")
+                self.model = vosk.Model(self.model_path)
+        return self.model
+    
+    def create_session(self, sample_rate, sample_width=2):
+        """New streaming recognizer for 16-bit mono audio"""
+        import vosk
+        recognizer = vosk.KaldiRecognizer(self.load(), sample_rate)
+        return VoskSession(recognizer)
+    
+    def transcribe(self, pcm, sample_rate, sample_width=2):
+        """Transcribe a whole utterance; returns '' when nothing was understood"""
+        session = self.create_session(sample_rate, sample_width)
+        session.accept(pcm)
+        return session.finish()
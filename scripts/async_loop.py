@@ -0,0 +1,42 @@
+import asyncio
+import threading
+
+class AsyncLoopThread:
+    """A long-lived asyncio event loop running on its own thread
+    
+    Code on any thread can submit coroutines with submit(), which returns a
+    concurrent.futures.Future. Cancelling that future cancels the task.
+    """
+    
+    def __init__(self, name="ova-asyncio"):
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self.thread.start()
+        
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+        
+    def submit(self, coro):
+        """Schedule a coroutine on the loop and return a future for its result"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+    
+    def run(self, coro, timeout=None):
+        """Run a coroutine on the loop and wait for its result"""
+        future = self.submit(coro)
+        try:
+            return future.result(timeout)
+        except BaseException:
+            future.cancel()
+            raise
+
+_async_loop = None
+_async_loop_lock = threading.Lock()
+
+def get_async_loop():
+    """Get the event loop thread shared by all async work, starting it on first use"""
+    global _async_loop
+    with _async_loop_lock:
+        if _async_loop is None:
+            _async_loop = AsyncLoopThread()
+        return _async_loop
@@ -0,0 +1,250 @@
+import os
+import sys
+import glob
+import heapq
+import random
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+import pygame
+from PyQt5.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# Mixer settings, a small buffer keeps effects like the activation chime snappy
+MIXER_FREQUENCY = 44100
+MIXER_BUFFER = 512
+
+# Reserved channels, everything else plays on whatever channel is free
+SPEECH_CHANNEL = 0
+CHIME_CHANNEL = 1
+
+def get_resource_path(relative_path):
+    """Get the correct resource path whether running as script or frozen exe"""
+    if getattr(sys, 'frozen', False):
+        # Running as PyInstaller bundle
+        return os.path.join(sys._MEIPASS, relative_path)
+    else:
+        # Running as script
+        base_path = os.path.dirname(os.path.dirname(__file__))
+        return os.path.join(base_path, relative_path)
+
+class PlaybackHandle:
+    """A sound playing on a mixer channel"""
+    
+    def __init__(self, handle_id, sound, channel, on_finished=None):
+        self.id = handle_id
+        self.sound = sound
+        self.channel = channel
+        self.start_time = time.perf_counter()
+        self.expected_end = self.start_time + sound.get_length()
+        self.end_time = None  # When the end of the audio was detected
+        self.on_finished = on_finished
+        self.done = threading.Event()
+        self.stopped = False
+        
+    def wait(self, timeout=None):
+        """Block until playback has finished or was stopped"""
+        return self.done.wait(timeout)
+    
+    def is_playing(self):
+        return not self.done.is_set()
+
+class AudioService(QObject):
+    """Owns the pygame mixer, the decoded sound bank and playback tracking
+    
+    The mixer is initialized once here. Everything in assets/sounds is decoded
+    to PCM in the background at startup so effects play without any file or
+    mp3 work. A single dispatcher thread sleeps until the moment each sound is
+    due to end (known from its length), confirms the channel is idle, then
+    wakes any waiting threads and calls on_finished in the GUI thread.
+    """
+    playback_finished = pyqtSignal(int)
+    
+    def __init__(self):
+        super().__init__()
+        self.enabled = self._init_mixer()
+        self.sounds = {}  # Sound bank, keyed by path relative to assets/sounds without extension
+        self.sounds_lock = threading.Lock()
+        self.sounds_loaded = threading.Event()
+        
+        self.lock = threading.Condition()
+        self.pending = []  # Heap of (expected_end, handle_id)
+        self.handles = {}    # Handles still playing
+        self.callbacks = {}  # Finished handles waiting for on_finished to run
+        self.ids = itertools.count(1)
+        self.detect_latencies = deque(maxlen=100)  # Seconds between audio end and its detection
+        self.playback_finished.connect(self._on_playback_finished)
+        
+        self.dispatcher = threading.Thread(target=self._dispatch_loop, name="audio-dispatcher", daemon=True)
+        self.dispatcher.start()
+        
+        # Decode the sound bank without holding up startup
+        threading.Thread(target=self.load_sounds, name="audio-preload", daemon=True).start()
+        
+    def _init_mixer(self):
+        """Initialize the mixer and reserve the speech and chime channels"""
+        try:
+            if not pygame.mixer.get_init():
+                pygame.mixer.init(frequency=MIXER_FREQUENCY, buffer=MIXER_BUFFER)
+            pygame.mixer.set_reserved(2)
+            self.speech_channel = pygame.mixer.Channel(SPEECH_CHANNEL)
+            self.chime_channel = pygame.mixer.Channel(CHIME_CHANNEL)
+            return True
+        except Exception as e:
+            logger.error(f"Error initializing audio mixer: {e}")
+            self.speech_channel = None
+            self.chime_channel = None
+            return False
+        
+    def load_sounds(self):
+        """Decode every sound in assets/sounds into memory, once"""
+        with self.sounds_lock:
+            if self.sounds_loaded.is_set():
+                return
+            sounds_dir = get_resource_path(os.path.join('assets', 'sounds'))
+            start = time.perf_counter()
+            if self.enabled:
+                for path in glob.glob(os.path.join(sounds_dir, '**', '*.mp3'), recursive=True):
+                    name = os.path.splitext(os.path.relpath(path, sounds_dir))[0].replace(os.sep, '/')
+                    try:
+                        self.sounds[name] = pygame.mixer.Sound(path)
+                    except Exception as e:
+                        logger.error(f"Error loading sound {path}: {e}")
+            self.sounds_loaded.set()
+        logger.info(f"Decoded {len(self.sounds)} sounds in {(time.perf_counter() - start) * 1000:.0f} ms")
+        
+    def get_sound(self, name):
+        """Get a decoded sound by name, e.g. 'HeyOva' or 'screeches/OVA-screech1'"""
+        if not self.sounds_loaded.is_set():
+            self.load_sounds()
+        return self.sounds.get(name)
+    
+    def get_sounds(self, group):
+        """Get all decoded sounds in a folder of assets/sounds, e.g. 'screeches'"""
+        if not self.sounds_loaded.is_set():
+            self.load_sounds()
+        return [sound for name, sound in self.sounds.items() if name.startswith(group + '/')]
+    
+    def play_effect(self, name, on_finished=None):
+        """Play a sound from the bank, the activation chime gets its own channel"""
+        sound = self.get_sound(name)
+        if sound is None:
+            return None
+        channel = self.chime_channel if name in ('HeyOva', 'NoAnswer') else None
+        return self.play(sound, channel=channel, on_finished=on_finished)
+    
+    def play_random(self, group, on_finished=None):
+        """Play a random sound from a folder of assets/sounds"""
+        sounds = self.get_sounds(group)
+        if not sounds:
+            return None
+        return self.play(random.choice(sounds), on_finished=on_finished)
+    
+    def play_speech(self, sound):
+        """Play speech on the reserved speech channel"""
+        return self.play(sound, channel=self.speech_channel)
+        
+    def play(self, sound, channel=None, on_finished=None):
+        """Play a pygame Sound and return a handle that can be waited on
+        
+        on_finished, if given, is called in the GUI thread when playback ends.
+        """
+        if not self.enabled:
+            channel = None
+        elif channel is not None:
+            channel.play(sound)
+        else:
+            channel = sound.play()
+        
+        with self.lock:
+            handle = PlaybackHandle(next(self.ids), sound, channel, on_finished)
+            if channel is None:
+                # No free channel, nothing will play
+                self._finish(handle)
+                return handle
+            self.handles[handle.id] = handle
+            heapq.heappush(self.pending, (handle.expected_end, handle.id))
+            self.lock.notify()
+        return handle
+    
+    def stop(self, handle):
+        """Stop a sound early"""
+        with self.lock:
+            if handle.done.is_set():
+                return
+            handle.stopped = True
+            if handle.channel:
+                handle.channel.stop()
+            self.handles.pop(handle.id, None)
+            self._finish(handle)
+            
+    def _finish(self, handle):
+        """Mark playback as finished, called with the lock held"""
+        handle.end_time = time.perf_counter()
+        handle.done.set()
+        if handle.on_finished:
+            self.callbacks[handle.id] = handle
+            self.playback_finished.emit(handle.id)
+            
+    def _on_playback_finished(self, handle_id):
+        """Run a finished sound's callback in the GUI thread"""
+        with self.lock:
+            handle = self.callbacks.pop(handle_id, None)
+        if handle:
+            try:
+                handle.on_finished()
+            except Exception as e:
+                logger.error(f"Error in playback callback: {e}")
+    
+    def _dispatch_loop(self):
+        """Wake up when sounds are due to end and report them as finished"""
+        with self.lock:
+            while True:
+                if not self.pending:
+                    self.lock.wait()
+                    continue
+                
+                expected_end, handle_id = self.pending[0]
+                delay = expected_end - time.perf_counter()
+                if delay > 0:
+                    self.lock.wait(delay)
+                    continue
+                
+                heapq.heappop(self.pending)
+                handle = self.handles.get(handle_id)
+                if not handle or handle.done.is_set():
+                    continue
+                
+                if handle.channel.get_busy() and handle.channel.get_sound() is handle.sound:
+                    # Mixer is running a little behind, check again shortly
+                    heapq.heappush(self.pending, (time.perf_counter() + 0.005, handle_id))
+                    continue
+                
+                del self.handles[handle_id]
+                self._finish(handle)
+                self.detect_latencies.append(handle.end_time - handle.expected_end)
+    
+    def get_latency_stats(self):
+        """Average and worst delay between a sound ending and it being detected, in ms"""
+        latencies = list(self.detect_latencies)
+        if not latencies:
+            return None
+        return {
+            'count': len(latencies),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 1),
+            'max_ms': round(max(latencies) * 1000, 1)
+        }
+
+_audio_service = None
+_audio_service_lock = threading.Lock()
+
+def get_audio_service():
+    """Get the shared audio service, creating it on first use (from the GUI thread)"""
+    global _audio_service
+    with _audio_service_lock:
+        if _audio_service is None:
+            _audio_service = AudioService()
+        return _audio_service
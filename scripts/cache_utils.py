@@ -0,0 +1,14 @@
+import os
+import sys
+
+def get_cache_dir(name):
+    """Get (and create) a cache directory next to config.json, whether running as script or frozen exe"""
+    if getattr(sys, 'frozen', False):
+        # Running as PyInstaller bundle, keep caches beside the executable
+        base_path = os.path.dirname(sys.executable)
+    else:
+        # Running as script
+        base_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    cache_dir = os.path.join(base_path, 'cache', name)
+    os.makedirs(cache_dir, exist_ok=True)
+    return cache_dir
@@ -8,11 +8,12 @@ from PyQt5.QtGui import QPixmap, QIcon, QTransform, QPainter
 from voice_assistant import VoiceAssistant
 from display.display_manager import DisplayManager
 from text_to_speech import TTSEngine
+from audio_service import get_audio_service
+from scheduler import get_scheduler, GUI
 from settings_dialog import SettingsDialog
 import json
 import time
 import logging
-import pygame
 
 # Add scripts directory to Python path
 scripts_dir = os.path.dirname(os.path.abspath(__file__))
@@ -50,13 +51,10 @@ class ChatBubble:
         
         # Clear any existing timer
         if self.hide_timer is not None:
-            self.hide_timer.stop()
+            self.hide_timer.cancel()
             
-        # Create new timer for hiding
-        self.hide_timer = QTimer(self.parent)
-        self.hide_timer.setSingleShot(True)
-        self.hide_timer.timeout.connect(self.hideAndReset)
-        self.hide_timer.start(duration)
+        # Schedule hiding on the GUI thread
+        self.hide_timer = get_scheduler().call_later(duration / 1000, self.hideAndReset, dispatch=GUI)
     
     def hideAndReset(self):
         """Hide the bubble and notify parent to reset sleep timer"""
@@ -78,12 +76,17 @@ class OwlPet(QWidget):
     stop_speaking_signal = pyqtSignal()
     start_listening_signal = pyqtSignal()
     stop_listening_signal = pyqtSignal()
+    cancel_response_signal = pyqtSignal()
     state_change_signal = pyqtSignal(str)  # New signal for state changes
+    stream_token_signal = pyqtSignal(str, str)  # (token, user_text) while a response streams
     
     def __init__(self):
         super().__init__()
-        # Initialize pygame mixer for sound effects
-        pygame.mixer.init()
+        # Initialize the mixer and start decoding sound effects
+        get_audio_service()
+        
+        # Every timer outside the animation loop runs on the shared scheduler
+        self.scheduler = get_scheduler()
         
         # Initialize variables
         self.current_state = "idle"
@@ -97,8 +100,7 @@ class OwlPet(QWidget):
         self.config = self.load_config()
         
         # Random action timer
-        self.random_action_timer = QTimer(self)
-        self.random_action_timer.timeout.connect(self.perform_random_action)
+        self.random_action_timer = None
         self.schedule_next_random_action()
         
         # Initialize variables
@@ -115,6 +117,10 @@ class OwlPet(QWidget):
         # Flag for direct listening mode
         self.waiting_for_response = False
         
+        # Streamed response state
+        self.streaming_response = False
+        self.streamed_text = ""
+        
         # Movement and position variables
         self.dragging = False
         self.offset = QPoint()
@@ -132,12 +138,10 @@ class OwlPet(QWidget):
         self.reverse_animation = False
         self.held_state = None  # Store state before pickup
         
-        # Sleep timer
-        self.last_activity_time = QTimer()
-        self.last_activity_time.timeout.connect(self.check_idle)
-        self.last_activity_time.start(1000)  # Check every second
+        # Sleep timer, checked when it could run out rather than every second
+        self.idle_timer = None
         self.idle_timeout = self.config.get('sleep_timer', 30)  # Get sleep timer from config, default to 30 seconds
-        self.last_active = time.time()
+        self.reset_idle_timer()
         
         # Animation states and transitions
         self.state_transitions = {
@@ -197,7 +201,9 @@ class OwlPet(QWidget):
         
         # Initialize Voice Assistant
         try:
-            self.voice_assistant = VoiceAssistant(callback=self.handle_response_thread)
+            self.voice_assistant = VoiceAssistant(callback=self.handle_response_thread,
+                                                  stream_callback=self.handle_stream_token_thread,
+                                                  interrupt_callback=self.tts_engine.interrupt)
             print("Voice assistant initialized. Continuously listening...")
             self.voice_assistant.start_listening()
         except Exception as e:
@@ -206,11 +212,13 @@ class OwlPet(QWidget):
         
         # Connect all signals
         self.handle_response_signal.connect(self.handle_response_gui)
+        self.stream_token_signal.connect(self.handle_stream_token_gui)
         self.start_thinking_signal.connect(self.start_thinking)
         self.start_speaking_signal.connect(self.start_speaking)
         self.stop_speaking_signal.connect(self.on_speak_done)
         self.start_listening_signal.connect(self.start_listening)
         self.stop_listening_signal.connect(self.stop_listening)
+        self.cancel_response_signal.connect(self.cancel_response)
         
         # Initialize response handler
         self.response_handler = ResponseHandler()
@@ -419,15 +427,13 @@ class OwlPet(QWidget):
         self.current_state = new_state
         self.frame_index = 0
         
-        # Stop current animation timer if running
-        if hasattr(self, 'animation_timer') and self.animation_timer.isActive():
-            self.animation_timer.stop()
-        
-        # Reset and start animation timer
-        self.animation_timer = QTimer(self)
-        self.animation_timer.timeout.connect(self.updateAnimation)
+        # Restart the animation timer so the new state's first frame gets its full delay
         self.animation_timer.start(self.frame_delay)
         
+        # Load the model when Ova wakes up and free it while she sleeps
+        if hasattr(self, 'voice_assistant') and self.voice_assistant:
+            self.voice_assistant.on_pet_state(new_state)
+        
         # If transitioning to idle after landing, keep the last facing direction
         if new_state == "idle" and self.previous_state == "landing":
             return
@@ -569,6 +575,10 @@ class OwlPet(QWidget):
     def handle_response_thread(self, response):
         """Handle the response from a background thread"""
         try:
+            if response == "CANCEL":
+                self.cancel_response_signal.emit()
+                return
+            
             # Wake up if asleep
             if self.current_state in ['asleep', 'falling_asleep']:
                 self.wake_up()
@@ -586,6 +596,27 @@ class OwlPet(QWidget):
         except Exception as e:
             print(f"Error handling response: {e}")
     
+    def handle_stream_token_thread(self, token, user_text):
+        """Handle a streamed response token from a background thread"""
+        self.stream_token_signal.emit(token, user_text)
+    
+    def handle_stream_token_gui(self, token, user_text):
+        """Show and speak a streamed response token in the GUI thread"""
+        try:
+            if not self.streaming_response:
+                self.streaming_response = True
+                self.streamed_text = ""
+                if self.display_manager:
+                    self.display_manager.begin_stream(user_text)
+                self.tts_engine.begin_stream()
+            
+            self.streamed_text += token
+            if self.display_manager:
+                self.display_manager.append_stream(token)
+            self.tts_engine.feed(token)
+        except Exception as e:
+            print(f"Error handling streamed token: {e}")
+    
     def handle_response_gui(self, response):
         """Handle the response in the GUI thread"""
         try:
@@ -596,8 +627,14 @@ class OwlPet(QWidget):
             self.show_speech_bubble(response)
             # Change from thinking to speaking
             self.state_change_signal.emit("speaking")
-            # Speak the response
-            self.speak_response(response_text)
+            
+            if self.streaming_response and response_text.strip() == self.streamed_text.strip():
+                # Already being spoken, just speak what is left
+                self.tts_engine.end_stream()
+            else:
+                # Speak the response
+                self.speak_response(response_text)
+            self.streaming_response = False
             
             # Check if response ends with a question mark
             if response_text.strip().endswith('?') and not self.waiting_for_response:
@@ -616,9 +653,7 @@ class OwlPet(QWidget):
             
             if hasattr(self, 'voice_assistant') and self.voice_assistant:
                 # Play activation sound before starting to listen
-                if self.voice_assistant.activation_sound_obj:
-                    self.voice_assistant.activation_sound_obj.play()
-                    time.sleep(0.1)  # Small delay to let sound start playing
+                get_audio_service().play_effect('HeyOva')
                 
                 # Start listening animation through signal
                 self.state_change_signal.emit("listening")
@@ -644,15 +679,31 @@ class OwlPet(QWidget):
     
     def on_speak_done(self):
         """Handle completion of speaking in GUI thread"""
+        if hasattr(self, 'voice_assistant') and self.voice_assistant:
+            self.voice_assistant.set_speaking(False)
         if self.current_state == "speaking":
             self.state_change_signal.emit("idle")
             self.reset_idle_timer()  # Reset sleep timer when done speaking
 
     def start_speaking(self):
         """Start speaking animation in GUI thread"""
+        if hasattr(self, 'voice_assistant') and self.voice_assistant:
+            self.voice_assistant.set_speaking(True)
         self.state_change_signal.emit("speaking")
         self.reset_idle_timer()  # Reset sleep timer when starting to speak
 
+    def cancel_response(self):
+        """Stop thinking or talking when the user asks Ova to stop"""
+        self.streaming_response = False
+        if self.waiting_for_response:
+            # Don't start listening for an answer to a question that was cut off
+            self.waiting_for_response = False
+            self.tts_engine.speak_finished.disconnect(self.handle_question_response)
+        self.tts_engine.stop()
+        if self.current_state in ("thinking", "speaking", "listening"):
+            self.state_change_signal.emit("idle")
+            self.reset_idle_timer()
+
     def stop_speaking(self):
         """Stop speaking animation in GUI thread"""
         self.state_change_signal.emit("idle")
@@ -781,6 +832,7 @@ class OwlPet(QWidget):
             # Update sleep timer
             self.idle_timeout = self.config.get('sleep_timer', 30)
             logger.info(f"Updated sleep timer to {self.idle_timeout}")
+            self.reset_idle_timer()
             
             # Update display mode
             if self.display_manager:
@@ -827,20 +879,30 @@ class OwlPet(QWidget):
 
     def check_idle(self):
         """Check if Ova has been idle for too long"""
-        # Don't start sleeping if already asleep or in certain states
-        if self.current_state in ['asleep', 'falling_asleep', 'waking_up', 'pickup', 'held', 'putdown', 
-                                'take_flight', 'flying', 'landing', 'dance']:
-            return
-            
-        # Don't sleep if currently speaking
-        if hasattr(self, 'tts_engine') and self.tts_engine.is_speaking:
+        # Only one check may be pending, this one decides whether another follows
+        if self.idle_timer is not None:
+            self.idle_timer.cancel()
+        self.idle_timer = None
+        
+        # Already asleep, waking up resets the timer
+        if self.current_state in ['asleep', 'falling_asleep']:
             return
             
         # Get sleep timer from config, default to 30 seconds
         sleep_timer = self.config.get('sleep_timer', 30)
+        remaining = self.last_active + sleep_timer - time.time()
+        
+        # Don't start sleeping in certain states or while speaking, check again later
+        busy = self.current_state in ['waking_up', 'pickup', 'held', 'putdown', 
+                                      'take_flight', 'flying', 'landing', 'dance']
+        if hasattr(self, 'tts_engine') and self.tts_engine.is_speaking:
+            busy = True
+        
+        if busy or remaining > 0:
+            self.idle_timer = self.scheduler.call_later(max(remaining, 1), self.check_idle, dispatch=GUI)
+            return
             
-        if time.time() - self.last_active > sleep_timer:
-            self.state_change_signal.emit("falling_asleep")
+        self.state_change_signal.emit("falling_asleep")
 
     def fall_asleep(self):
         """Start the falling asleep animation"""
@@ -855,6 +917,9 @@ class OwlPet(QWidget):
     def reset_idle_timer(self):
         """Reset the idle timer"""
         self.last_active = time.time()
+        # A pending check just finds there is time left and reschedules itself
+        if self.idle_timer is None or not self.idle_timer.active:
+            self.idle_timer = self.scheduler.call_later(self.config.get('sleep_timer', 30), self.check_idle, dispatch=GUI)
 
     def paintEvent(self, event):
         """Custom paint event to ensure pixel-perfect rendering"""
@@ -885,39 +950,17 @@ class OwlPet(QWidget):
     def screech(self):
         """Play a random screech sound and animate"""
         try:
-            # Get list of screech sound files
-            screech_dir = get_resource_path(os.path.join('assets', 'sounds', 'screeches'))
-            screech_files = glob.glob(os.path.join(screech_dir, '*.mp3'))
+            # Play a random pre-decoded screech and return to idle when it's done
+            handle = get_audio_service().play_random(
+                'screeches', on_finished=lambda: self.state_change_signal.emit("idle"))
             
-            if screech_files:
-                # Choose random screech
-                screech_file = random.choice(screech_files)
-                
-                # Load and play the sound
-                sound = pygame.mixer.Sound(screech_file)
-                
+            if handle:
                 # Start speaking animation
                 self.state_change_signal.emit("speaking")
                 
-                # Play the sound
-                channel = sound.play()
-                
-                # Create a timer to check when sound is done
-                check_timer = QTimer(self)
-                check_timer.timeout.connect(lambda: self.check_screech_done(channel))
-                check_timer.start(100)  # Check every 100ms
-                
         except Exception as e:
             print(f"Error playing screech: {e}")
             self.state_change_signal.emit("idle")
-    
-    def check_screech_done(self, channel):
-        """Check if screech sound is finished playing"""
-        if not channel.get_busy():
-            # Sound is done, stop the timer
-            self.sender().stop()
-            # Return to idle
-            self.state_change_signal.emit("idle")
 
     def schedule_next_random_action(self):
         """Schedule the next random action based on config settings"""
@@ -930,13 +973,10 @@ class OwlPet(QWidget):
         # Convert to milliseconds
         interval = random.randint(min_interval * 1000, max_interval * 1000)
         
-        # Reset and start timer
-        if hasattr(self, 'random_action_timer'):
-            self.random_action_timer.stop()
-        self.random_action_timer = QTimer(self)
-        self.random_action_timer.timeout.connect(self.perform_random_action)
-        self.random_action_timer.setSingleShot(True)  # Only trigger once
-        self.random_action_timer.start(interval)
+        # Replace any pending action with a new one-shot timer
+        if self.random_action_timer:
+            self.random_action_timer.cancel()
+        self.random_action_timer = self.scheduler.call_later(interval / 1000, self.perform_random_action, dispatch=GUI)
     
     def perform_random_action(self):
         """Perform a random action from the enabled actions list"""
@@ -80,6 +80,23 @@ class DisplayManager:
                     self.parent.update_speech_bubble_position()
                 self.speech_bubble.show()
     
+    def begin_stream(self, user_text=""):
+        """Prepare the display for a response that arrives in pieces"""
+        # Only the speech bubble renders partial responses, the chat
+        # window adds the finished message in show_message
+        if self.current_mode == "bubble":
+            if not self.speech_bubble:
+                self.initialize("bubble")
+            self.speech_bubble.setText("", user_text)
+            if hasattr(self.parent, 'update_speech_bubble_position'):
+                self.parent.update_speech_bubble_position()
+            self.speech_bubble.show()
+    
+    def append_stream(self, text):
+        """Append a piece of a streamed response"""
+        if self.current_mode == "bubble" and self.speech_bubble:
+            self.speech_bubble.appendText(text)
+    
     def hide_all(self):
         """Hide all displays"""
         if self.speech_bubble:
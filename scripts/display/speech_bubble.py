@@ -16,9 +16,12 @@ class MarkdownLabel(QLabel):
         self.setTextFormat(Qt.RichText)
         self.setOpenExternalLinks(True)
         self.setWordWrap(True)
+        self.markdown_text = ""
         
     def setMarkdown(self, text):
         """Convert markdown to HTML and set the text"""
+        self.markdown_text = text
+        
         # Convert markdown to HTML
         html = markdown.markdown(text, extensions=['fenced_code', 'tables', 'nl2br'])
         
@@ -37,6 +40,10 @@ class MarkdownLabel(QLabel):
         )
         
         self.setText(html)
+        
+    def appendMarkdown(self, text):
+        """Append streamed text and re-render the markdown"""
+        self.setMarkdown(self.markdown_text + text)
 
 class SpeechBubble(QWidget):
     """A floating speech bubble that appears near the Ova pet"""
@@ -56,6 +63,12 @@ class SpeechBubble(QWidget):
         self.setup_ui()
         self.hide_timer = None
         
+        # Streamed text is buffered and rendered at most once per interval
+        self.pending_text = ""
+        self.render_timer = QTimer(self)
+        self.render_timer.setSingleShot(True)
+        self.render_timer.timeout.connect(self.flushText)
+        
     def setup_ui(self):
         # Set size policy
         self.setSizePolicy(QSizePolicy.Preferred, QSizePolicy.Preferred)
@@ -169,6 +182,10 @@ class SpeechBubble(QWidget):
         
     def setText(self, text, last_text=""):
         """Set the text of the speech bubble"""
+        # Drop streamed text that is about to be replaced
+        self.pending_text = ""
+        self.render_timer.stop()
+        
         # Update user text if provided
         if last_text:
             self.user_label.setMarkdown(f"You: {last_text}")
@@ -185,6 +202,24 @@ class SpeechBubble(QWidget):
         hint = self.sizeHint()
         self.resize(hint)
         
+    def appendText(self, text):
+        """Append streamed response text to the bubble"""
+        self.pending_text += text
+        if not self.render_timer.isActive():
+            self.render_timer.start(30)
+            
+    def flushText(self):
+        """Render any streamed text that hasn't been shown yet"""
+        if not self.pending_text:
+            return
+        self.response_label.appendMarkdown(self.pending_text)
+        self.pending_text = ""
+        
+        # Update size and let parent handle positioning
+        self.resize(self.sizeHint())
+        if self.parent() and hasattr(self.parent(), 'update_speech_bubble_position'):
+            self.parent().update_speech_bubble_position()
+        
     def showMessage(self, text, duration=5000):
         """Show the speech bubble with text for a duration"""
         self.setText(text)
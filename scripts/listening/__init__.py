@@ -0,0 +1,19 @@
+from .features import MFCCExtractor
+from .capture import AudioCapture, FrameRingBuffer, RingReader
+from .vad import VoiceActivityDetector, VADEvent, Segmenter, SpeechSegment
+from .pipeline import ListeningPipeline, BoundedQueue, Utterance
+from .echo_gate import EchoGate
+from .sources import ReplaySource, ReplayStep, load_session, create_input_source
+from .calibration import NoiseProfileCache, device_key
+from .wake_word import TemplateWakeWordEngine, WakeWordDetection, create_wake_word_engine
+from .wake_phrase import WakePhraseMatcher, WakePhraseMatch, create_wake_phrase_matcher
+
+__all__ = [
+    'AudioCapture', 'FrameRingBuffer', 'RingReader',
+    'VoiceActivityDetector', 'VADEvent', 'Segmenter', 'SpeechSegment',
+    'ListeningPipeline', 'BoundedQueue', 'Utterance', 'EchoGate',
+    'ReplaySource', 'ReplayStep', 'load_session', 'create_input_source',
+    'NoiseProfileCache', 'device_key',
+    'MFCCExtractor', 'TemplateWakeWordEngine', 'WakeWordDetection', 'create_wake_word_engine',
+    'WakePhraseMatcher', 'WakePhraseMatch', 'create_wake_phrase_matcher'
+]
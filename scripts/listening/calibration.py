@@ -0,0 +1,78 @@
+import os
+import json
+import time
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+def device_key(mic):
+    """Stable name for an input device, so each one keeps its own noise profile"""
+    if not hasattr(mic, 'pyaudio_module'):
+        # Replayed audio and other non-PyAudio sources
+        return type(mic).__name__
+    try:
+        audio = mic.pyaudio_module.PyAudio()
+        try:
+            if mic.device_index is None:
+                info = audio.get_default_input_device_info()
+            else:
+                info = audio.get_device_info_by_index(mic.device_index)
+        finally:
+            audio.terminate()
+        return f"{info['name']}@{mic.SAMPLE_RATE}"
+    except Exception as e:
+        logger.error(f"Could not identify input device: {e}")
+        return f"device{mic.device_index}@{mic.SAMPLE_RATE}"
+
+class NoiseProfileCache:
+    """Learned noise floors per input device, saved as JSON
+    
+    The VAD starts from the saved floor instead of spending its warm-up
+    measuring the room, and keeps adapting from there.
+    """
+    
+    def __init__(self, path):
+        self.path = path
+        self.lock = threading.Lock()
+        self.profiles = {}  # device key -> {'noise_floor', 'updated'}
+        self.load()
+    
+    def load(self):
+        """Read saved profiles from disk"""
+        try:
+            if os.path.exists(self.path):
+                with open(self.path, 'r') as f:
+                    profiles = json.load(f)
+                with self.lock:
+                    self.profiles = profiles
+                logger.info(f"Loaded noise profiles for {len(profiles)} devices")
+        except Exception as e:
+            logger.error(f"Error loading noise profiles: {e}")
+    
+    def save(self):
+        """Write profiles to disk"""
+        try:
+            with self.lock:
+                data = json.dumps(self.profiles)
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'w') as f:
+                f.write(data)
+            os.replace(temp_path, self.path)
+        except Exception as e:
+            logger.error(f"Error saving noise profiles: {e}")
+    
+    def get(self, key):
+        """Saved noise floor for a device, or None"""
+        with self.lock:
+            profile = self.profiles.get(key)
+        return profile['noise_floor'] if profile else None
+    
+    def put(self, key, noise_floor):
+        """Remember a device's current noise floor; returns False if it barely changed"""
+        with self.lock:
+            profile = self.profiles.get(key)
+            if profile and abs(profile['noise_floor'] - noise_floor) < max(profile['noise_floor'] * 0.05, 1):
+                return False
+            self.profiles[key] = {'noise_floor': round(float(noise_floor), 1), 'updated': time.time()}
+        return True
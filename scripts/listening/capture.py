@@ -0,0 +1,172 @@
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+class FrameRingBuffer:
+    """Fixed-size PCM ring buffer that hands out zero-copy memoryview windows
+    
+    Every write lands twice, at its offset and one capacity later, so any
+    window up to the capacity is contiguous in memory and can be sliced
+    without copying. Positions are absolute byte counts since the start.
+    """
+    
+    def __init__(self, capacity, guard=0):
+        self.capacity = capacity
+        self.guard = guard  # Bytes a reader must stay ahead of the writer by
+        self.data = bytearray(capacity * 2)
+        self.view = memoryview(self.data)
+        self.written = 0
+        self.closed = False
+        self.condition = threading.Condition()
+    
+    def write(self, data):
+        """Append PCM bytes, overwriting the oldest audio"""
+        data = memoryview(data).cast('B')
+        skipped = max(len(data) - self.capacity, 0)
+        data = data[skipped:]
+        
+        start = (self.written + skipped) % self.capacity
+        first = min(len(data), self.capacity - start)
+        rest = len(data) - first
+        for offset in (0, self.capacity):
+            self.view[offset + start:offset + start + first] = data[:first]
+            if rest:
+                self.view[offset:offset + rest] = data[first:]
+        
+        with self.condition:
+            self.written += skipped + len(data)
+            self.condition.notify_all()
+    
+    def oldest(self):
+        """Oldest position that is still safe to read"""
+        return max(self.written - self.capacity + self.guard, 0)
+    
+    def window(self, start, end):
+        """Zero-copy view of the bytes between two absolute positions"""
+        if start < self.oldest() or end > self.written or end - start > self.capacity:
+            raise IndexError(f"Window {start}-{end} is outside the buffered audio")
+        offset = start % self.capacity
+        return self.view[offset:offset + end - start]
+    
+    def wait_for(self, position, timeout=None):
+        """Block until the writer has passed a position; False on close or timeout"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.written >= position or self.closed, timeout)
+            return self.written >= position
+    
+    def close(self):
+        """Wake up any waiting readers"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+class RingReader:
+    """Independent cursor over a FrameRingBuffer"""
+    
+    def __init__(self, buffer, position, frame_bytes):
+        self.buffer = buffer
+        self.position = position
+        self.frame_bytes = frame_bytes
+        self.overruns = 0  # Times this reader fell behind and lost audio
+    
+    def _check_overrun(self):
+        """Skip ahead if the writer has lapped this reader"""
+        oldest = self.buffer.oldest()
+        if self.position < oldest:
+            self.overruns += 1
+            logger.warning(f"Audio reader fell behind, skipped {oldest - self.position} bytes")
+            self.seek(oldest)
+    
+    def read(self, size, timeout=None):
+        """Next `size` bytes as a memoryview, or an empty view once capture stops"""
+        self._check_overrun()
+        if not self.buffer.wait_for(self.position + size, timeout):
+            return memoryview(b'')
+        data = self.buffer.window(self.position, self.position + size)
+        self.position += size
+        return data
+    
+    def read_available(self, max_size, timeout=None):
+        """Everything buffered past the cursor, up to max_size, waiting for at least one frame"""
+        self._check_overrun()
+        if not self.buffer.wait_for(self.position + self.frame_bytes, timeout):
+            return memoryview(b'')
+        size = min(self.buffer.written - self.position, max_size)
+        size -= size % self.frame_bytes
+        data = self.buffer.window(self.position, self.position + size)
+        self.position += size
+        return data
+    
+    def seek(self, position):
+        """Move to an absolute position, clamped to the buffered audio and frame aligned"""
+        position = min(max(position, self.buffer.oldest()), self.buffer.written)
+        self.position = position - position % self.frame_bytes
+    
+    def rewind(self, size):
+        """Step back so the next read starts earlier, e.g. for pre-roll"""
+        self.seek(self.position - size)
+
+class AudioCapture:
+    """Continuously reads the microphone into a ring buffer on its own thread
+    
+    Consumers get their own readers, so a slow recognizer never stops the
+    microphone from being read and audio spoken in the meantime is kept.
+    """
+    
+    def __init__(self, mic, buffer_seconds=20):
+        self.mic = mic
+        self.sample_rate = mic.SAMPLE_RATE
+        self.sample_width = mic.SAMPLE_WIDTH
+        self.chunk = mic.CHUNK
+        self.bytes_per_second = self.sample_rate * self.sample_width
+        self.buffer = FrameRingBuffer(
+            int(buffer_seconds * self.bytes_per_second),
+            guard=self.chunk * self.sample_width * 4
+        )
+        self.running = False
+        self.thread = None
+    
+    def start(self):
+        """Start the capture thread"""
+        if self.running:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._capture_loop, daemon=True)
+        self.thread.start()
+    
+    def _capture_loop(self):
+        """Read microphone chunks until stopped"""
+        try:
+            with self.mic as source:
+                while self.running:
+                    data = source.stream.read(source.CHUNK)
+                    if not data:
+                        # Only replayed input ever runs out
+                        logger.info("Audio input ended")
+                        break
+                    self.buffer.write(data)
+        except Exception as e:
+            logger.error(f"Error capturing audio: {e}")
+        finally:
+            self.running = False
+            self.buffer.close()
+    
+    def stop(self):
+        """Stop capturing and release waiting readers"""
+        self.running = False
+        self.buffer.close()
+        if self.thread:
+            self.thread.join(timeout=1)
+            self.thread = None
+    
+    def ms_to_bytes(self, ms):
+        """Frame aligned byte count for a duration"""
+        frames = int(self.sample_rate * ms / 1000)
+        return frames * self.sample_width
+    
+    def reader(self, pre_roll_ms=0):
+        """New reader starting `pre_roll_ms` before the live position"""
+        reader = RingReader(self.buffer, self.buffer.written, self.sample_width)
+        reader.rewind(self.ms_to_bytes(pre_roll_ms))
+        return reader
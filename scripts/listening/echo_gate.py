@@ -0,0 +1,123 @@
+import re
+import logging
+import threading
+from collections import deque
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+def normalize_words(text):
+    """Lower-case words without punctuation, for comparing transcripts with spoken text"""
+    return re.findall(r"[a-z0-9']+", text.lower())
+
+class EchoGate:
+    """Keeps Ova's own voice out of speech recognition
+    
+    Playback periods are marked as byte ranges of the capture stream (plus a
+    tail for the mixer and room echo). Audio in those ranges is attenuated,
+    or discarded, both before the VAD sees it and in the segments sent to
+    speech-to-text, so playback rarely opens a speech segment or gets
+    transcribed. Transcripts that still come through during playback are
+    dropped when they are mostly words of the response Ova is giving.
+    """
+    
+    def __init__(self, buffer, sample_rate, sample_width=2, mode='attenuate', attenuation=0.2,
+                 tail_ms=300, match_ratio=0.7, max_text=2000):
+        self.buffer = buffer  # Capture ring, its write position marks playback in the stream
+        self.sample_width = sample_width
+        self.mode = mode  # 'attenuate' scales playback audio down, 'discard' silences it
+        self.attenuation = 0.0 if mode == 'discard' else attenuation
+        self.tail_bytes = sample_rate * tail_ms // 1000 * sample_width
+        self.match_ratio = match_ratio
+        self.max_text = max_text
+        self.lock = threading.Lock()
+        self.intervals = deque(maxlen=32)  # [start, end] byte ranges, end is None while playing
+        self.spoken_text = ""
+        self.gated_bytes = 0
+        self.bytes_per_second = sample_rate * sample_width
+        self.suppressed_segments = 0
+        self.passed_segments = 0
+    
+    @property
+    def playing(self):
+        return bool(self.intervals) and self.intervals[-1][1] is None
+    
+    def set_playing(self, playing):
+        """Mark the start or end of Ova's voice at the current capture position"""
+        position = self.buffer.written
+        with self.lock:
+            if playing and not self.playing:
+                self.intervals.append([position, None])
+            elif not playing and self.playing:
+                self.intervals[-1][1] = position + self.tail_bytes
+    
+    def add_text(self, text):
+        """Remember text Ova is saying; streamed tokens can be added as they arrive"""
+        with self.lock:
+            self.spoken_text = (self.spoken_text + text)[-self.max_text:]
+    
+    def clear_text(self):
+        """Forget what Ova said, when a new response starts"""
+        with self.lock:
+            self.spoken_text = ""
+    
+    def _gated_ranges(self, start, end):
+        """Parts of [start, end) that fall inside playback, clipped to it"""
+        with self.lock:
+            intervals = [(s, e) for s, e in self.intervals]
+        ranges = []
+        for s, e in intervals:
+            e = self.buffer.written + self.tail_bytes if e is None else e
+            if s < end and e > start:
+                ranges.append((max(s, start), min(e, end)))
+        return ranges
+    
+    def overlap(self, start, end):
+        """Fraction of a stretch of the stream that was played over"""
+        if end <= start:
+            return 0.0
+        return sum(e - s for s, e in self._gated_ranges(start, end)) / (end - start)
+    
+    def process(self, pcm, position, count=True):
+        """Audio starting at an absolute position with playback scaled down, uncopied if none overlaps
+        
+        `count` is off when gating audio the VAD has already seen, so the stats count it once.
+        """
+        ranges = self._gated_ranges(position, position + len(pcm))
+        if not ranges:
+            return pcm
+        
+        samples = np.frombuffer(pcm, dtype=np.int16).copy()
+        for s, e in ranges:
+            first = (s - position) // self.sample_width
+            last = (e - position) // self.sample_width
+            samples[first:last] = (samples[first:last] * self.attenuation).astype(np.int16)
+            if count:
+                self.gated_bytes += e - s
+        return samples.tobytes()
+    
+    def is_echo(self, text, start, end):
+        """Whether a transcript is Ova hearing herself; counts suppressed segments"""
+        if not self.overlap(start, end):
+            self.passed_segments += 1
+            return False
+        
+        words = normalize_words(text)
+        with self.lock:
+            spoken = set(normalize_words(self.spoken_text))
+        matched = sum(1 for word in words if word in spoken)
+        if words and matched / len(words) >= self.match_ratio:
+            self.suppressed_segments += 1
+            logger.info(f"Dropped echo of Ova's own voice: {text}")
+            return True
+        self.passed_segments += 1
+        return False
+    
+    def stats(self):
+        """How much audio was gated and how many transcripts were dropped as echo"""
+        return {
+            'mode': self.mode,
+            'gated_seconds': round(self.gated_bytes / self.bytes_per_second, 1),
+            'suppressed_segments': self.suppressed_segments,
+            'passed_segments': self.passed_segments
+        }
@@ -0,0 +1,85 @@
+import numpy as np
+
+def mel_filterbank(sample_rate, n_fft, n_mels):
+    """Triangular mel filters as an (n_mels, n_fft // 2 + 1) matrix"""
+    def hz_to_mel(hz):
+        return 2595.0 * np.log10(1.0 + hz / 700.0)
+    
+    def mel_to_hz(mel):
+        return 700.0 * (10 ** (mel / 2595.0) - 1.0)
+    
+    # Cap at 8 kHz so features match whatever rate the microphone runs at
+    mel_points = np.linspace(hz_to_mel(0), hz_to_mel(min(sample_rate / 2, 8000)), n_mels + 2)
+    bins = np.floor((n_fft + 1) * mel_to_hz(mel_points) / sample_rate).astype(int)
+    
+    filters = np.zeros((n_mels, n_fft // 2 + 1), dtype=np.float32)
+    for m in range(1, n_mels + 1):
+        left, center, right = bins[m - 1], bins[m], bins[m + 1]
+        if center > left:
+            filters[m - 1, left:center] = (np.arange(left, center) - left) / (center - left)
+        if right > center:
+            filters[m - 1, center:right] = (right - np.arange(center, right)) / (right - center)
+    return filters
+
+def dct_matrix(n_mfcc, n_mels):
+    """Orthonormal DCT-II matrix, so MFCCs are a single matrix product"""
+    n = np.arange(n_mels)
+    k = np.arange(n_mfcc)[:, None]
+    matrix = np.cos(np.pi * k * (2 * n + 1) / (2 * n_mels)) * np.sqrt(2.0 / n_mels)
+    matrix[0] /= np.sqrt(2.0)
+    return matrix.astype(np.float32)
+
+class MFCCExtractor:
+    """Vectorized MFCC features that can be computed over a stream of samples
+    
+    process() accepts any number of samples and returns the feature frames that
+    became complete, carrying partial frames over to the next call.
+    """
+    
+    def __init__(self, sample_rate=16000, frame_ms=25, hop_ms=10, n_mels=26, n_mfcc=13):
+        self.sample_rate = sample_rate
+        self.frame_length = sample_rate * frame_ms // 1000
+        self.hop_length = sample_rate * hop_ms // 1000
+        self.n_fft = 1 << (self.frame_length - 1).bit_length()  # Next power of two
+        self.window = np.hamming(self.frame_length).astype(np.float32)
+        self.filters = mel_filterbank(sample_rate, self.n_fft, n_mels)
+        self.dct = dct_matrix(n_mfcc, n_mels)
+        self.reset()
+        
+    def reset(self):
+        """Forget any buffered samples"""
+        self.buffer = np.zeros(0, dtype=np.float32)
+        self.last_sample = 0.0
+        
+    def _features(self, frames):
+        """MFCCs for a (n_frames, frame_length) block, dropping c0 so loudness doesn't matter"""
+        spectrum = np.abs(np.fft.rfft(frames * self.window, self.n_fft)) ** 2
+        mel = np.log(spectrum @ self.filters.T + 1e-6)
+        return (mel @ self.dct.T)[:, 1:]
+        
+    def process(self, samples):
+        """Add int16 or float samples and return the new feature frames"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.size == 0:
+            return np.zeros((0, self.dct.shape[0] - 1), dtype=np.float32)
+        
+        # Pre-emphasis, carrying the previous sample across calls
+        emphasized = np.empty_like(samples)
+        emphasized[0] = samples[0] - 0.97 * self.last_sample
+        emphasized[1:] = samples[1:] - 0.97 * samples[:-1]
+        self.last_sample = samples[-1]
+        
+        self.buffer = np.concatenate((self.buffer, emphasized / 32768.0))
+        if len(self.buffer) < self.frame_length:
+            return np.zeros((0, self.dct.shape[0] - 1), dtype=np.float32)
+        
+        frames = np.lib.stride_tricks.sliding_window_view(self.buffer, self.frame_length)[::self.hop_length]
+        self.buffer = self.buffer[len(frames) * self.hop_length:]
+        return self._features(frames)
+    
+    def compute(self, samples):
+        """Features for a whole clip"""
+        self.reset()
+        features = self.process(samples)
+        self.reset()
+        return features
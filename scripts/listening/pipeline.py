@@ -0,0 +1,332 @@
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+class BoundedQueue:
+    """Queue between pipeline stages with a fixed size and a policy for when it is full
+    
+    'block' makes the producer wait (backpressure), 'drop_oldest' discards the
+    stalest item to make room and 'drop_newest' discards the incoming one.
+    Dropped items are passed to on_drop so the pipeline can account for them.
+    """
+    
+    def __init__(self, name, max_size, policy='block', on_drop=None):
+        self.name = name
+        self.max_size = max_size
+        self.policy = policy
+        self.on_drop = on_drop
+        self.items = deque()
+        self.condition = threading.Condition()
+        self.closed = False
+        self.put_count = 0
+        self.dropped = 0
+        self.high_water = 0
+    
+    def put(self, item, timeout=None):
+        """Add an item; returns False if it (not an older one) was dropped"""
+        dropped = None
+        with self.condition:
+            if self.closed:
+                return False
+            if len(self.items) >= self.max_size:
+                if self.policy == 'block':
+                    self.condition.wait_for(lambda: len(self.items) < self.max_size or self.closed, timeout)
+                    if self.closed or len(self.items) >= self.max_size:
+                        dropped = item
+                elif self.policy == 'drop_oldest':
+                    dropped = self.items.popleft()
+                else:
+                    dropped = item
+            
+            if dropped is not item:
+                self.items.append(item)
+                self.put_count += 1
+                self.high_water = max(self.high_water, len(self.items))
+                self.condition.notify_all()
+            if dropped is not None:
+                self.dropped += 1
+        
+        if dropped is not None:
+            logger.warning(f"{self.name} queue full, dropped an item")
+            if self.on_drop:
+                self.on_drop(dropped)
+        return dropped is not item
+    
+    def get(self, timeout=None):
+        """Next item, or None on timeout or once closed and empty"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.items or self.closed, timeout)
+            if not self.items:
+                return None
+            item = self.items.popleft()
+            self.condition.notify_all()
+            return item
+    
+    def clear(self):
+        """Drop everything waiting; returns the dropped items"""
+        with self.condition:
+            items = list(self.items)
+            self.items.clear()
+            self.dropped += len(items)
+            self.condition.notify_all()
+        return items
+    
+    def close(self):
+        """Wake up all waiting producers and consumers"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+    
+    def stats(self):
+        """Counters for monitoring backpressure"""
+        with self.condition:
+            return {
+                'size': len(self.items),
+                'max_size': self.max_size,
+                'policy': self.policy,
+                'put': self.put_count,
+                'dropped': self.dropped,
+                'high_water': self.high_water
+            }
+
+class Utterance:
+    """One piece of heard speech moving through the pipeline"""
+    
+    def __init__(self, seq, segment=None, wake_word=None):
+        self.seq = seq
+        self.segment = segment  # SpeechSegment, or None when the wake word was spotted locally
+        self.wake_word = wake_word
+        self.text = ""
+        self.heard_at = time.perf_counter()
+        self.transcribed_at = None
+
+class ListeningPipeline:
+    """capture -> segmenter -> STT worker pool -> intent stage -> response worker
+    
+    Every stage runs on its own thread(s) with a bounded queue in front, so
+    the microphone keeps being read and transcribed while a response is
+    being generated. STT workers may finish out of order; results are
+    handed to the intent stage in the order the speech was heard.
+    """
+    
+    def __init__(self, segmenter, stt, handle_utterance, respond, wake_word_engine=None,
+                 wake_word_required=None, stt_workers=2, stt_queue_size=4, max_segment_seconds=10,
+                 barge_in=None, barge_in_armed=None, echo_gate=None):
+        self.segmenter = segmenter
+        self.reader = segmenter.reader
+        self.stt = stt
+        self.handle_utterance = handle_utterance  # Intent stage callback, gets Utterances in order
+        self.respond = respond  # Response worker callback, gets queued requests
+        self.wake_word_engine = wake_word_engine
+        self.wake_word_required = wake_word_required or (lambda: True)
+        self.stt_worker_count = stt_workers
+        self.max_segment_seconds = max_segment_seconds
+        
+        # Speech onsets and wake words are reported straight from the segmenter while armed,
+        # without waiting for speech-to-text, so Ova can be interrupted quickly
+        self.barge_in = barge_in  # Called with ('vad' or 'wake_word', byte position)
+        self.barge_in_armed = barge_in_armed or (lambda: False)
+        self.watching = False
+        self.watch_origin = 0
+        if barge_in:
+            segmenter.on_block = self._watch_block
+        
+        # Keeps Ova's own voice from being transcribed
+        self.echo_gate = echo_gate
+        segmenter.echo_gate = echo_gate
+        
+        # Stale speech is worth less than new speech, so a backlog sheds the oldest
+        self.stt_queue = BoundedQueue('stt', stt_queue_size, 'drop_oldest', on_drop=self._skip_utterance)
+        self.intent_queue = BoundedQueue('intent', 16, 'block')
+        # Only the latest request matters if several pile up while one is answered
+        self.response_queue = BoundedQueue('response', 1, 'drop_oldest')
+        
+        self.next_seq = 0
+        self.deliver_seq = 0
+        self.pending = {}  # seq -> transcribed Utterance, or None if dropped
+        self.order_lock = threading.Lock()
+        self.seq_lock = threading.Lock()
+        self.stt_errors = 0
+        self.stale_segments = 0  # Segments the ring lapped before they were transcribed
+        self.running = False
+        self.threads = []
+    
+    def start(self):
+        """Start every stage"""
+        self.running = True
+        targets = [self._segment_loop, self._intent_loop, self._response_loop]
+        targets += [self._stt_loop] * self.stt_worker_count
+        for target in targets:
+            thread = threading.Thread(target=target, daemon=True)
+            thread.start()
+            self.threads.append(thread)
+    
+    def stop(self):
+        """Stop every stage; the capture is stopped by its owner"""
+        self.running = False
+        for queue in (self.stt_queue, self.intent_queue, self.response_queue):
+            queue.close()
+        for thread in self.threads:
+            if thread is not threading.current_thread():
+                thread.join(timeout=1)
+        self.threads = []
+    
+    def submit_response(self, request):
+        """Queue work for the response worker"""
+        self.response_queue.put(request)
+    
+    def cancel_pending_responses(self):
+        """Forget requests that haven't started yet"""
+        return self.response_queue.clear()
+    
+    def _segment_loop(self):
+        """Cut speech out of the audio stream, or wait for the wake word when one is required"""
+        while self.running and self._input_left():
+            try:
+                if self.wake_word_engine and self.wake_word_required():
+                    name = self._wait_for_wake_word()
+                    if name:
+                        self.segmenter.reset()
+                        self.stt_queue.put(Utterance(self._take_seq(), wake_word=name))
+                    continue
+                
+                # Time out on silence now and then so a change of mode is noticed
+                segment = self.segmenter.next_segment(timeout=1, max_seconds=self.max_segment_seconds)
+                if segment is not None:
+                    self.stt_queue.put(Utterance(self._take_seq(), segment=segment))
+            except Exception as e:
+                logger.error(f"Error in segmenter stage: {e}")
+                time.sleep(0.5)
+    
+    def _wait_for_wake_word(self):
+        """Feed buffered audio to the wake word engine until it fires or isn't needed any more"""
+        engine = self.wake_word_engine
+        engine.reset()
+        origin = self.reader.position
+        chunk_bytes = self.reader.frame_bytes * 1024
+        while self.running and self.wake_word_required() and self._input_left():
+            chunk = self.reader.read(chunk_bytes, timeout=0.5)
+            if not len(chunk) and self.reader.buffer.closed:
+                break  # Less than a chunk was left
+            detection = engine.process(chunk)
+            if detection:
+                # Resume right after the wake word so the command's first words are kept
+                self.reader.seek(origin + detection.end_sample * self.reader.frame_bytes)
+                logger.info(f"Heard wake word: {detection.name} (score {detection.score:.2f})")
+                return detection.name
+        return None
+    
+    def _input_left(self):
+        """Whether there is audio to come: capture is running, or stopped with some still unread"""
+        buffer = self.reader.buffer
+        return not buffer.closed or buffer.written - self.reader.position >= self.reader.frame_bytes
+    
+    def _watch_block(self, block, position, events):
+        """Segmenter hook: look for the user talking over a response"""
+        if not self.barge_in_armed():
+            self.watching = False
+            return
+        if not self.watching:
+            self.watching = True
+            self.watch_origin = position
+            if self.wake_word_engine:
+                self.wake_word_engine.reset()
+        
+        for event in events:
+            if event.kind == 'start':
+                self.barge_in('vad', event.position)
+                break
+        if self.wake_word_engine:
+            detection = self.wake_word_engine.process(block)
+            if detection:
+                logger.info(f"Heard wake word over a response: {detection.name} (score {detection.score:.2f})")
+                self.barge_in('wake_word', self.watch_origin + detection.end_sample * self.reader.frame_bytes)
+    
+    def _take_seq(self):
+        """Sequence number used to keep transcripts in speaking order"""
+        with self.seq_lock:
+            seq = self.next_seq
+            self.next_seq += 1
+            return seq
+    
+    def _stt_loop(self):
+        """Worker: transcribe segments and pass them on in order"""
+        while self.running:
+            utterance = self.stt_queue.get(timeout=0.5)
+            if utterance is None:
+                continue
+            if utterance.segment is not None:
+                try:
+                    segment = utterance.segment
+                    # The audio is a view into the ring, which may have lapped it while queued or transcribing
+                    if self._is_stale(segment):
+                        self.stale_segments += 1
+                        logger.warning("Dropped a segment the capture ring overwrote before transcription")
+                    else:
+                        utterance.text = self.stt.transcribe(segment.audio, segment.sample_rate, segment.sample_width)
+                        if self._is_stale(segment):
+                            self.stale_segments += 1
+                            utterance.text = ""
+                            logger.warning("Dropped a segment the capture ring overwrote during transcription")
+                    if self.echo_gate and utterance.text and self.echo_gate.is_echo(utterance.text, segment.start, segment.end):
+                        utterance.text = ""
+                except Exception as e:
+                    self.stt_errors += 1
+                    logger.error(f"Speech-to-text failed: {e}")
+            utterance.transcribed_at = time.perf_counter()
+            self._deliver(utterance.seq, utterance)
+    
+    def _is_stale(self, segment):
+        """Whether the writer has overwritten part of a segment's audio"""
+        # Segments the echo gate copied no longer point into the ring
+        return isinstance(segment.audio, memoryview) and segment.start < self.reader.buffer.oldest()
+    
+    def _skip_utterance(self, utterance):
+        """A dropped utterance still takes its place in the ordering"""
+        self._deliver(utterance.seq, None)
+    
+    def _deliver(self, seq, utterance):
+        """Release finished utterances to the intent stage in sequence order"""
+        with self.order_lock:
+            self.pending[seq] = utterance
+            while self.deliver_seq in self.pending:
+                ready = self.pending.pop(self.deliver_seq)
+                self.deliver_seq += 1
+                if ready is not None:
+                    self.intent_queue.put(ready)
+    
+    def _intent_loop(self):
+        """Decide what each transcript means (wake word, command, cancel)"""
+        while self.running:
+            utterance = self.intent_queue.get(timeout=0.5)
+            if utterance is None:
+                continue
+            try:
+                self.handle_utterance(utterance)
+            except Exception as e:
+                logger.error(f"Error handling utterance: {e}")
+    
+    def _response_loop(self):
+        """Worker: generate responses without holding up listening"""
+        while self.running:
+            request = self.response_queue.get(timeout=0.5)
+            if request is None:
+                continue
+            try:
+                self.respond(request)
+            except Exception as e:
+                logger.error(f"Error generating response: {e}")
+    
+    def get_stats(self):
+        """Queue counters, reader overruns, STT timings and echo suppression"""
+        return {
+            'queues': {queue.name: queue.stats() for queue in (self.stt_queue, self.intent_queue, self.response_queue)},
+            'reader_overruns': self.reader.overruns,
+            'stt_errors': self.stt_errors,
+            'stale_segments': self.stale_segments,
+            'stt': self.stt.get_stats(),
+            'echo': self.echo_gate.stats() if self.echo_gate else None
+        }
@@ -0,0 +1,140 @@
+import os
+import json
+import glob
+import time
+import logging
+import threading
+import numpy as np
+import speech_recognition as sr
+from .wake_word import load_wav
+
+logger = logging.getLogger(__name__)
+
+class ReplayStep:
+    """One clip of a replayed session, or a stretch of silence"""
+    
+    def __init__(self, name, pcm, text=None):
+        self.name = name
+        self.pcm = pcm  # 16-bit mono PCM bytes
+        self.text = text  # What is said in the clip, if known
+        self.start = 0  # Byte offsets in the replayed stream
+        self.end = 0
+        self.heard_at = None  # perf_counter time its last byte reached the capture
+
+def silence_step(seconds, sample_rate=16000):
+    """Step of digital silence"""
+    return ReplayStep('silence', bytes(int(seconds * sample_rate) * 2))
+
+def wav_step(path, sample_rate=16000, text=None):
+    """Step playing a WAV file, converted to 16-bit mono at the capture rate"""
+    samples = np.clip(load_wav(path, sample_rate), -32768, 32767).astype(np.int16)
+    return ReplayStep(os.path.basename(path), samples.tobytes(), text)
+
+def read_transcript(path):
+    """Text from the .txt file next to a WAV, if there is one"""
+    transcript_path = os.path.splitext(path)[0] + '.txt'
+    if os.path.exists(transcript_path):
+        with open(transcript_path, 'r', encoding='utf-8') as f:
+            return f.read().strip()
+    return None
+
+def load_session(path, sample_rate=16000, gap_seconds=3.0):
+    """Steps for a WAV file, or a session directory
+    
+    A directory may hold a session.json like
+    {"steps": [{"wav": "hey_ova.wav", "text": "hey ova"}, {"silence": 2.0}]};
+    otherwise its WAV files play in name order with a gap between them,
+    using any same-named .txt file as the transcript.
+    """
+    if os.path.isfile(path):
+        return [wav_step(path, sample_rate, read_transcript(path))]
+    
+    script_path = os.path.join(path, 'session.json')
+    if os.path.exists(script_path):
+        with open(script_path, 'r', encoding='utf-8') as f:
+            script = json.load(f)
+        steps = []
+        for entry in script.get('steps', []):
+            if 'silence' in entry:
+                steps.append(silence_step(entry['silence'], sample_rate))
+            else:
+                wav_path = os.path.join(path, entry['wav'])
+                steps.append(wav_step(wav_path, sample_rate, entry.get('text', read_transcript(wav_path))))
+        return steps
+    
+    steps = []
+    for wav_path in sorted(glob.glob(os.path.join(path, '*.wav'))):
+        steps.append(wav_step(wav_path, sample_rate, read_transcript(wav_path)))
+        steps.append(silence_step(gap_seconds, sample_rate))
+    return steps
+
+class ReplaySource:
+    """Feeds recorded audio to AudioCapture the way a microphone would
+    
+    Has the parts of speech_recognition's Microphone that the capture uses
+    (SAMPLE_RATE, SAMPLE_WIDTH, CHUNK and stream.read), paced at real time
+    or `speed` times faster (0 for as fast as possible). Reads return empty
+    bytes once the session is over, which stops the capture.
+    """
+    
+    def __init__(self, steps, sample_rate=16000, chunk=1024, speed=1.0, lead_in=1.0, tail=2.0):
+        self.SAMPLE_RATE = sample_rate
+        self.SAMPLE_WIDTH = 2
+        self.CHUNK = chunk
+        self.speed = speed
+        # Silence first so the VAD can learn the noise floor, and after so the last phrase ends
+        self.steps = [silence_step(lead_in, sample_rate)] + list(steps) + [silence_step(tail, sample_rate)]
+        
+        position = 0
+        for step in self.steps:
+            step.start = position
+            position += len(step.pcm)
+            step.end = position
+        self.data = b''.join(step.pcm for step in self.steps)
+        self.position = 0
+        self.started_at = None
+        self.finished = threading.Event()
+        self.stream = self
+    
+    def __enter__(self):
+        return self
+    
+    def __exit__(self, exc_type, exc_value, traceback):
+        return False
+    
+    @property
+    def duration(self):
+        return len(self.data) / (self.SAMPLE_RATE * self.SAMPLE_WIDTH)
+    
+    def read(self, frames):
+        """Next `frames` frames, waiting until they are due; empty at the end"""
+        if self.started_at is None:
+            self.started_at = time.perf_counter()
+        size = frames * self.SAMPLE_WIDTH
+        data = self.data[self.position:self.position + size]
+        self.position += len(data)
+        
+        if self.speed:
+            due = self.started_at + self.position / (self.SAMPLE_RATE * self.SAMPLE_WIDTH * self.speed)
+            delay = due - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+        
+        now = time.perf_counter()
+        for step in self.steps:
+            if step.heard_at is None and step.end <= self.position:
+                step.heard_at = now
+        if not data:
+            self.finished.set()
+        return data
+
+def create_input_source(config):
+    """Microphone, or a replayed WAV file or session directory (input_source, input_speed)"""
+    source = config.get('input_source', 'microphone')
+    if source == 'microphone':
+        return sr.Microphone()
+    logger.info(f"Replaying audio from {source}")
+    return ReplaySource(
+        load_session(source, gap_seconds=config.get('input_gap_seconds', 3.0)),
+        speed=config.get('input_speed', 1.0)
+    )
@@ -0,0 +1,217 @@
+import logging
+import numpy as np
+import speech_recognition as sr
+
+logger = logging.getLogger(__name__)
+
+class VADEvent:
+    """Speech started or ended at an absolute byte position in the stream"""
+    
+    def __init__(self, kind, position):
+        self.kind = kind  # 'start', 'end', or 'cancel' when it was too short to be speech
+        self.position = position
+
+class VoiceActivityDetector:
+    """Energy VAD over blocks of frames with an adaptive noise floor
+    
+    Frame energies for a whole block are computed in one NumPy pass; a small
+    state machine then applies hysteresis (separate start and stop levels
+    relative to the noise floor), an onset requirement and a hangover so
+    short pauses don't split a phrase. A floor saved from an earlier run
+    can be passed in to skip the warm-up.
+    """
+    
+    def __init__(self, sample_rate, sample_width=2, frame_ms=20, start_ratio=3.0, stop_ratio=1.8,
+                 min_energy=300, onset_ms=60, hangover_ms=1000, min_speech_ms=150,
+                 max_segment_ms=None, noise_alpha=0.05, warmup_ms=200, noise_floor=None):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frame_samples = sample_rate * frame_ms // 1000
+        self.frame_bytes = self.frame_samples * sample_width
+        self.frame_ms = frame_ms
+        self.start_ratio = start_ratio
+        self.stop_ratio = stop_ratio
+        self.min_energy = min_energy
+        self.onset_frames = max(onset_ms // frame_ms, 1)
+        self.hangover_frames = max(hangover_ms // frame_ms, 1)
+        self.min_speech_frames = max(min_speech_ms // frame_ms, 1)
+        self.max_segment_ms = max_segment_ms
+        self.noise_alpha = noise_alpha
+        # Known floors need no warm-up, the moving average carries on from them
+        self.warmup_frames = 0 if noise_floor else warmup_ms // frame_ms
+        self.noise_floor = noise_floor
+        self.frames_seen = 0
+        self.reset()
+    
+    def reset(self):
+        """Forget any speech in progress but keep the learned noise floor"""
+        self.remainder = np.zeros(0, dtype=np.int16)
+        self.in_speech = False
+        self.onset = 0  # Consecutive loud frames while waiting for speech
+        self.silent = 0  # Consecutive quiet frames while in speech
+        self.speech_frames = 0
+        self.segment_frames = 0
+        self.segment_min_energy = None
+        self.start_position = 0
+    
+    @property
+    def start_threshold(self):
+        return max(self.noise_floor * self.start_ratio, self.min_energy)
+    
+    @property
+    def stop_threshold(self):
+        return max(self.noise_floor * self.stop_ratio, self.min_energy * self.stop_ratio / self.start_ratio)
+    
+    def frame_energies(self, samples):
+        """RMS of every complete frame in a block"""
+        frames = len(samples) // self.frame_samples
+        block = samples[:frames * self.frame_samples].astype(np.float32).reshape(frames, self.frame_samples)
+        return np.sqrt(np.einsum('ij,ij->i', block, block) / self.frame_samples)
+    
+    def _update_noise_floor(self, energy):
+        """Follow the floor down quickly and up slowly, only while nobody is talking"""
+        if self.noise_floor is None:
+            self.noise_floor = energy
+        elif energy < self.noise_floor:
+            self.noise_floor += 0.5 * (energy - self.noise_floor)
+        else:
+            self.noise_floor += self.noise_alpha * (energy - self.noise_floor)
+    
+    def process(self, pcm, position, learn=True):
+        """Feed PCM starting at an absolute byte position; returns a list of VADEvents
+        
+        With `learn` off the noise floor is left alone, for audio that was
+        turned down and says nothing about the room.
+        """
+        samples = np.frombuffer(pcm, dtype=np.int16)
+        # Keep frame boundaries stable across blocks of any size
+        position -= len(self.remainder) * self.sample_width
+        if len(self.remainder):
+            samples = np.concatenate((self.remainder, samples))
+        energies = self.frame_energies(samples)
+        self.remainder = samples[len(energies) * self.frame_samples:].copy()
+        
+        events = []
+        max_frames = self.max_segment_ms // self.frame_ms if self.max_segment_ms else None
+        for index, energy in enumerate(energies.tolist()):
+            frame_position = position + index * self.frame_bytes
+            self.frames_seen += 1
+            
+            if not self.in_speech:
+                if self.frames_seen <= self.warmup_frames or self.noise_floor is None:
+                    if learn or self.noise_floor is None:
+                        self._update_noise_floor(energy)
+                    continue
+                if energy > self.start_threshold:
+                    self.onset += 1
+                    if self.onset >= self.onset_frames:
+                        self.in_speech = True
+                        self.start_position = frame_position - (self.onset - 1) * self.frame_bytes
+                        self.speech_frames = self.segment_frames = self.onset
+                        self.segment_min_energy = energy
+                        self.silent = 0
+                        events.append(VADEvent('start', self.start_position))
+                else:
+                    self.onset = 0
+                    if learn:
+                        self._update_noise_floor(energy)
+                continue
+            
+            self.segment_frames += 1
+            self.segment_min_energy = min(self.segment_min_energy, energy)
+            if energy > self.stop_threshold:
+                self.speech_frames += 1
+                self.silent = 0
+            else:
+                self.silent += 1
+            
+            end_position = frame_position + self.frame_bytes
+            if self.silent >= self.hangover_frames or (max_frames and self.segment_frames >= max_frames):
+                if learn and self.silent < self.hangover_frames and self.segment_min_energy > self.noise_floor:
+                    # Never went quiet for a whole segment: the room got louder, not someone talking.
+                    # Its quietest frame is the best guess at the new floor.
+                    self.noise_floor = self.segment_min_energy
+                self.in_speech = False
+                self.onset = 0
+                if self.speech_frames >= self.min_speech_frames:
+                    events.append(VADEvent('end', end_position))
+                else:
+                    events.append(VADEvent('cancel', end_position))
+        return events
+
+class SpeechSegment:
+    """A stretch of speech cut out of the capture ring"""
+    
+    def __init__(self, audio, start, end, sample_rate, sample_width):
+        self.audio = audio  # memoryview into the ring, valid until the writer laps it, or bytes once gated
+        self.start = start
+        self.end = end
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+    
+    @property
+    def duration(self):
+        return len(self.audio) / (self.sample_rate * self.sample_width)
+    
+    def to_audio_data(self):
+        """Copy into an AudioData for speech_recognition"""
+        return sr.AudioData(bytes(self.audio), self.sample_rate, self.sample_width)
+
+class Segmenter:
+    """Runs the VAD over a ring reader and cuts speech segments with pre-roll"""
+    
+    def __init__(self, reader, vad, pre_roll_ms=300, max_block_ms=500):
+        self.reader = reader
+        self.vad = vad
+        self.pre_roll_bytes = vad.sample_rate * pre_roll_ms // 1000 * vad.sample_width
+        # Whatever has piled up is analysed in one block, up to this size
+        self.max_block_bytes = vad.sample_rate * max_block_ms // 1000 * vad.sample_width
+        self.last_end = reader.position
+        self.on_block = None  # Optional observer: gets every analysed block, its position and VAD events
+        self.echo_gate = None  # Optional EchoGate that turns Ova's own voice down before the VAD and STT
+    
+    def reset(self):
+        """Start fresh from the reader's current position, e.g. after it was moved"""
+        self.vad.reset()
+        self.last_end = self.reader.position
+    
+    def next_segment(self, timeout=None, max_seconds=None):
+        """Block until a speech segment ends; None on timeout (in audio seconds) or when capture stops"""
+        # Segments can't outgrow what the ring still holds once they end
+        bytes_per_second = self.vad.sample_rate * self.vad.sample_width
+        buffered_ms = (self.reader.buffer.capacity - self.reader.buffer.guard - self.pre_roll_bytes) * 1000 // bytes_per_second
+        self.vad.max_segment_ms = min(int(max_seconds * 1000), buffered_ms) if max_seconds else buffered_ms
+        waited = 0
+        timeout_bytes = timeout * bytes_per_second if timeout else None
+        
+        while True:
+            block = self.reader.read_available(self.max_block_bytes, timeout=0.5)
+            if not len(block):
+                if self.reader.buffer.closed:
+                    return None
+                continue
+            
+            position = self.reader.position - len(block)
+            analysed = self.echo_gate.process(block, position) if self.echo_gate else block
+            # Gated playback would drag the learned (and saved) noise floor down
+            events = self.vad.process(analysed, position, learn=analysed is block)
+            if self.on_block:
+                self.on_block(block, position, events)
+            for event in events:
+                if event.kind == 'end':
+                    # Pre-roll catches soft onsets, without reaching back into the last segment
+                    start = max(self.vad.start_position - self.pre_roll_bytes, self.last_end, self.reader.buffer.oldest())
+                    self.last_end = event.position
+                    audio = self.reader.buffer.window(start, event.position)
+                    if self.echo_gate:
+                        # Speech-to-text hears the same gated audio as the VAD, copied only if it overlaps playback
+                        audio = self.echo_gate.process(audio, start, count=False)
+                    # Anything after the end belongs to the next segment
+                    self.reader.seek(event.position)
+                    self.vad.reset()
+                    return SpeechSegment(audio, start, event.position, self.vad.sample_rate, self.vad.sample_width)
+            
+            if not self.vad.in_speech:
+                waited += len(block)
+                if timeout_bytes and waited >= timeout_bytes:
+                    return None
@@ -0,0 +1,129 @@
+import re
+
+# Wake phrase plus the ways speech-to-text tends to mishear it
+DEFAULT_WAKE_PHRASES = [
+    "hey ova", "hey nova", "hey bova", "hey over",
+    "jehovah", "hanover", "hangover", "hey eva",
+    "hey oppa", "hey google", "hey opa", "okay over", "okay ova", "hey al"
+]
+
+SOUNDEX_CODES = {}
+for letters, code in (('bfpv', '1'), ('cgjkqsxz', '2'), ('dt', '3'), ('l', '4'), ('mn', '5'), ('r', '6')):
+    for letter in letters:
+        SOUNDEX_CODES[letter] = code
+
+WORD_PATTERN = re.compile(r"[a-z0-9']+")
+
+def phonetic_key(word):
+    """Soundex-style key that also codes the first letter, so "ova", "eva" and "opa" agree
+    
+    Vowels at the start become 'A' and h/w/y become 'H'; after that vowels
+    only separate repeated consonant codes, as in Soundex.
+    """
+    word = word.lower().replace("'", "")
+    if not word:
+        return ""
+    first = word[0]
+    if first in 'aeiou':
+        key = 'A'
+    elif first in 'hwy':
+        key = 'H'
+    else:
+        key = SOUNDEX_CODES.get(first, first)
+    previous = SOUNDEX_CODES.get(first)
+    for letter in word[1:]:
+        code = SOUNDEX_CODES.get(letter)
+        if code and code != previous:
+            key += code
+        if letter not in 'hw':
+            previous = code
+    return key
+
+def edit_distance(a, b):
+    """Character level Levenshtein distance"""
+    previous = list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            current.append(min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b)))
+        previous = current
+    return previous[-1]
+
+class WakePhraseMatch:
+    """Where a wake phrase was found in a transcript"""
+    
+    def __init__(self, phrase, text, start, end, phonetic=False):
+        self.phrase = phrase  # Configured phrase that matched
+        self.text = text  # Transcript it was found in
+        self.start = start
+        self.end = end
+        self.phonetic = phonetic  # Found by sound rather than spelling
+    
+    @property
+    def matched_text(self):
+        return self.text[self.start:self.end]
+    
+    @property
+    def command(self):
+        """The transcript with exactly the wake phrase cut out"""
+        after = self.text[self.end:].strip(" ,.!?")
+        before = self.text[:self.start].strip(" ,.!?")
+        return after or before
+
+class WakePhraseMatcher:
+    """Finds a wake phrase in a transcript, built once from the configured phrases
+    
+    Exact phrases are found with one compiled regex on whole words.
+    Failing that, transcript words are looked up in an index of phonetic
+    keys, and candidates that sound alike are accepted if their spelling
+    is also close enough, so new mishearings are caught without adding
+    every variant by hand.
+    """
+    
+    def __init__(self, phrases=None, phonetic=True, max_distance=0.25):
+        self.phrases = [phrase.lower().strip() for phrase in (phrases or DEFAULT_WAKE_PHRASES) if phrase.strip()]
+        self.phonetic = phonetic
+        self.max_distance = max_distance  # Edit distance allowed per character of the phrase
+        
+        # Longest first so "hey ova" wins over a shorter phrase inside it
+        alternatives = sorted(self.phrases, key=len, reverse=True)
+        pattern = '|'.join(r'\s+'.join(re.escape(word) for word in phrase.split()) for phrase in alternatives)
+        self.pattern = re.compile(rf"(?<![\w'])(?:{pattern})(?![\w'])", re.IGNORECASE)
+        self.by_text = {' '.join(phrase.split()): phrase for phrase in self.phrases}
+        
+        # First word's key -> [(keys of every word, phrase)]
+        self.index = {}
+        for phrase in self.phrases:
+            keys = tuple(phonetic_key(word) for word in phrase.split())
+            self.index.setdefault(keys[0], []).append((keys, phrase))
+    
+    def find(self, text):
+        """First wake phrase in the transcript, or None"""
+        match = self.pattern.search(text)
+        if match:
+            phrase = self.by_text.get(' '.join(match.group(0).lower().split()), match.group(0).lower())
+            return WakePhraseMatch(phrase, text, match.start(), match.end())
+        if self.phonetic:
+            return self._find_phonetic(text)
+        return None
+    
+    def _find_phonetic(self, text):
+        """Slide over the transcript's words looking for phrases that sound alike"""
+        words = [(m.group(0), m.start(), m.end()) for m in WORD_PATTERN.finditer(text.lower())]
+        keys = [phonetic_key(word) for word, _, _ in words]
+        for i, key in enumerate(keys):
+            for phrase_keys, phrase in self.index.get(key, ()):
+                count = len(phrase_keys)
+                if tuple(keys[i:i + count]) != phrase_keys:
+                    continue
+                heard = ' '.join(word for word, _, _ in words[i:i + count])
+                if edit_distance(heard, phrase) <= self.max_distance * len(phrase):
+                    return WakePhraseMatch(phrase, text, words[i][1], words[i + count - 1][2], phonetic=True)
+        return None
+
+def create_wake_phrase_matcher(config):
+    """Matcher for the wake phrases in config (wake_phrases, wake_phrase_phonetic)"""
+    return WakePhraseMatcher(
+        config.get('wake_phrases') or DEFAULT_WAKE_PHRASES,
+        phonetic=config.get('wake_phrase_phonetic', True)
+    )
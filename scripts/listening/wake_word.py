@@ -0,0 +1,211 @@
+import os
+import sys
+import glob
+import wave
+import logging
+import numpy as np
+from .features import MFCCExtractor
+
+logger = logging.getLogger(__name__)
+
+def get_resource_path(relative_path):
+    """Get the correct resource path whether running as script or frozen exe"""
+    if getattr(sys, 'frozen', False):
+        # User recorded templates live next to the executable
+        if relative_path.startswith('wake_words'):
+            return os.path.join(os.path.dirname(sys.executable), relative_path)
+        return os.path.join(sys._MEIPASS, relative_path)
+    else:
+        base_path = os.path.dirname(os.path.dirname(os.path.dirname(__file__)))
+        return os.path.join(base_path, relative_path)
+
+def resample(samples, from_rate, to_rate):
+    """Linear interpolation resample, plenty for keyword features"""
+    if from_rate == to_rate:
+        return samples
+    count = int(round(len(samples) * to_rate / from_rate))
+    positions = np.arange(count) * (from_rate / to_rate)
+    return np.interp(positions, np.arange(len(samples)), samples).astype(np.float32)
+
+def load_wav(path, sample_rate):
+    """Read a 16-bit WAV file as mono float samples at the given rate"""
+    with wave.open(path, 'rb') as wav:
+        if wav.getsampwidth() != 2:
+            raise ValueError(f"{path}: only 16-bit WAV files are supported")
+        channels = wav.getnchannels()
+        rate = wav.getframerate()
+        data = wav.readframes(wav.getnframes())
+    
+    samples = np.frombuffer(data, dtype=np.int16).astype(np.float32)
+    if channels > 1:
+        samples = samples.reshape(-1, channels).mean(axis=1)
+    return resample(samples, rate, sample_rate)
+
+def trim_silence(samples, sample_rate, floor_db=-30):
+    """Cut leading and trailing silence so templates only hold the spoken phrase"""
+    hop = sample_rate // 100
+    frames = len(samples) // hop
+    if frames == 0:
+        return samples
+    rms = np.sqrt((samples[:frames * hop].reshape(frames, hop) ** 2).mean(axis=1))
+    voiced = np.nonzero(rms > rms.max() * 10 ** (floor_db / 20))[0]
+    if len(voiced) == 0:
+        return samples
+    start = max(voiced[0] - 5, 0) * hop
+    end = min(voiced[-1] + 6, frames) * hop
+    return samples[start:end]
+
+class WakeWordDetection:
+    """A wake word found in the audio stream"""
+    
+    def __init__(self, name, score, start_sample, end_sample):
+        self.name = name
+        self.score = score
+        self.start_sample = start_sample
+        self.end_sample = end_sample
+
+class TemplateWakeWordEngine:
+    """Keyword spotter matching live MFCCs against recorded templates with streaming DTW
+    
+    Each template keeps one column of a subsequence DTW matrix, so every new
+    feature frame costs one vectorized step per template and the wake word can
+    start anywhere in the stream.
+    """
+    
+    def __init__(self, templates_dir, sample_rate=16000, threshold=None, name="hey ova", refractory_seconds=1.5):
+        self.name = name
+        self.sample_rate = sample_rate
+        self.extractor = MFCCExtractor(sample_rate)
+        self.refractory_frames = int(refractory_seconds * 1000 / 10)
+        self.templates = self.load_templates(templates_dir)
+        self.reset()
+        self.threshold = threshold if threshold is not None else self._calibrate_threshold()
+        logger.info(f"Loaded {len(self.templates)} wake word templates, threshold {self.threshold:.2f}")
+        
+    def load_templates(self, templates_dir):
+        """Compute features for every WAV recording in the folder"""
+        templates = []
+        for path in sorted(glob.glob(os.path.join(templates_dir, '*.wav'))):
+            try:
+                samples = trim_silence(load_wav(path, self.sample_rate), self.sample_rate)
+                features = self.extractor.compute(samples)
+                if len(features) < 10:
+                    logger.warning(f"Skipping wake word template {path}: too short")
+                    continue
+                templates.append(features)
+            except Exception as e:
+                logger.error(f"Error loading wake word template {path}: {e}")
+        return templates
+    
+    def _calibrate_threshold(self, margin=1.25):
+        """Derive a threshold from how well the templates match each other"""
+        if len(self.templates) < 2:
+            return 4.0
+        scores = []
+        for i, template in enumerate(self.templates):
+            others = [t for j, t in enumerate(self.templates) if j != i]
+            state = self._new_state(others)
+            best = min((self._step(state, others, frame)[0] for frame in template), default=np.inf)
+            scores.append(best)
+        return float(np.median(scores) * margin)
+    
+    def _new_state(self, templates):
+        """Empty DTW columns (cost, path length, start frame) for each template"""
+        return [
+            [np.full(len(t), np.inf, dtype=np.float32), np.zeros(len(t), dtype=np.int32), np.zeros(len(t), dtype=np.int64)]
+            for t in templates
+        ]
+    
+    def reset(self):
+        """Clear stream state, e.g. after the microphone was paused"""
+        self.extractor.reset()
+        self.state = self._new_state(self.templates)
+        self.frame_index = 0
+        self.refractory_until = 0
+        self.candidate = None
+        
+    def _step(self, state, templates, frame):
+        """Advance every template's DTW column by one frame; returns (best score, start frame)"""
+        best_score, best_start = np.inf, 0
+        for column, template in zip(state, templates):
+            cost, length, start = column
+            distance = np.sqrt(((template - frame) ** 2).sum(axis=1))
+            
+            # Candidates: stay on the template frame, advance one, or skip one
+            costs = np.full((3, len(template)), np.inf, dtype=np.float32)
+            lengths = np.zeros((3, len(template)), dtype=np.int32)
+            starts = np.zeros((3, len(template)), dtype=np.int64)
+            costs[0], lengths[0], starts[0] = cost, length, start
+            costs[1, 1:], lengths[1, 1:], starts[1, 1:] = cost[:-1], length[:-1], start[:-1]
+            costs[2, 2:], lengths[2, 2:], starts[2, 2:] = cost[:-2], length[:-2], start[:-2]
+            
+            # Pick the path with the lowest average cost once this frame is added
+            choice = np.argmin((costs + distance) / (lengths + 1), axis=0)
+            index = np.arange(len(template))
+            new_cost = costs[choice, index] + distance
+            new_length = lengths[choice, index] + 1
+            new_start = starts[choice, index]
+            
+            # Open beginning: the wake word may start on any frame
+            if not np.isfinite(new_cost[0]) or distance[0] <= new_cost[0] / new_length[0]:
+                new_cost[0], new_length[0], new_start[0] = distance[0], 1, self.frame_index
+            
+            column[0], column[1], column[2] = new_cost, new_length, new_start
+            
+            # Don't accept paths stretched far beyond the template's length
+            if new_length[-1] <= 2 * len(template):
+                score = new_cost[-1] / new_length[-1]
+                if score < best_score:
+                    best_score, best_start = score, new_start[-1]
+        return best_score, best_start
+    
+    def process(self, pcm):
+        """Feed 16-bit PCM (bytes or int16 array) and return a WakeWordDetection or None"""
+        if not self.templates:
+            return None
+        samples = np.frombuffer(pcm, dtype=np.int16) if isinstance(pcm, (bytes, bytearray, memoryview)) else pcm
+        
+        detection = None
+        hop = self.extractor.hop_length
+        for frame in self.extractor.process(samples):
+            self.frame_index += 1
+            score, start = self._step(self.state, self.templates, frame)
+            
+            if self.frame_index < self.refractory_until:
+                continue
+            
+            # Hold the best match until the score turns back up so the whole
+            # wake word is behind the detection point
+            if score < self.threshold and (self.candidate is None or score < self.candidate.score):
+                self.candidate = WakeWordDetection(self.name, float(score), int(start) * hop, self.frame_index * hop)
+            elif self.candidate is not None and detection is None:
+                detection = self.candidate
+                self.candidate = None
+                self.refractory_until = self.frame_index + self.refractory_frames
+        return detection
+
+# Engines that can spot the wake word on raw audio; 'transcript' means the old
+# speech-to-text substring match and needs no engine
+WAKE_WORD_ENGINES = {
+    'template': TemplateWakeWordEngine,
+}
+
+def create_wake_word_engine(config, sample_rate):
+    """Build the configured wake word engine, or None to use transcript matching"""
+    engine_name = config.get('wake_word_engine', 'transcript')
+    if engine_name == 'transcript':
+        return None
+    if engine_name not in WAKE_WORD_ENGINES:
+        logger.error(f"Unknown wake word engine '{engine_name}', using transcript matching")
+        return None
+    
+    templates_dir = config.get('wake_word_templates') or get_resource_path('wake_words')
+    engine = WAKE_WORD_ENGINES[engine_name](
+        templates_dir,
+        sample_rate=sample_rate,
+        threshold=config.get('wake_word_threshold')
+    )
+    if not engine.templates:
+        logger.warning(f"No wake word templates in {templates_dir}, using transcript matching")
+        return None
+    return engine
@@ -0,0 +1,175 @@
+import heapq
+import itertools
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal
+
+logger = logging.getLogger(__name__)
+
+# Where a timer's callback runs
+GUI = 'gui'        # The Qt GUI thread, for anything touching widgets
+WORKER = 'worker'  # A small shared thread pool, for work that may block
+INLINE = 'inline'  # The scheduler thread itself, only for tiny callbacks
+
+class TimerHandle:
+    """A scheduled callback that can be cancelled until it runs"""
+    
+    def __init__(self, handle_id, due, callback, args, dispatch, interval=None, name=None):
+        self.id = handle_id
+        self.due = due  # perf_counter time the callback should run at
+        self.callback = callback
+        self.args = args
+        self.dispatch = dispatch
+        self.interval = interval  # Seconds between runs for repeating timers
+        self.name = name or getattr(callback, '__name__', 'timer')
+        self.cancelled = False
+        self.fired = 0  # Times it was handed to its dispatch target
+        self.finished = 0  # Times its callback returned, which for GUI timers can be well after firing
+    
+    def cancel(self):
+        """Stop the timer; safe to call from any thread, or more than once"""
+        get_scheduler().cancel(self)
+    
+    @property
+    def active(self):
+        """Whether the callback is still to come or running: one-shot timers stay active until it returns"""
+        return not self.cancelled and (self.interval is not None or not self.finished)
+
+class Scheduler(QObject):
+    """One thread and one heap for every timer in the app
+    
+    Timers sit in a heap ordered by due time; the scheduler thread sleeps
+    until the earliest one, then hands its callback to the GUI thread (via
+    a queued signal), the worker pool, or runs it inline. Cancelled timers
+    are left in the heap and skipped when they come up. How late callbacks
+    actually start is recorded per dispatch target.
+    """
+    task_due = pyqtSignal(int)
+    
+    def __init__(self, workers=2):
+        super().__init__()
+        self.lock = threading.Condition()
+        self.pending = []  # Heap of (due, handle_id)
+        self.handles = {}  # Live timers
+        self.gui_tasks = {}  # Handles waiting for the GUI thread
+        self.ids = itertools.count(1)
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduler-worker")
+        self.lateness = {GUI: deque(maxlen=200), WORKER: deque(maxlen=200), INLINE: deque(maxlen=200)}
+        self.fired = 0
+        self.task_due.connect(self._run_gui_task)
+        
+        self.thread = threading.Thread(target=self._loop, name="scheduler", daemon=True)
+        self.thread.start()
+    
+    def call_later(self, delay, callback, *args, dispatch=WORKER, name=None):
+        """Run callback(*args) once after `delay` seconds"""
+        return self._add(delay, callback, args, dispatch, None, name)
+    
+    def call_every(self, interval, callback, *args, dispatch=WORKER, name=None):
+        """Run callback(*args) every `interval` seconds until cancelled"""
+        return self._add(interval, callback, args, dispatch, interval, name)
+    
+    def _add(self, delay, callback, args, dispatch, interval, name):
+        """Put a new timer on the heap and wake the scheduler if it is now the earliest"""
+        with self.lock:
+            handle = TimerHandle(next(self.ids), time.perf_counter() + delay, callback, args, dispatch, interval, name)
+            self.handles[handle.id] = handle
+            heapq.heappush(self.pending, (handle.due, handle.id))
+            if self.pending[0][1] == handle.id:
+                self.lock.notify()
+        return handle
+    
+    def cancel(self, handle):
+        """Forget a timer; its heap entry is skipped when it comes due"""
+        if handle is None:
+            return
+        with self.lock:
+            handle.cancelled = True
+            self.handles.pop(handle.id, None)
+            self.gui_tasks.pop(handle.id, None)
+    
+    def _loop(self):
+        """Sleep until the earliest timer is due, then dispatch it"""
+        with self.lock:
+            while True:
+                if not self.pending:
+                    self.lock.wait()
+                    continue
+                
+                due, handle_id = self.pending[0]
+                delay = due - time.perf_counter()
+                if delay > 0:
+                    self.lock.wait(delay)
+                    continue
+                
+                heapq.heappop(self.pending)
+                handle = self.handles.get(handle_id)
+                if not handle or handle.due != due:
+                    continue
+                
+                if handle.interval is not None:
+                    # Next run is planned from the due time so repeats don't drift
+                    handle.due = max(due + handle.interval, time.perf_counter())
+                    heapq.heappush(self.pending, (handle.due, handle.id))
+                else:
+                    del self.handles[handle_id]
+                self._dispatch(handle, due)
+    
+    def _dispatch(self, handle, due):
+        """Send a due timer to where it should run, called with the lock held"""
+        self.fired += 1
+        handle.fired += 1
+        if handle.dispatch == GUI:
+            self.gui_tasks[handle.id] = (handle, due)
+            self.task_due.emit(handle.id)
+        elif handle.dispatch == WORKER:
+            self.executor.submit(self._run, handle, due)
+        else:
+            self._run(handle, due)
+    
+    def _run(self, handle, due):
+        """Call a timer's callback, recording how late it started"""
+        if handle.cancelled:
+            return
+        self.lateness[handle.dispatch].append(time.perf_counter() - due)
+        try:
+            handle.callback(*handle.args)
+        except Exception as e:
+            logger.error(f"Error in timer {handle.name}: {e}")
+        finally:
+            handle.finished += 1
+    
+    def _run_gui_task(self, handle_id):
+        """Run a due timer's callback in the GUI thread"""
+        with self.lock:
+            task = self.gui_tasks.pop(handle_id, None)
+        if task:
+            self._run(*task)
+    
+    def get_stats(self):
+        """Live timer count and how late callbacks started, in ms, per dispatch target"""
+        with self.lock:
+            stats = {'live': len(self.handles), 'fired': self.fired}
+        for dispatch, samples in self.lateness.items():
+            samples = list(samples)
+            if samples:
+                stats[dispatch] = {
+                    'count': len(samples),
+                    'mean_late_ms': round(sum(samples) / len(samples) * 1000, 1),
+                    'max_late_ms': round(max(samples) * 1000, 1)
+                }
+        return stats
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+def get_scheduler():
+    """Get the shared scheduler, creating it on first use (from the GUI thread)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = Scheduler()
+        return _scheduler
@@ -8,6 +8,7 @@ import logging
 import sys
 from PyQt5.QtGui import QDesktopServices
 from PyQt5.QtCore import QUrl
+from voice_catalog import VoiceCatalog
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
@@ -21,6 +22,7 @@ class SettingsDialog(QDialog):
         self.setModal(True)
         self.config = self.load_config()
         self.current_conversation = None
+        self.voice_catalog = VoiceCatalog(ttl_hours=self.config.get('voice_catalog_ttl_hours', 24))
         self.initUI()
         
     def get_app_root(self):
@@ -102,7 +104,16 @@ class SettingsDialog(QDialog):
 
     def get_available_voices(self):
         """Get list of available voices"""
-        edge_voices = [
+        # Prefer the Edge voice list cached by the TTS engine, without going to the network
+        edge_voices = []
+        try:
+            edge_voices = self.voice_catalog.get_english_voices()
+            edge_voices.sort(key=lambda voice: (voice[0] != "Ova", voice[1]))
+        except Exception as e:
+            logger.error(f"Error reading voice catalog: {e}")
+        
+        # Fall back to the built-in list if the catalog hasn't been downloaded yet
+        edge_voices = edge_voices or [
             # Rename Ana to Ova
             ("Ova", "en-US-AnaNeural"),
             # US Voices
@@ -558,8 +569,11 @@ class SettingsDialog(QDialog):
         file_path = os.path.join(history_dir, file_name)
         
         try:
-            # Delete the file
+            # Delete the file, and the summary of its older turns
             os.remove(file_path)
+            summary_path = os.path.join(history_dir, 'summaries', file_name)
+            if os.path.exists(summary_path):
+                os.remove(summary_path)
             
             # Find another conversation or create new one
             existing_files = [f for f in os.listdir(history_dir) if f.endswith('.json')]
@@ -5,71 +5,259 @@ import threading
 import json
 import logging
 import asyncio
+from concurrent.futures import CancelledError
 import edge_tts
 import tempfile
+import io
 import pygame
 import time
+import re
+import queue
+from collections import deque
+from tts_cache import TTSCache
+from cache_utils import get_cache_dir
+from async_loop import get_async_loop
+from voice_catalog import VoiceCatalog
+from audio_service import get_audio_service
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Initialize pygame mixer
-pygame.mixer.init()
+# Speaking rates, part of the cache key since they change the audio
+EDGE_RATE = "+0%"
+WINDOWS_RATE = 150
+
+# A sentence ends with terminal punctuation followed by whitespace, or at a line break
+SENTENCE_BOUNDARY = re.compile(r'(?<=[.!?])["\')\]]*\s+|\n+')
+
+class SentenceBuffer:
+    """Collects streamed text and hands back complete sentences"""
+    
+    def __init__(self, min_length=12):
+        self.text = ""
+        self.min_length = min_length  # Short fragments are merged with the next sentence
+        
+    def feed(self, token):
+        """Add streamed text and return any sentences that are now complete"""
+        self.text += token
+        sentences = []
+        start = 0
+        for match in SENTENCE_BOUNDARY.finditer(self.text):
+            sentence = self.text[start:match.end()].strip()
+            if len(sentence) >= self.min_length:
+                sentences.append(sentence)
+                start = match.end()
+        self.text = self.text[start:]
+        return sentences
+    
+    def flush(self):
+        """Return whatever text is left over"""
+        rest = self.text.strip()
+        self.text = ""
+        return rest
+
+def split_sentences(text):
+    """Split a complete text into sentences for pipelined speech"""
+    buffer = SentenceBuffer()
+    sentences = buffer.feed(text)
+    rest = buffer.flush()
+    if rest:
+        sentences.append(rest)
+    return sentences
 
 class TTSWorker(QThread):
-    """Worker thread for TTS playback"""
+    """Worker thread that plays speech while the next sentence is synthesized
+    
+    Sentences are synthesized on a background thread into a bounded queue of
+    audio, and played back in order on this thread.
+    """
     finished = pyqtSignal()
     error = pyqtSignal(str)
+    chunk_timing = pyqtSignal(dict)
     
-    def __init__(self, temp_file, voice):
+    def __init__(self, temp_dir, synthesize, fallback=None, queue_size=2, release=None):
         super().__init__()
-        self.temp_file = temp_file
-        self.voice = voice
-        self.text = None
+        self.audio_service = get_audio_service()
+        self.temp_dir = temp_dir
+        self.synthesize = synthesize  # Callable(text, path) returning audio, or a coroutine that does
+        self.fallback = fallback      # Used for the rest of the response if synthesize fails
+        self.release = release        # Called with cached files once they are played or dropped
+        self.sentences = queue.Queue()
+        self.audio_queue = queue.Queue(maxsize=queue_size)
+        self.cancelled = threading.Event()
+        self.text = ""
+        self.spoken = []  # Sentences that started playing, so an interruption knows what was heard
+        self.chunk_count = 0
+        self.pending_future = None  # Synthesis running on the shared event loop
+        self.playback = None        # Sentence currently playing
+        self.audio_end_time = None  # When the last sentence's audio ended
         
-    def set_text(self, text):
-        self.text = text
+    def add_sentence(self, sentence):
+        """Queue a sentence for synthesis"""
+        self.text = f"{self.text} {sentence}".strip()
+        self.sentences.put(sentence)
         
-    def run(self):
+    def close(self):
+        """No more sentences will be added"""
+        self.sentences.put(None)
+        
+    def cancel(self):
+        """Stop synthesis and playback as soon as possible"""
+        self.cancelled.set()
+        self.sentences.put(None)
+        
+        # Cancel the synthesis task rather than killing the thread
+        future = self.pending_future
+        if future:
+            future.cancel()
+        
+        # Wake up playback, whether it is playing or waiting for audio
+        playback = self.playback
+        if playback:
+            self.audio_service.stop(playback)
+        try:
+            self.audio_queue.put_nowait(None)
+        except queue.Full:
+            pass
+        
+    def _synthesize(self, synthesize, sentence):
+        """Synthesize one sentence, running coroutines on the shared event loop"""
+        result = synthesize(sentence, os.path.join(self.temp_dir, f'speech_{id(self)}_{self.chunk_count}'))
+        if not asyncio.iscoroutine(result):
+            return result
+        
+        self.pending_future = get_async_loop().submit(result)
         try:
-            # Create communicate instance and save audio
-            communicate = edge_tts.Communicate(self.text, self.voice)
+            if self.cancelled.is_set():
+                self.pending_future.cancel()
+            return self.pending_future.result()
+        finally:
+            self.pending_future = None
+        
+    def _synthesis_loop(self):
+        """Synthesize queued sentences ahead of playback"""
+        synthesize = self.synthesize
+        while not self.cancelled.is_set():
+            sentence = self.sentences.get()
+            if sentence is None:
+                break
             
-            # Create event loop for this thread
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
+            self.chunk_count += 1
+            start = time.perf_counter()
+            audio = None
+            try:
+                audio = self._synthesize(synthesize, sentence)
+            except CancelledError:
+                break
+            except Exception as e:
+                if not self.fallback or synthesize is self.fallback:
+                    self.error.emit(str(e))
+                    break
+                self.error.emit(f"{e}, falling back to Windows voice")
+                synthesize = self.fallback
+                try:
+                    audio = self._synthesize(synthesize, sentence)
+                except Exception as fe:
+                    self.error.emit(str(fe))
+                    break
+            synth_time = time.perf_counter() - start
             
+            # Wait for room in the queue, giving up if cancelled
+            item = {'text': sentence, 'audio': audio, 'synth_time': synth_time}
+            while not self.cancelled.is_set():
+                try:
+                    self.audio_queue.put(item, timeout=0.1)
+                    break
+                except queue.Full:
+                    continue
+            else:
+                self._remove(audio)
+        
+        # Tell playback there is nothing more to come
+        while True:
             try:
-                # Generate audio file
-                loop.run_until_complete(communicate.save(self.temp_file))
-                
-                # Play audio
-                pygame.mixer.music.load(self.temp_file)
-                pygame.mixer.music.play()
+                self.audio_queue.put(None, timeout=0.1)
+                break
+            except queue.Full:
+                if self.cancelled.is_set():
+                    break
+    
+    def _remove(self, path):
+        """Delete a synthesized audio file"""
+        if not isinstance(path, str):
+            return
+        # Only clean up our own temp files, cached audio is kept
+        if os.path.dirname(os.path.abspath(path)) != os.path.abspath(self.temp_dir):
+            if self.release:
+                self.release(path)
+            return
+        try:
+            os.remove(path)
+        except Exception:
+            pass
+        
+    def run(self):
+        synth_thread = threading.Thread(target=self._synthesis_loop, daemon=True)
+        synth_thread.start()
+        
+        while not self.cancelled.is_set():
+            # Time spent waiting here is silence between sentences
+            wait_start = time.perf_counter()
+            item = self.audio_queue.get()
+            if item is None or self.cancelled.is_set():
+                break
+            wait_time = time.perf_counter() - wait_start
+            
+            play_start = time.perf_counter()
+            try:
+                # Decode and play, straight from memory when it was streamed there
+                audio = item['audio']
+                if not isinstance(audio, str):
+                    audio.seek(0)
+                sound = pygame.mixer.Sound(file=audio)
                 
-                while pygame.mixer.music.get_busy():
-                    time.sleep(0.1)
-                    
+                # The audio service wakes us when the sentence ends
+                self.spoken.append(item['text'])
+                self.playback = self.audio_service.play_speech(sound)
+                if self.cancelled.is_set():
+                    self.audio_service.stop(self.playback)
+                self.playback.wait()
+                if not self.playback.stopped:
+                    self.audio_end_time = self.playback.expected_end
+            except Exception as e:
+                self.error.emit(str(e))
             finally:
-                loop.close()
-                
-            self.finished.emit()
+                # Cleanup
+                self.playback = None
+                self._remove(item['audio'])
             
-        except Exception as e:
-            self.error.emit(str(e))
-        finally:
-            # Cleanup
+            timing = {
+                'text': item['text'],
+                'synth_ms': round(item['synth_time'] * 1000),
+                'wait_ms': round(wait_time * 1000),
+                'play_ms': round((time.perf_counter() - play_start) * 1000)
+            }
+            logger.info(f"TTS chunk timing: {timing}")
+            self.chunk_timing.emit(timing)
+        
+        # Drop anything synthesized but never played
+        while True:
             try:
-                pygame.mixer.music.unload()
-                os.remove(self.temp_file)
-            except:
-                pass
+                item = self.audio_queue.get_nowait()
+            except queue.Empty:
+                break
+            if item:
+                self._remove(item['audio'])
+        
+        if not self.cancelled.is_set():
+            self.finished.emit()
 
 class TTSEngine(QObject):
     speak_started = pyqtSignal()
     speak_finished = pyqtSignal()
     speak_error = pyqtSignal(str)
+    engine_ready = pyqtSignal()
     
     def __init__(self):
         super().__init__()
@@ -79,6 +267,33 @@ class TTSEngine(QObject):
         self.is_speaking = False
         self.temp_dir = tempfile.mkdtemp()
         self.tts_worker = None
+        self.windows_lock = threading.Lock()  # pyttsx3 isn't safe to drive from two threads
+        self.ready = threading.Event()  # Set once background setup has finished
+        
+        # Streaming state, sentences are spoken as soon as they are complete
+        self.sentence_buffer = None
+        self.stream_open = False
+        
+        # Recent per-sentence synthesis and playback timings
+        self.chunk_timings = deque(maxlen=50)
+        
+        # Playback completion is signalled by the audio service, and we measure
+        # how long it takes from the end of the audio to speak_finished
+        self.audio_service = get_audio_service()
+        self.finish_latencies = deque(maxlen=50)
+        
+        # Synthesized audio is reused for repeated phrases
+        self.tts_cache = None
+        if self.config.get('tts_cache_enabled', True):
+            try:
+                max_bytes = self.config.get('tts_cache_max_mb', 50) * 1024 * 1024
+                self.tts_cache = TTSCache(get_cache_dir('tts'), max_bytes)
+            except Exception as e:
+                logger.error(f"Error setting up TTS cache: {e}")
+        
+        # Edge voices are read from a disk cache and refreshed in the background
+        self.voice_catalog = VoiceCatalog(ttl_hours=self.config.get('voice_catalog_ttl_hours', 24))
+        
         self.setup_engine()
         
         # Log initial state
@@ -106,76 +321,77 @@ class TTSEngine(QObject):
         
         return default_config.copy()
 
-    async def _list_voices(self):
-        """List available Edge TTS voices"""
-        try:
-            voices = await edge_tts.list_voices()
-            logger.info("Available Edge TTS voices:")
-            for voice in voices:
-                logger.info(f"- {voice['ShortName']}")
-            return voices
-        except Exception as e:
-            logger.error(f"Error listing voices: {e}")
-            return []
-
     def setup_engine(self):
-        """Setup Edge TTS engine with fallback to Windows voices"""
+        """Setup Edge TTS engine with fallback to Windows voices
+        
+        Only cheap work happens here. pyttsx3 and the Edge voice check run on
+        a background thread and engine_ready is emitted once they are done.
+        """
+        voice_type = self.config.get('voice_type', 'Edge Voice')
+        voice_name = self.config.get('voice_name', 'en-US-AnaNeural')
+        logger.info(f"Setting up TTS with voice type: {voice_type}, voice name: {voice_name}")
+        
+        # If Windows voice is selected, use fallback
+        self.use_fallback = voice_type == 'Windows Voice'
+        if self.use_fallback:
+            logger.info("Using Windows voice as primary")
+        
+        threading.Thread(target=self._setup_engine_thread, daemon=True).start()
+        
+    def _setup_engine_thread(self):
+        """Initialize pyttsx3 and check the Edge voice without blocking the GUI"""
+        voice_type = self.config.get('voice_type', 'Edge Voice')
+        voice_name = self.config.get('voice_name', 'en-US-AnaNeural')
+        
         try:
             # First set up Windows engine as fallback
-            self.windows_engine = pyttsx3.init()
-            voices = self.windows_engine.getProperty('voices')
-            
-            # Get saved voice settings
-            voice_type = self.config.get('voice_type', 'Edge Voice')
-            voice_name = self.config.get('voice_name', 'en-US-AnaNeural')
-            
-            logger.info(f"Setting up TTS with voice type: {voice_type}, voice name: {voice_name}")
-            
-            # Configure Windows voice as fallback
-            if len(voices) > 0:
-                if voice_type == 'Windows Voice':
-                    self.windows_engine.setProperty('voice', voice_name)
-                    logger.info(f"Set Windows voice to: {voice_name}")
-                else:
-                    # Use first available voice as fallback
-                    self.windows_engine.setProperty('voice', voices[0].id)
-                    logger.info(f"Set fallback Windows voice to: {voices[0].id}")
-            
-            self.windows_engine.setProperty('rate', 150)
-            self.windows_engine.setProperty('volume', 0.9)
-            
-            # If Windows voice is selected, use fallback
-            if voice_type == 'Windows Voice':
-                self.use_fallback = True
-                logger.info("Using Windows voice as primary")
-                return
-            
-            # Test Edge TTS by listing voices
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            voices = loop.run_until_complete(self._list_voices())
-            loop.close()
-            
-            if not voices:
-                raise Exception("No Edge TTS voices available")
-            
-            # Verify the selected voice exists
-            voice_exists = any(v['ShortName'] == voice_name for v in voices)
-            if not voice_exists:
-                logger.warning(f"Selected voice {voice_name} not found in Edge TTS voices")
-                # Try to find a similar voice
-                for v in voices:
-                    if 'en-US' in v['ShortName']:
-                        voice_name = v['ShortName']
-                        logger.info(f"Using alternative voice: {voice_name}")
-                        break
-            
-            self.use_fallback = False
-            logger.info("Edge TTS setup successful")
-            
+            with self.windows_lock:
+                self.windows_engine = pyttsx3.init()
+                voices = self.windows_engine.getProperty('voices')
+                
+                # Configure Windows voice as fallback
+                if len(voices) > 0:
+                    if voice_type == 'Windows Voice':
+                        self.windows_engine.setProperty('voice', voice_name)
+                        logger.info(f"Set Windows voice to: {voice_name}")
+                    else:
+                        # Use first available voice as fallback
+                        self.windows_engine.setProperty('voice', voices[0].id)
+                        logger.info(f"Set fallback Windows voice to: {voices[0].id}")
+                
+                self.windows_engine.setProperty('rate', WINDOWS_RATE)
+                self.windows_engine.setProperty('volume', 0.9)
         except Exception as e:
+            error_msg = f"Failed to set up Windows voice: {str(e)}"
+            logger.error(error_msg)
+            self.speak_error.emit(error_msg)
+        
+        if not self.use_fallback:
+            # Check the voice against the cached catalog, refreshing it in the background
+            self._check_edge_voice(self.voice_catalog.get_voices())
+            self.voice_catalog.refresh_if_stale(self._on_catalog_refreshed)
+        
+        self.ready.set()
+        self.engine_ready.emit()
+        logger.info("TTS engine ready")
+    
+    def _check_edge_voice(self, voices):
+        """Warn if the selected Edge voice isn't in the voice list"""
+        if not voices:
+            return
+        voice_name = self.config.get('voice_name', 'en-US-AnaNeural')
+        if not any(v['ShortName'] == voice_name for v in voices):
+            logger.warning(f"Selected voice {voice_name} not found in Edge TTS voices")
+    
+    def _on_catalog_refreshed(self, voices):
+        """Handle a finished background refresh of the Edge voice list"""
+        if voices:
+            self._check_edge_voice(voices)
+            logger.info("Edge TTS setup successful")
+        elif not self.voice_catalog.get_voices() and self.config.get('voice_type') != 'Windows Voice':
+            # Edge TTS can't be reached and we have never seen it work
             self.use_fallback = True
-            error_msg = f"Failed to set up Edge TTS, falling back to Windows: {str(e)}"
+            error_msg = "Failed to set up Edge TTS, falling back to Windows"
             logger.error(error_msg)
             self.speak_error.emit(error_msg)
 
@@ -194,9 +410,11 @@ class TTSEngine(QObject):
                 
             else:  # Windows voice
                 logger.info(f"Changing to Windows voice: {voice_name}")
-                if not self.windows_engine:
-                    self.windows_engine = pyttsx3.init()
-                self.windows_engine.setProperty('voice', voice_name)
+                # The worker may be synthesizing with the engine right now
+                with self.windows_lock:
+                    if not self.windows_engine:
+                        self.windows_engine = pyttsx3.init()
+                    self.windows_engine.setProperty('voice', voice_name)
                 self.use_fallback = True
                 
                 # Update local config only
@@ -213,10 +431,11 @@ class TTSEngine(QObject):
             # Try to set up Windows fallback if not already done
             if not self.windows_engine:
                 try:
-                    self.windows_engine = pyttsx3.init()
-                    voices = self.windows_engine.getProperty('voices')
-                    if voices:
-                        self.windows_engine.setProperty('voice', voices[0].id)
+                    with self.windows_lock:
+                        self.windows_engine = pyttsx3.init()
+                        voices = self.windows_engine.getProperty('voices')
+                        if voices:
+                            self.windows_engine.setProperty('voice', voices[0].id)
                 except Exception as we:
                     error_msg = f"Failed to set up Windows fallback: {str(we)}"
                     logger.error(error_msg)
@@ -224,59 +443,202 @@ class TTSEngine(QObject):
 
     def speak(self, text):
         """Speak text using Edge TTS with fallback to Windows voices"""
-        if self.use_fallback:
-            logger.info("Using Windows fallback for speech")
-            self._speak_windows(text)
+        # A full response replaces anything still streaming
+        self._reset_stream()
+        
+        logger.info("Using Windows fallback for speech" if self.use_fallback else "Using Edge TTS for speech")
+        
+        # Split into sentences so the next one is synthesized while one plays
+        if self.config.get('tts_pipeline', True):
+            sentences = split_sentences(text)
         else:
-            logger.info("Using Edge TTS for speech")
-            
-            # Clean up previous worker if it exists
-            if self.tts_worker and self.tts_worker.isRunning():
-                self.tts_worker.terminate()
-                self.tts_worker.wait()
-            
-            # Generate temp file path
-            temp_file = os.path.join(self.temp_dir, 'temp_speech.mp3')
-            
-            # Create and setup worker
-            self.tts_worker = TTSWorker(temp_file, self.config.get('voice_name', 'en-US-AnaNeural'))
-            self.tts_worker.set_text(text)
-            self.tts_worker.finished.connect(self._on_tts_finished)
-            self.tts_worker.error.connect(self._on_tts_error)
+            sentences = [text]
+        
+        for sentence in sentences:
+            self._queue_sentence(sentence)
+        if self.tts_worker:
+            self.tts_worker.close()
+        else:
+            self.speak_finished.emit()
+    
+    def stop(self):
+        """Stop speaking right away"""
+        was_speaking = self.tts_worker is not None
+        self._reset_stream()
+        self.is_speaking = False
+        if was_speaking:
+            self.speak_finished.emit()
+    
+    def interrupt(self):
+        """Silence speech right away from any thread; returns the text heard so far, None if idle
+        
+        Only playback is stopped here, stop() still has to be called on the GUI thread
+        to clean up the worker.
+        """
+        worker = self.tts_worker
+        if not worker:
+            return None
+        worker.cancel()
+        return ' '.join(worker.spoken)
+    
+    def begin_stream(self):
+        """Start a response that will arrive token by token"""
+        self._reset_stream()
+        self.sentence_buffer = SentenceBuffer()
+        self.stream_open = True
+        
+    def feed(self, token):
+        """Add streamed text, speaking each sentence once it is complete"""
+        if not self.stream_open:
+            return
+        for sentence in self.sentence_buffer.feed(token):
+            self._queue_sentence(sentence)
             
-            # Start speaking
+    def end_stream(self):
+        """Finish a streamed response and speak whatever is left"""
+        if not self.stream_open:
+            return
+        self.stream_open = False
+        
+        rest = self.sentence_buffer.flush()
+        if rest:
+            self._queue_sentence(rest)
+        if self.tts_worker:
+            self.tts_worker.close()
+        else:
+            # Nothing was spoken at all
+            self.speak_finished.emit()
+    
+    def _queue_sentence(self, sentence):
+        """Queue a sentence, starting the worker if this is the first one"""
+        if not self.tts_worker:
+            self.tts_worker = self._create_worker()
             self.is_speaking = True
             self.speak_started.emit()
             self.tts_worker.start()
+        self.tts_worker.add_sentence(sentence)
+    
+    def _reset_stream(self):
+        """Stop any speech in progress and forget streamed text"""
+        self.stream_open = False
+        self.sentence_buffer = None
+        
+        # Cancel previous worker if it exists
+        if self.tts_worker:
+            # A cancelled worker must not report into the next stream
+            for signal in (self.tts_worker.finished, self.tts_worker.error, self.tts_worker.chunk_timing):
+                try:
+                    signal.disconnect()
+                except TypeError:
+                    pass  # Nothing connected
+            self.tts_worker.cancel()
+            self.tts_worker.wait()
+            self.tts_worker = None
+        
+    def _create_worker(self):
+        """Create a worker using the current voice settings"""
+        release = self.tts_cache.unpin if self.tts_cache else None
+        if self.use_fallback:
+            worker = TTSWorker(self.temp_dir, self._synthesize_windows, release=release)
+        else:
+            worker = TTSWorker(self.temp_dir, self._synthesize_edge, fallback=self._synthesize_windows, release=release)
+        worker.finished.connect(self._on_tts_finished)
+        worker.error.connect(self._on_tts_error)
+        worker.chunk_timing.connect(self._on_chunk_timing)
+        return worker
+    
+    async def _synthesize_edge(self, text, path):
+        """Synthesize text with Edge TTS, returning an in-memory buffer or audio file path"""
+        voice = self.config.get('voice_name', 'en-US-AnaNeural')
+        # Files going to the worker are pinned until it is done with them
+        cached = self.tts_cache.get(voice, EDGE_RATE, text, pin=True) if self.tts_cache else None
+        if cached:
+            return cached
+        
+        communicate = edge_tts.Communicate(text, voice, rate=EDGE_RATE)
+        
+        if self.config.get('tts_use_temp_files', False):
+            # Opt-in fallback for systems where pygame can't load from memory
+            path += '.mp3'
+            await communicate.save(path)
+            if self.tts_cache:
+                return self.tts_cache.put(voice, EDGE_RATE, text, path, pin=True)
+            return path
+        
+        audio = await self._stream_edge_audio(communicate)
+        if self.tts_cache:
+            # Keep disk writes off the event loop
+            await asyncio.get_running_loop().run_in_executor(
+                None, self.tts_cache.put_bytes, voice, EDGE_RATE, text, audio.getvalue(), '.mp3')
+        return audio
+    
+    async def _stream_edge_audio(self, communicate):
+        """Collect Edge TTS audio chunks into a memory buffer"""
+        audio = io.BytesIO()
+        async for chunk in communicate.stream():
+            if chunk['type'] == 'audio':
+                audio.write(chunk['data'])
+        if not audio.tell():
+            raise Exception("No audio received from Edge TTS")
+        return audio
+    
+    def _synthesize_windows(self, text, path):
+        """Synthesize text with the Windows voice, returning the audio file path"""
+        # pyttsx3 is set up in the background at startup
+        if not self.ready.wait(timeout=10) or not self.windows_engine:
+            raise Exception("Windows voice is not available")
+        
+        with self.windows_lock:
+            voice = self.windows_engine.getProperty('voice')
+        cached = self.tts_cache.get(voice, WINDOWS_RATE, text, pin=True) if self.tts_cache else None
+        if cached:
+            return cached
+        
+        path += '.wav'
+        with self.windows_lock:
+            self.windows_engine.save_to_file(text, path)
+            self.windows_engine.runAndWait()
+        
+        if self.tts_cache:
+            return self.tts_cache.put(voice, WINDOWS_RATE, text, path, pin=True)
+        return path
+    
+    def get_cache_stats(self):
+        """Return TTS cache hit/miss counters, or None if caching is off"""
+        return self.tts_cache.stats() if self.tts_cache else None
+    
+    def _on_chunk_timing(self, timing):
+        """Record how long a sentence took to synthesize and play"""
+        self.chunk_timings.append(timing)
     
     def _on_tts_finished(self):
         """Handle TTS completion"""
+        # Ignore workers that were cancelled after finishing
+        worker = self.sender()
+        if worker is not self.tts_worker:
+            return
+        self.tts_worker = None
         self.is_speaking = False
         self.speak_finished.emit()
         
+        if worker.audio_end_time:
+            latency = time.perf_counter() - worker.audio_end_time
+            self.finish_latencies.append(latency)
+            logger.info(f"End of audio to speak_finished: {latency * 1000:.1f} ms")
+        
+    def get_latency_stats(self):
+        """Average and worst delay from the end of speech audio to speak_finished, in ms"""
+        latencies = list(self.finish_latencies)
+        if not latencies:
+            return None
+        return {
+            'count': len(latencies),
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 1),
+            'max_ms': round(max(latencies) * 1000, 1)
+        }
+        
     def _on_tts_error(self, error):
         """Handle TTS error"""
-        self.is_speaking = False
-        error_msg = f"Edge TTS error: {error}"
+        error_msg = f"TTS error: {error}"
         logger.error(error_msg)
         self.speak_error.emit(error_msg)
-        # Fall back to Windows voice
-        self._speak_windows(self.tts_worker.text)
-        
-    def _speak_windows(self, text):
-        """Fallback method using Windows voices"""
-        def speak_thread():
-            try:
-                self.is_speaking = True
-                self.speak_started.emit()
-                self.windows_engine.say(text)
-                self.windows_engine.runAndWait()
-                self.is_speaking = False
-                self.speak_finished.emit()
-            except Exception as e:
-                self.is_speaking = False
-                error_msg = f"Windows TTS error: {str(e)}"
-                logger.error(error_msg)
-                self.speak_error.emit(error_msg)
-        
-        threading.Thread(target=speak_thread, daemon=True).start()
@@ -0,0 +1,144 @@
+import os
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+class TTSCache:
+    """On-disk cache of synthesized speech keyed by voice, rate and text
+    
+    Files are named by a hash of their key. The least recently used files are
+    evicted once the cache grows past max_bytes, and file modification times
+    keep the LRU order across restarts. Files handed out with pin=True are
+    kept until unpin(), so speech queued for playback is never deleted.
+    """
+    
+    def __init__(self, cache_dir, max_bytes=50 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.entries = OrderedDict()  # key -> (path, size), least recently used first
+        self.pins = {}  # path -> number of users still waiting to play it
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._load_index()
+        
+    def _load_index(self):
+        """Index the files already in the cache directory, oldest first"""
+        os.makedirs(self.cache_dir, exist_ok=True)
+        files = []
+        for name in os.listdir(self.cache_dir):
+            path = os.path.join(self.cache_dir, name)
+            if name.endswith('.tmp'):
+                # Left over from an interrupted write
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+                continue
+            if os.path.isfile(path):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, os.path.splitext(name)[0], path, stat.st_size))
+        
+        for _, key, path, size in sorted(files):
+            self.entries[key] = (path, size)
+            self.total_bytes += size
+        logger.info(f"TTS cache has {len(self.entries)} files ({self.total_bytes // 1024} KB)")
+        
+    @staticmethod
+    def make_key(voice, rate, text):
+        """Hash the settings that affect the synthesized audio"""
+        return hashlib.sha256(f"{voice}\0{rate}\0{text}".encode('utf-8')).hexdigest()
+    
+    def get(self, voice, rate, text, pin=False):
+        """Return the cached audio path for this text, or None"""
+        key = self.make_key(voice, rate, text)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry and os.path.exists(entry[0]):
+                self.entries.move_to_end(key)
+                self.hits += 1
+                try:
+                    os.utime(entry[0])
+                except OSError:
+                    pass
+                if pin:
+                    self._pin(entry[0])
+                return entry[0]
+            
+            if entry:
+                # File was removed behind our back
+                del self.entries[key]
+                self.total_bytes -= entry[1]
+            self.misses += 1
+            return None
+        
+    def put(self, voice, rate, text, source_path, extension=None, pin=False):
+        """Move a freshly synthesized file into the cache and return its new path"""
+        key = self.make_key(voice, rate, text)
+        path = os.path.join(self.cache_dir, key + (extension or os.path.splitext(source_path)[1]))
+        with self.lock:
+            os.replace(source_path, path)
+            size = os.path.getsize(path)
+            
+            old = self.entries.pop(key, None)
+            if old:
+                self.total_bytes -= old[1]
+            self.entries[key] = (path, size)
+            self.total_bytes += size
+            if pin:
+                self._pin(path)
+            self._evict()
+        return path
+    
+    def put_bytes(self, voice, rate, text, data, extension):
+        """Write audio held in memory to the cache and return its path"""
+        key = self.make_key(voice, rate, text)
+        path = os.path.join(self.cache_dir, key + extension)
+        
+        # Write to a temporary name first so readers never see a partial file
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'wb') as f:
+            f.write(data)
+        return self.put(voice, rate, text, temp_path, extension)
+    
+    def _pin(self, path):
+        self.pins[path] = self.pins.get(path, 0) + 1
+    
+    def unpin(self, path):
+        """Let a file handed out with pin=True be evicted again"""
+        with self.lock:
+            count = self.pins.pop(path, 0) - 1
+            if count > 0:
+                self.pins[path] = count
+            self._evict()
+    
+    def _evict(self):
+        """Remove least recently used files until the cache fits, skipping pinned ones"""
+        for key in list(self.entries):
+            if self.total_bytes <= self.max_bytes or len(self.entries) <= 1:
+                break
+            path, size = self.entries[key]
+            if path in self.pins:
+                continue
+            del self.entries[key]
+            self.total_bytes -= size
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not evict cached speech {path}: {e}")
+                
+    def stats(self):
+        """Return hit/miss counters and cache size"""
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'entries': len(self.entries),
+                'size_bytes': self.total_bytes
+            }
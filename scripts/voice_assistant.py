@@ -5,9 +5,25 @@ import os
 import sys
 import json
 import logging
-import pygame
+from collections import deque
 from AI.AI_manager import AIManager
 from AI.ollama import OllamaProvider
+from AI.residency import ModelResidencyManager
+from AI.response_cache import ResponseCache
+from AI.semantic_cache import SemanticCache, create_embedder
+from AI.history_manager import HistoryManager
+from STT.STT_manager import STTManager
+from audio_service import get_audio_service, MIXER_BUFFER, MIXER_FREQUENCY
+from scheduler import get_scheduler
+from listening.wake_word import create_wake_word_engine
+from listening.wake_phrase import create_wake_phrase_matcher
+from listening.capture import AudioCapture
+from listening.vad import VoiceActivityDetector, Segmenter
+from listening.pipeline import ListeningPipeline
+from listening.echo_gate import EchoGate
+from listening.sources import create_input_source
+from listening.calibration import NoiseProfileCache, device_key
+from cache_utils import get_cache_dir
 from dotenv import load_dotenv
 
 # Set up logging
@@ -17,6 +33,12 @@ logger = logging.getLogger(__name__)
 # Load environment variables
 load_dotenv()
 
+# Whole utterances that stop a response in progress
+CANCEL_PHRASES = {"stop", "cancel", "never mind", "nevermind", "be quiet", "shut up", "that's enough"}
+
+# Audio already handed to the mixer still plays after its channel is stopped
+MIXER_LATENCY = MIXER_BUFFER / MIXER_FREQUENCY
+
 def get_resource_path(relative_path):
     """Get the correct resource path whether running as script or frozen exe"""
     if getattr(sys, 'frozen', False):
@@ -32,53 +54,64 @@ def get_resource_path(relative_path):
         return os.path.join(base_path, relative_path)
 
 class VoiceAssistant:
-    def __init__(self, config=None, callback=None):
+    def __init__(self, config=None, callback=None, stream_callback=None, interrupt_callback=None):
         """Initialize voice assistant"""
         self.config = config or self.load_config()
         self.callback = callback
-        self.recognizer = sr.Recognizer()
+        self.stream_callback = stream_callback  # Receives (token, user_text) while a response streams
+        self.interrupt_callback = interrupt_callback  # Silences speech now, returns the text heard so far
         self.is_listening = False
         self.last_text = ""  # Store the last recognized text
         self.mic = None  # Microphone instance
-        self.listen_thread = None
+        self.capture = None  # Thread filling the audio ring buffer from the mic
+        self.pipeline = None  # Segmenter, STT, intent and response stages
         self.direct_listen_mode = False
+        self.awaiting_command = False  # Wake word heard, waiting for what to do
+        self.responding = False  # Response worker is generating
+        self.speaking = False
+        self.cancel_event = threading.Event()
         self.direct_listen_timer = None
         self.no_response_timer = None
         self.conversation_history = []  # Store conversation history
+        self.history_lock = threading.Lock()
+        self.last_turn_recorded = False  # Whether the newest history pair is the answer being given
+        self.pending_truncation = None  # Heard text to keep once the response worker is done
+        self.barge_in_timings = deque(maxlen=50)
+        self.wake_word_engine = None  # Local keyword spotter, None for transcript matching
+        self.echo_gate = None  # Keeps Ova's own voice away from speech-to-text
+        self.vad = None
+        self.noise_profiles = None  # Saved noise floors per input device
+        self.device_key = None
+        self.calibration_timer = None
+        
+        # Wake phrases (and how speech-to-text mishears them) are compiled once from config
+        self.wake_phrase_matcher = create_wake_phrase_matcher(self.config)
         
         # Initialize AI manager with config after config is loaded
         self.ai_manager = AIManager(
             provider_name=self.config.get('ai_provider', 'ollama'),
             google_api_key=self.config.get('ai_settings', {}).get('google_api_key'),
-            model=self.config.get('ai_settings', {}).get('model')
+            model=self.config.get('ai_settings', {}).get('model'),
+            keep_alive=self.config.get('ai_keep_alive'),
+            num_ctx=self.config.get('ollama_num_ctx'),
+            response_cache=self._create_response_cache(),
+            semantic_cache=self._create_semantic_cache()
         )  # Default to Ollama
         
-        # Load conversation history
-        self.load_conversation_history()
+        # Keeps the model loaded while Ova is awake
+        self.residency = self._create_residency()
         
-        # Sound file paths and initialization
-        self.activation_sound = get_resource_path(os.path.join('assets', 'sounds', 'HeyOva.mp3'))
-        self.no_answer_sound = get_resource_path(os.path.join('assets', 'sounds', 'NoAnswer.mp3'))
+        # Speech-to-text backend (Google, or an offline engine)
+        self.stt = self._create_stt()
         
-        # Load sounds
-        pygame.mixer.init()
-        try:
-            self.activation_sound_obj = pygame.mixer.Sound(self.activation_sound)
-            self.no_answer_sound_obj = pygame.mixer.Sound(self.no_answer_sound)
-        except Exception as e:
-            print(f"Error loading sounds: {e}")
-            self.activation_sound_obj = None
-            self.no_answer_sound_obj = None
+        # Load conversation history, kept within a token budget
+        self.history_manager = self._create_history_manager()
+        self.load_conversation_history()
         
-        logger.info(f"Voice assistant initialized with config: {self.config}")
+        # Activation and no-answer sounds come from the shared, pre-decoded sound bank
+        self.audio = get_audio_service()
         
-        # Optimize recognition settings for better wake word detection
-        self.recognizer.dynamic_energy_threshold = False
-        self.recognizer.energy_threshold = 300  # More sensitive for wake word
-        self.recognizer.pause_threshold = 1.5  # Balanced pause threshold
-        self.recognizer.phrase_threshold = 0.01  # More sensitive phrase detection
-        self.recognizer.non_speaking_duration = .7  # Shorter non-speaking duration
-        self.recognizer.operation_timeout = None  # No timeout
+        logger.info(f"Voice assistant initialized with config: {self.config}")
 
     def load_config(self):
         """Load configuration from config.json"""
@@ -95,6 +128,9 @@ class VoiceAssistant:
     
     def load_conversation_history(self):
         """Load conversation history from file"""
+        if not self.config.get('save_conversation_history', True):
+            return
+        
         history_dir = get_resource_path('history')
         
         # Create history directory if it doesn't exist
@@ -126,14 +162,17 @@ class VoiceAssistant:
             except Exception as e:
                 logger.error(f"Error saving config: {e}")
         
+        # Summary of the turns this conversation has already forgotten
+        self.history_manager.path = os.path.join(history_dir, 'summaries', os.path.basename(history_path))
+        self.history_manager.load()
+        
         try:
             if os.path.exists(history_path) and self.config.get('save_conversation_history', True):
                 with open(history_path, 'r') as f:
                     self.conversation_history = json.load(f)
-                    # Trim to max length from config
-                    max_pairs = self.config.get('max_conversation_pairs', 10)
-                    if len(self.conversation_history) > max_pairs * 2:
-                        self.conversation_history = self.conversation_history[-(max_pairs * 2):]
+                    # Trim to the token budget from config
+                    self.conversation_history = self.history_manager.fit(
+                        self.conversation_history, self.ai_manager.get_model_name())
                     logger.info(f"Loaded {len(self.conversation_history)} messages from history")
         except Exception as e:
             logger.error(f"Error loading conversation history: {e}")
@@ -172,17 +211,33 @@ class VoiceAssistant:
                 logger.error(f"Error saving config: {e}")
             
         try:
-            # Ensure we don't exceed max pairs
-            max_pairs = self.config.get('max_conversation_pairs', 10)
-            if len(self.conversation_history) > max_pairs * 2:
-                self.conversation_history = self.conversation_history[-(max_pairs * 2):]
+            # Ensure we don't exceed the token budget
+            self.conversation_history = self.history_manager.fit(
+                self.conversation_history, self.ai_manager.get_model_name())
                 
             with open(history_path, 'w') as f:
                 json.dump(self.conversation_history, f)
+            self.history_manager.save()
             logger.info(f"Saved {len(self.conversation_history)} messages to history")
         except Exception as e:
             logger.error(f"Error saving conversation history: {e}")
 
+    def _create_history_manager(self):
+        """Token budget for the history (history_token_budget, history_token_budgets per model)
+        
+        Pairs are dropped history_trim_pairs at a time rather than one per
+        turn, so the start of the prompt stays the same for several turns and
+        Ollama can reuse what it already evaluated instead of reading the
+        whole history again. max_conversation_pairs still caps the count.
+        """
+        max_pairs = self.config.get('max_conversation_pairs', 10)
+        return HistoryManager(
+            budget=self.config.get('history_token_budget', 2000),
+            model_budgets=self.config.get('history_token_budgets', {}),
+            max_pairs=max_pairs,
+            trim_pairs=min(self.config.get('history_trim_pairs', 4), max_pairs)
+        )
+
     def reload_config(self):
         """Reload configuration and update components"""
         logger.info("Reloading voice assistant config")
@@ -194,158 +249,413 @@ class VoiceAssistant:
         model = self.config.get('ai_settings', {}).get('model')
         
         logger.info(f"Reinitializing AI manager with provider: {provider_name}, model: {model}")
+        previous_model = self.ai_manager.get_model_name()
         self.ai_manager = AIManager(
             provider_name=provider_name,
             google_api_key=google_api_key,
-            model=model
+            model=model,
+            keep_alive=self.config.get('ai_keep_alive'),
+            num_ctx=self.config.get('ollama_num_ctx'),
+            response_cache=self._create_response_cache(),
+            semantic_cache=self._create_semantic_cache()
         )
+        self.residency.cancel_release()
+        # The model is already loaded unless settings switched to another one (or Ollama managed it)
+        preload = self.ai_manager.get_model_name() != previous_model or self.residency.policy == 'ollama'
+        self.residency = self._create_residency(preload)
+        self.history_manager = self._create_history_manager()
+        
+        if self.config.get('stt_backend', 'google') != self.stt.backend_name:
+            self.stt = self._create_stt()
+        self.wake_phrase_matcher = create_wake_phrase_matcher(self.config)
         
         # Reload conversation history
         self.load_conversation_history()
 
+    def _create_response_cache(self):
+        """Cache of answers to repeated questions, if enabled (response_cache and response_cache_* settings)"""
+        if not self.config.get('response_cache', False):
+            return None
+        return ResponseCache(
+            os.path.join(get_cache_dir('responses'), 'responses.json'),
+            max_entries=self.config.get('response_cache_size', 200),
+            ttl=self.config.get('response_cache_ttl', 24 * 3600),
+            history_turns=self.config.get('response_cache_history_turns', 0),
+            disabled_presets=self.config.get('response_cache_disabled_presets', [])
+        )
+
+    def _create_semantic_cache(self):
+        """Cache matching questions by meaning, if enabled (semantic_cache and semantic_cache_* settings)"""
+        if not self.config.get('semantic_cache', False):
+            return None
+        embedder = create_embedder(self.config)
+        if embedder is None:
+            return None
+        return SemanticCache(
+            embedder,
+            get_cache_dir('semantic'),
+            threshold=self.config.get('semantic_cache_threshold', 0.9),
+            max_entries=self.config.get('semantic_cache_size', 5000),
+            lookup_timeout=self.config.get('semantic_cache_lookup_timeout', 0.15),
+            ttl=self.config.get('response_cache_ttl', 24 * 3600),
+            disabled_presets=self.config.get('response_cache_disabled_presets', [])
+        )
+
+    def _create_residency(self, preload=True):
+        """Model residency following Ova's sleep (model_residency, ai_keep_alive, model_release_after)"""
+        return ModelResidencyManager(
+            self.ai_manager,
+            policy=self.config.get('model_residency', 'awake'),
+            keep_alive=self.config.get('ai_keep_alive') or '30m',
+            release_after=self.config.get('model_release_after', 120),
+            preload=preload
+        )
+
+    def on_pet_state(self, state):
+        """Told by the GUI when Ova's animation state changes"""
+        self.residency.on_state(state)
+        
+        # Forgotten turns are summarized while nobody is waiting for the model. Ova goes idle after
+        # every answer, and a summary could hold up the next question, so only once she dozes off
+        if state in ('falling_asleep', 'asleep') and not self.responding and self.config.get('history_summary', True):
+            self.history_manager.summarize(self.ai_manager.complete)
+
+    def _create_stt(self):
+        """Speech-to-text manager for the configured backend"""
+        return STTManager(
+            backend_name=self.config.get('stt_backend', 'google'),
+            vosk_model_path=self.config.get('vosk_model_path'),
+            language=self.config.get('stt_language', 'en-US'),
+            fake_transcripts=self.config.get('fake_stt_transcripts')
+        )
+
     def start_listening(self):
-        """Start continuous listening in a separate thread"""
+        """Start the listening pipeline"""
         if not self.is_listening:
             self.is_listening = True
             
-            # Initialize microphone if not already done
+            # Initialize microphone (or replayed audio) if not already done
             if self.mic is None:
                 try:
-                    self.mic = sr.Microphone()
-                    with self.mic as source:
-                        print("Adjusting for ambient noise...")
-                        self.recognizer.adjust_for_ambient_noise(source, duration=1)
+                    # The VAD learns the noise floor as it runs, no blocking calibration needed
+                    self.mic = create_input_source(self.config)
                 except Exception as e:
                     print(f"Error initializing microphone: {e}")
                     return
+                if self.config.get('vad_calibration_cache', True):
+                    self.noise_profiles = NoiseProfileCache(os.path.join(get_cache_dir('calibration'), 'noise_profiles.json'))
+                    self.device_key = device_key(self.mic)
             
-            # Start listening thread
-            self.listen_thread = threading.Thread(target=self._continuous_listen, daemon=True)
-            self.listen_thread.start()
-
-    def _continuous_listen(self):
-        """Continuous listening function running in separate thread"""
-        print("Starting continuous listening...")
-        
-        # List of wake word variations
-        wake_words = [
-            "hey ova", "hey nova", "hey bova", "hey over", 
-            "jehovah", "hanover", "hangover", "hey eva",
-            "hey oppa", "hey google", "hey opa", "okay over", "okay ova", "hey al"
-        ]
-        
-        with self.mic as source:
-            while self.is_listening:
-                try:
-                    # Use shorter phrase time limit for wake word detection
-                    audio = self.recognizer.listen(source, timeout=None, phrase_time_limit=2)
-                    try:
-                        text = self.recognizer.recognize_google(audio).lower()
-                        print("Heard:", text)
-                        
-                        # Check for wake word or direct listen mode
-                        detected_wake_word = None
-                        if not self.direct_listen_mode:  # Only check wake word if not in direct listen
-                            for wake_word in wake_words:
-                                if wake_word in text:
-                                    detected_wake_word = wake_word
-                                    break
-                        
-                        if detected_wake_word or self.direct_listen_mode:
-                            # Play activation sound for wake word only
-                            if detected_wake_word and self.activation_sound_obj:
-                                self.activation_sound_obj.play()
-                            
-                            # Start listening animation if not already listening
-                            if not self.direct_listen_mode and self.callback:
-                                self.callback("START_LISTENING")
-                            
-                            # Flag to track if we got a response
-                            got_response = False
-                            
-                            # Process text based on mode
-                            if self.direct_listen_mode:
-                                # In direct listen mode, process the text directly
-                                got_response = True
-                                if self.callback:
-                                    self.callback("START_THINKING")
-                                self._generate_response(text)
-                                # Exit direct listen mode
-                                self.stop_direct_listening()
-                            else:
-                                # Check for command after wake word
-                                command_after_wake = text.replace(detected_wake_word, "").strip()
-                                if command_after_wake:
-                                    got_response = True
-                                    if self.callback:
-                                        self.callback("START_THINKING")
-                                    self._generate_response(command_after_wake)
-                                else:
-                                    # Start no-response timer
-                                    if self.no_response_timer:
-                                        self.no_response_timer.cancel()
-                                    
-                                    def handle_no_response():
-                                        nonlocal got_response
-                                        if not got_response:
-                                            if self.no_answer_sound_obj:
-                                                self.no_answer_sound_obj.play()
-                                            if self.callback:
-                                                self.callback("STOP_LISTENING")
-                                            got_response = True
-                                    
-                                    self.no_response_timer = threading.Timer(10.0, handle_no_response)
-                                    self.no_response_timer.start()
-                                    
-                                    # Listen for command
-                                    try:
-                                        time.sleep(0.1)
-                                        start_time = time.time()
-                                        while not got_response and time.time() - start_time < 5:
-                                            try:
-                                                command_audio = self.recognizer.listen(source, timeout=1, phrase_time_limit=10)
-                                                command_text = self.recognizer.recognize_google(command_audio).lower()
-                                                print("Command:", command_text)
-                                                
-                                                if self.no_response_timer:
-                                                    self.no_response_timer.cancel()
-                                                
-                                                got_response = True
-                                                
-                                                if command_text:
-                                                    if self.callback:
-                                                        self.callback("START_THINKING")
-                                                    self._generate_response(command_text)
-                                                break
-                                                
-                                            except sr.WaitTimeoutError:
-                                                continue
-                                            except sr.UnknownValueError:
-                                                continue
-                                        
-                                    except sr.RequestError as e:
-                                        print(f"Could not request results for command: {e}")
-                                    finally:
-                                        if self.no_response_timer:
-                                            self.no_response_timer.cancel()
-                    
-                    except sr.UnknownValueError:
-                        pass  # Silent failure for unrecognized speech
-                    except sr.RequestError as e:
-                        print(f"Could not request results: {e}")
-                        time.sleep(1)
-                        
-                except Exception as e:
-                    if self.is_listening:
-                        print(f"Error in continuous listening: {e}")
-                        time.sleep(0.5)
+            # Keep reading the mic while recognition runs so no speech is lost
+            buffer_seconds = self.config.get('capture_buffer_seconds', 20)
+            if getattr(self.mic, 'speed', None) == 0:
+                # Replayed as fast as possible: hold the whole session, the pipeline can't keep up with it
+                buffer_seconds = max(buffer_seconds, self.mic.duration + 1)
+            self.capture = AudioCapture(self.mic, buffer_seconds=buffer_seconds)
+            
+            # The reader is attached before capture starts, so a fast replay can't get ahead of it
+            pre_roll_ms = self.config.get('capture_pre_roll_ms', 300)
+            self.vad = self._create_vad()
+            segmenter = Segmenter(self.capture.reader(pre_roll_ms), self.vad, pre_roll_ms=pre_roll_ms)
+            self.capture.start()
+            self.wake_word_engine = create_wake_word_engine(self.config, self.capture.sample_rate)
+            self.echo_gate = self._create_echo_gate()
+            
+            # Load any local speech model without holding up the caller
+            threading.Thread(target=self.stt.warm_up, daemon=True).start()
+            
+            self.pipeline = ListeningPipeline(
+                segmenter,
+                self.stt,
+                self._handle_utterance,
+                self._respond,
+                wake_word_engine=self.wake_word_engine,
+                wake_word_required=self._wake_word_required,
+                stt_workers=self.config.get('stt_workers', 2),
+                stt_queue_size=self.config.get('stt_queue_size', 4),
+                barge_in=self._on_barge_in_cue,
+                barge_in_armed=self._barge_in_armed,
+                echo_gate=self.echo_gate
+            )
+            self.pipeline.start()
+            
+            # Keep the device's noise profile up to date for the next start
+            if self.noise_profiles:
+                self.calibration_timer = get_scheduler().call_every(
+                    self.config.get('vad_calibration_save_seconds', 60), self._save_noise_profile)
+            print("Starting continuous listening...")
+
+    def _create_vad(self):
+        """Voice activity detector for the capture stream, tunable from config"""
+        noise_floor = self.noise_profiles.get(self.device_key) if self.noise_profiles else None
+        if noise_floor:
+            logger.info(f"Using saved noise floor {noise_floor} for {self.device_key}")
+        return VoiceActivityDetector(
+            self.capture.sample_rate,
+            sample_width=self.capture.sample_width,
+            start_ratio=self.config.get('vad_start_ratio', 3.0),
+            stop_ratio=self.config.get('vad_stop_ratio', 1.8),
+            min_energy=self.config.get('vad_min_energy', 300),
+            hangover_ms=self.config.get('vad_hangover_ms', 1000),
+            noise_floor=noise_floor
+        )
+
+    def _save_noise_profile(self):
+        """Persist the VAD's current noise floor for this input device"""
+        vad = self.vad
+        if self.noise_profiles and vad and vad.noise_floor is not None:
+            if self.noise_profiles.put(self.device_key, vad.noise_floor):
+                self.noise_profiles.save()
+
+    def _create_echo_gate(self):
+        """Gate for the capture stream while Ova talks, None if turned off"""
+        mode = self.config.get('echo_gate', 'attenuate')
+        if mode == 'off':
+            return None
+        gate = EchoGate(
+            self.capture.buffer,
+            self.capture.sample_rate,
+            sample_width=self.capture.sample_width,
+            mode=mode,
+            attenuation=self.config.get('echo_attenuation', 0.2),
+            tail_ms=self.config.get('echo_tail_ms', 300)
+        )
+        if self.speaking:
+            gate.set_playing(True)
+        return gate
+
+    def _wake_word_required(self):
+        """Whether speech only matters once the wake word was heard"""
+        return not (self.direct_listen_mode or self.awaiting_command or self.responding or self.speaking)
+
+    def _handle_utterance(self, utterance):
+        """Intent stage: decide what a transcript means"""
+        if utterance.wake_word:
+            # Spotted locally; the command follows in the next utterance
+            self._on_wake_word("")
+            return
+        
+        text = utterance.text
+        if not text:
+            return
+        print("Heard:", text)
+        
+        # "Stop" works while Ova is thinking or talking, with or without the wake word
+        detected_wake_word = self.wake_phrase_matcher.find(text)
+        command = detected_wake_word.command if detected_wake_word else text
+        if self._is_cancel_command(command) and (detected_wake_word or self.responding or self.speaking):
+            self.cancel_response()
+            return
+        
+        # Saying the wake word over a response interrupts it
+        if detected_wake_word and self._barge_in_allowed('wake_word') and self.barge_in('wake_word'):
+            self._on_wake_word(command)
+            return
+        
+        if self.direct_listen_mode or self.awaiting_command:
+            if command:
+                self._submit_command(command)
+        elif detected_wake_word:
+            self._on_wake_word(command)
+
+    def _is_cancel_command(self, text):
+        """Whether the whole utterance asks Ova to stop"""
+        return text.strip(" .!,") in CANCEL_PHRASES
+
+    def _on_wake_word(self, command, chime=True):
+        """Chime, show the listening animation and take the command or wait for one"""
+        if chime:
+            self.audio.play_effect('HeyOva')
+        if self.callback:
+            self.callback("START_LISTENING")
+        
+        if command:
+            self._submit_command(command)
+            return
+        
+        # Get the model going on the prompt while the user is still talking
+        if self.config.get('speculative_prefill', True) and not self.responding:
+            with self.history_lock:
+                history = list(self.conversation_history)
+            self.ai_manager.prefill(self._system_prompt(), history)
+        
+        self.awaiting_command = True
+        if self.no_response_timer:
+            self.no_response_timer.cancel()
+        
+        def handle_no_response():
+            if self.awaiting_command:
+                self.awaiting_command = False
+                self.audio.play_effect('NoAnswer')
+                if self.callback:
+                    self.callback("STOP_LISTENING")
+        
+        self.no_response_timer = get_scheduler().call_later(10.0, handle_no_response)
+
+    def _submit_command(self, text):
+        """Hand a command to the response worker"""
+        self.awaiting_command = False
+        if self.direct_listen_mode:
+            self.stop_direct_listening()
+        if self.no_response_timer:
+            self.no_response_timer.cancel()
+        
+        if self.callback:
+            self.callback("START_THINKING")
+        self.pipeline.submit_response(text)
+
+    def _respond(self, text):
+        """Response worker: generate one response while listening carries on"""
+        # Cleared before Ova counts as responding, so a barge-in from here on isn't lost
+        self.cancel_event.clear()
+        self.ai_manager.reset_cancel()
+        self.last_turn_recorded = False
+        self.responding = True
+        try:
+            self._generate_response(text)
+        finally:
+            with self.history_lock:
+                self.responding = False
+                if self.pending_truncation is not None:
+                    self._apply_truncation()
+
+    def cancel_response(self):
+        """Drop queued commands and abandon the response in progress"""
+        logger.info("Cancelling response")
+        if self.barge_in('command'):
+            return
+        if self.pipeline:
+            self.pipeline.cancel_pending_responses()
+        self.cancel_event.set()
+        if self.callback:
+            self.callback("CANCEL")
+
+    def _barge_in_armed(self):
+        """Whether speech should be checked for interruptions (Ova thinking or talking)"""
+        return self.config.get('barge_in', 'wake_word') != 'off' and (self.responding or self.speaking)
+
+    def _barge_in_allowed(self, trigger):
+        """Whether this kind of cue may interrupt, per the barge_in setting"""
+        setting = self.config.get('barge_in', 'wake_word')
+        if setting == 'off':
+            return False
+        # Any speech counts in 'vad' mode, otherwise only the wake word does
+        return trigger == 'wake_word' or setting == 'vad'
+
+    def _on_barge_in_cue(self, trigger, position):
+        """Pipeline saw speech or the wake word while Ova was busy"""
+        if self._barge_in_allowed(trigger) and self.barge_in(trigger, position):
+            # Whatever the user is saying becomes the next command
+            self._on_wake_word("", chime=trigger == 'wake_word')
+
+    def barge_in(self, trigger, position=None):
+        """Cut Ova off: silence her voice, abort generation and keep only what was heard
+        
+        Returns False if there was nothing to interrupt. `position` is where the
+        interrupting speech started in the capture stream, for latency stats.
+        """
+        if not (self.responding or self.speaking):
+            return False
+        
+        # Silence first, everything else can happen after
+        started = time.perf_counter()
+        spoken = self.interrupt_callback() if self.interrupt_callback else None
+        stop_time = time.perf_counter() - started
+        if self.echo_gate:
+            self.echo_gate.set_playing(False)
+        
+        self.ai_manager.cancel()
+        self.cancel_event.set()
+        if self.pipeline:
+            self.pipeline.cancel_pending_responses()
+        self._record_barge_in(trigger, position, stop_time)
+        
+        with self.history_lock:
+            self.pending_truncation = spoken or ""
+            if not self.responding:
+                self._apply_truncation()
+        
+        if self.callback:
+            self.callback("CANCEL")
+        return True
+
+    def _record_barge_in(self, trigger, position, stop_time):
+        """Time from the user starting to talk until Ova went quiet"""
+        # How far the capture had got past the start of the speech when we reacted
+        detect_time = 0
+        if position is not None and self.capture:
+            detect_time = max(self.capture.buffer.written - position, 0) / self.capture.bytes_per_second
+        timing = {
+            'trigger': trigger,
+            'detect_ms': round(detect_time * 1000, 1),
+            'stop_ms': round((stop_time + MIXER_LATENCY) * 1000, 1),
+            'total_ms': round((detect_time + stop_time + MIXER_LATENCY) * 1000, 1)
+        }
+        self.barge_in_timings.append(timing)
+        logger.info(f"Barge-in timing: {timing}")
+
+    def get_barge_in_stats(self):
+        """Average and worst interrupt-to-silence latency, in ms"""
+        timings = list(self.barge_in_timings)
+        if not timings:
+            return None
+        totals = [timing['total_ms'] for timing in timings]
+        return {
+            'count': len(timings),
+            'mean_ms': round(sum(totals) / len(totals), 1),
+            'max_ms': max(totals),
+            'mean_stop_ms': round(sum(timing['stop_ms'] for timing in timings) / len(timings), 1)
+        }
+
+    def _apply_truncation(self):
+        """Rewrite the interrupted answer in the history as only the part that was spoken"""
+        spoken = self.pending_truncation
+        self.pending_truncation = None
+        if not self.last_turn_recorded:
+            return
+        self.last_turn_recorded = False
+        
+        if spoken:
+            self.conversation_history[-1] = {'role': 'assistant', 'content': spoken}
+        else:
+            # Cut off before saying anything, as if the question was never answered
+            del self.conversation_history[-2:]
+        self.ai_manager.set_conversation_history(self.conversation_history)
+        self.save_conversation_history()
+
+    def set_speaking(self, speaking):
+        """Told by the GUI while Ova's voice is playing, so "stop" can interrupt it"""
+        self.speaking = speaking
+        if self.echo_gate:
+            self.echo_gate.set_playing(speaking)
+
+    def get_pipeline_stats(self):
+        """Queue, overrun and speech-to-text counters for the listening pipeline"""
+        return self.pipeline.get_stats() if self.pipeline else None
+
+    def get_response_stats(self):
+        """Time to first token, prompt evaluation, model loads, response cache hits and history size"""
+        return {
+            'ttft': self.ai_manager.get_ttft_stats(),
+            'prompt_eval': self.ai_manager.get_prompt_stats(),
+            'model_loads': self.residency.get_stats(),
+            'response_cache': self.ai_manager.get_cache_stats(),
+            'history': self.history_manager.get_stats(self.conversation_history, self.ai_manager.get_model_name())
+        }
 
     def stop_listening(self):
-        """Stop the listening thread"""
+        """Stop the listening pipeline"""
         self.is_listening = False
-        if self.listen_thread:
-            self.listen_thread.join(timeout=1)
-            self.listen_thread = None
+        if self.calibration_timer:
+            self.calibration_timer.cancel()
+            self.calibration_timer = None
+            self._save_noise_profile()
+        if self.capture:
+            self.capture.stop()
+            self.capture = None
+        if self.pipeline:
+            self.pipeline.stop()
+            self.pipeline = None
 
     def start_direct_listening(self, timeout=5):
         """Start listening directly without wake word for a specified duration"""
@@ -359,13 +669,11 @@ class VoiceAssistant:
         def handle_no_response():
             self.direct_listen_mode = False
             self.direct_listen_timer = None
-            if self.no_answer_sound_obj:
-                self.no_answer_sound_obj.play()
+            self.audio.play_effect('NoAnswer')
             if self.callback:
                 self.callback("STOP_LISTENING")
         
-        self.no_response_timer = threading.Timer(timeout, handle_no_response)
-        self.no_response_timer.start()
+        self.no_response_timer = get_scheduler().call_later(timeout, handle_no_response)
 
     def stop_direct_listening(self):
         """Stop direct listening mode"""
@@ -377,11 +685,11 @@ class VoiceAssistant:
     def process_audio(self, audio_data):
         """Process audio data and return transcribed text"""
         try:
-            text = self.recognizer.recognize_google(audio_data).lower()
+            text = self.stt.transcribe(audio_data.get_raw_data(), audio_data.sample_rate, audio_data.sample_width)
+            if not text:
+                return None
             self.last_text = text
             return text
-        except sr.UnknownValueError:
-            return None
         except sr.RequestError as e:
             print(f"Could not request results; {e}")
             return None
@@ -389,8 +697,7 @@ class VoiceAssistant:
     def handle_no_response(self):
         """Handle when no response is received after wake word"""
         try:
-            if self.no_answer_sound_obj:
-                self.no_answer_sound_obj.play()
+            self.audio.play_effect('NoAnswer')
         except Exception as e:
             print(f"Error playing no-answer sound: {e}")
         finally:
@@ -398,41 +705,70 @@ class VoiceAssistant:
             if self.direct_listen_mode:
                 self.stop_direct_listening()
 
+    def _load_system_prompt(self):
+        """System prompt from the configured personality preset in assets/presets"""
+        preset = self.config.get('personality_preset', 'ova')
+        logger.info(f"Using personality preset: {preset}")
+        
+        preset_file = get_resource_path(os.path.join('assets', 'presets', f'{preset}.txt'))
+        if os.path.exists(preset_file):
+            with open(preset_file, 'r') as f:
+                system_prompt = f.read()
+            logger.info(f"Loaded system prompt from {preset_file}")
+            return system_prompt
+        logger.warning(f"Warning: Preset file {preset_file} not found")
+        return ""
+
+    def _system_prompt(self):
+        """Personality prompt plus the summary of turns dropped from the history"""
+        return self.history_manager.system_prompt(self._load_system_prompt())
+
     def _generate_response(self, text):
         """Generate a response using the configured AI provider"""
         try:
             print("Generating response for:", text)
+            # The summary changes as old turns are folded in, so cached answers are keyed on the preset alone
+            preset_prompt = self._load_system_prompt()
+            system_prompt = self.history_manager.system_prompt(preset_prompt)
             
-            # Load current config to get preset
-            preset = self.config.get('personality_preset', 'ova')
-            logger.info(f"Using personality preset: {preset}")
-            
-            # Load system prompt from preset file in assets directory
-            preset_file = get_resource_path(os.path.join('assets', 'presets', f'{preset}.txt'))
-            system_prompt = ""
-            if os.path.exists(preset_file):
-                with open(preset_file, 'r') as f:
-                    system_prompt = f.read()
-                logger.info(f"Loaded system prompt from {preset_file}")
-            else:
-                logger.warning(f"Warning: Preset file {preset_file} not found")
+            # Stream tokens to the GUI as they arrive if enabled
+            on_token = None
+            if self.echo_gate:
+                self.echo_gate.clear_text()
+            if self.stream_callback and self.config.get('stream_responses', True):
+                def on_token(token):
+                    if not self.cancel_event.is_set():
+                        if self.echo_gate:
+                            self.echo_gate.add_text(token)
+                        self.stream_callback(token, text)
             
             # Get response using AI manager
+            history_length = len(self.conversation_history)
             response_text = self.ai_manager.get_response(
                 text,
                 system_prompt,
-                self.conversation_history
+                self.conversation_history,
+                on_token=on_token,
+                preset=self.config.get('personality_preset', 'ova'),
+                cache_prompt=preset_prompt
             )
             
-            print("Generated response:", response_text)
-            
             # Update conversation history from AI manager
             self.conversation_history = self.ai_manager.get_conversation_history()
+            self.last_turn_recorded = len(self.conversation_history) == history_length + 2
+            
+            print("Generated response:", response_text)
+            if self.echo_gate and not on_token:
+                self.echo_gate.add_text(response_text)
+            if self.cancel_event.is_set():
+                # The history is fixed up to what was heard once we return
+                logger.info("Response was cancelled, not showing it")
+                return
             
             # Trim history if needed
-            max_pairs = self.config.get('max_conversation_pairs', 10)
-            if len(self.conversation_history) > max_pairs * 2:
-                self.conversation_history = self.conversation_history[-(max_pairs * 2):]
+            trimmed = self.history_manager.fit(self.conversation_history, self.ai_manager.get_model_name())
+            if trimmed is not self.conversation_history:
+                self.conversation_history = trimmed
                 self.ai_manager.set_conversation_history(self.conversation_history)
             
             # Save updated history
@@ -0,0 +1,126 @@
+import os
+import json
+import time
+import logging
+import threading
+import edge_tts
+from cache_utils import get_cache_dir
+from async_loop import get_async_loop
+
+logger = logging.getLogger(__name__)
+
+# Region codes shown differently in the settings dialog
+REGION_LABELS = {'GB': 'UK'}
+
+def format_voice_name(short_name):
+    """Turn an Edge voice id like en-US-AvaMultilingualNeural into 'Ava (US Multi)'"""
+    # Ana is Ova's own voice
+    if short_name == 'en-US-AnaNeural':
+        return 'Ova'
+    
+    parts = short_name.split('-')
+    region = REGION_LABELS.get(parts[1], parts[1]) if len(parts) > 2 else ''
+    name = parts[-1].replace('Neural', '')
+    
+    if name.endswith('Multilingual'):
+        return f"{name[:-len('Multilingual')]} ({region} Multi)"
+    if name.endswith('Expressive'):
+        return f"{name[:-len('Expressive')]} Expressive ({region})"
+    return f"{name} ({region})" if region else name
+
+class VoiceCatalog:
+    """Edge TTS voice list cached on disk and refreshed in the background
+    
+    The cached list is used right away at startup; if it is older than the
+    TTL, a refresh is started on the shared event loop and saved when done.
+    """
+    
+    def __init__(self, ttl_hours=24, cache_path=None):
+        self.ttl = ttl_hours * 3600
+        self.cache_path = cache_path or os.path.join(get_cache_dir('voices'), 'edge_voices.json')
+        self.lock = threading.Lock()
+        self.voices = []
+        self.updated = 0
+        self.refresh_future = None
+        self.load()
+        
+    def load(self):
+        """Load the cached voice list from disk"""
+        try:
+            if os.path.exists(self.cache_path):
+                with open(self.cache_path, 'r') as f:
+                    data = json.load(f)
+                with self.lock:
+                    self.voices = data.get('voices', [])
+                    self.updated = data.get('updated', 0)
+                logger.info(f"Loaded {len(self.voices)} cached Edge voices")
+        except Exception as e:
+            logger.error(f"Error loading voice catalog: {e}")
+        return self.voices
+    
+    def save(self):
+        """Write the voice list to disk"""
+        try:
+            with self.lock:
+                data = {'updated': self.updated, 'voices': self.voices}
+            temp_path = self.cache_path + '.tmp'
+            with open(temp_path, 'w') as f:
+                json.dump(data, f)
+            os.replace(temp_path, self.cache_path)
+        except Exception as e:
+            logger.error(f"Error saving voice catalog: {e}")
+    
+    def is_stale(self):
+        """Check whether the cached list is missing or older than the TTL"""
+        return not self.voices or time.time() - self.updated > self.ttl
+    
+    def get_voices(self):
+        """Get the cached Edge voices"""
+        with self.lock:
+            return list(self.voices)
+    
+    def get_english_voices(self):
+        """Get (display name, voice id) pairs for the cached English voices"""
+        return [
+            (format_voice_name(v['ShortName']), v['ShortName'])
+            for v in self.get_voices()
+            if v.get('Locale', v['ShortName']).startswith('en-')
+        ]
+    
+    async def _fetch(self):
+        """Download the voice list from Edge TTS"""
+        voices = await edge_tts.list_voices()
+        with self.lock:
+            self.voices = voices
+            self.updated = time.time()
+        logger.info(f"Refreshed Edge voice catalog with {len(voices)} voices")
+        return voices
+    
+    def refresh(self, callback=None):
+        """Refresh the voice list in the background
+        
+        callback, if given, is called with the new voice list, or None if the
+        refresh failed. Returns the future for the refresh.
+        """
+        if self.refresh_future and not self.refresh_future.done():
+            return self.refresh_future
+        
+        def on_done(future):
+            voices = None
+            try:
+                voices = future.result()
+                self.save()
+            except Exception as e:
+                logger.error(f"Error refreshing voice catalog: {e}")
+            if callback:
+                callback(voices)
+        
+        self.refresh_future = get_async_loop().submit(self._fetch())
+        self.refresh_future.add_done_callback(on_done)
+        return self.refresh_future
+    
+    def refresh_if_stale(self, callback=None):
+        """Refresh in the background only if the cached list is out of date"""
+        if self.is_stale():
+            return self.refresh(callback)
+        return None